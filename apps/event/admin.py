@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Event, EventCategory
+from .signals import events_updated
 
 
 @admin.register(EventCategory)
@@ -37,7 +38,8 @@ class EventAdmin(admin.ModelAdmin):
         'description',
         'user_eo__user__username',
     )
-    readonly_fields = ('id', 'full',)
+    # counter_shards diubah lewat command shard_event_counters (memindahkan counter)
+    readonly_fields = ('id', 'full', 'counter_shards',)
     filter_horizontal = ('event_category',)
     ordering = ('-event_date',)
 
@@ -63,6 +65,7 @@ class EventAdmin(admin.ModelAdmin):
                 'capacity',
                 'total_participans',
                 'full',
+                'counter_shards',
             )
         }),
         ('Contact & Rewards', {
@@ -74,11 +77,15 @@ class EventAdmin(admin.ModelAdmin):
     actions = ['mark_as_finished', 'mark_as_ongoing']
 
     def mark_as_finished(self, request, queryset):
+        event_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(event_status='finished')
+        events_updated.send(sender=Event, event_ids=event_ids, fields=['event_status'])
         self.message_user(request, f"{updated} event(s) marked as Finished.")
     mark_as_finished.short_description = "Mark selected events as Finished"
 
     def mark_as_ongoing(self, request, queryset):
+        event_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(event_status='on_going')
+        events_updated.send(sender=Event, event_ids=event_ids, fields=['event_status'])
         self.message_user(request, f"{updated} event(s) marked as On Going.")
     mark_as_ongoing.short_description = "Mark selected events as On Going"
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+Counter peserta yang dipecah ke beberapa baris (sharded) untuk event yang ramai.
+
+Secara default kursi diambil dengan UPDATE bersyarat di baris Event
+(Event.objects.reserve_seats). Untuk event dengan counter_shards = N > 0,
+counter dipecah ke N baris EventSeatShard dan setiap penulis memilih shard
+secara acak, sehingga registrasi paralel tidak antre di satu row lock (dan tidak
+bertabrakan dengan edit organizer di baris event).
+
+Capacity tetap terjamin: capacity event dibagi menjadi jatah per shard, dan
+setiap shard hanya bertambah lewat UPDATE bersyarat `count < capacity`.
+
+Event.total_participans/full menjadi snapshot: disinkronkan dari jumlah shard
+maksimal sekali per FLUSH_INTERVAL detik saat ada perubahan (leading edge).
+Perubahan di dalam jendela itu disusulkan oleh flush_seat_counts() di job terjadwal
+yang wajib berjalan (transition_event_status, juga drain_registration_queue), jadi
+snapshot bisa tertinggal paling lama satu putaran job. Pembacaan yang butuh angka
+terkini memakai seat_counts() (dijumlah dari shard, di-cache sebentar).
+"""
+import random
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Event, EventSeatShard
+from .signals import events_updated
+
+SEAT_FIELDS = ['total_participans', 'full']
+
+SEAT_COUNT_CACHE_TIMEOUT = 2
+FLUSH_INTERVAL = 2
+MAX_SHARDS = 64
+
+
+class InsufficientSeats(Exception):
+    pass
+
+
+def _allocations(capacity, shards):
+    """Bagi capacity serata mungkin ke `shards` jatah."""
+    base, extra = divmod(capacity, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def _seat_count_key(event_id):
+    return f'seat_counts:{event_id}'
+
+
+def shard_count(event_id):
+    return Event.objects.filter(pk=event_id).values_list('counter_shards', flat=True).first() or 0
+
+
+def enable_seat_shards(event_id, shards):
+    """Pecah counter event menjadi `shards` baris, peserta yang sudah ada ikut dipindahkan."""
+    if not 1 <= shards <= MAX_SHARDS:
+        raise ValueError(f"shards must be between 1 and {MAX_SHARDS}")
+    with transaction.atomic():
+        event = Event.objects.select_for_update().get(pk=event_id)
+        existing = list(EventSeatShard.objects.select_for_update().filter(event=event))
+        if event.counter_shards:
+            total = sum(shard.count for shard in existing)
+        else:
+            total = event.total_participans
+        EventSeatShard.objects.filter(event=event).delete()
+
+        rows = []
+        remaining = total
+        for shard, allocation in enumerate(_allocations(max(event.capacity, total), shards)):
+            count = min(allocation, remaining)
+            remaining -= count
+            rows.append(EventSeatShard(event=event, shard=shard, capacity=allocation, count=count))
+        EventSeatShard.objects.bulk_create(rows)
+        Event.objects.filter(pk=event_id).update(counter_shards=shards)
+        _rebalance(event_id, event.capacity)
+    cache.delete(_seat_count_key(event_id))
+
+
+def disable_seat_shards(event_id):
+    """Kembalikan counter ke baris event (jumlah shard ditulis ke total_participans)."""
+    with transaction.atomic():
+        list(EventSeatShard.objects.select_for_update().filter(event_id=event_id))
+        flush_seat_counts([event_id])
+        Event.objects.filter(pk=event_id).update(counter_shards=0)
+        EventSeatShard.objects.filter(event_id=event_id).delete()
+    cache.delete(_seat_count_key(event_id))
+
+
+def _rebalance(event_id, capacity):
+    shards = list(EventSeatShard.objects.select_for_update().filter(event_id=event_id).order_by('shard'))
+    if not shards:
+        return
+    free = max(capacity - sum(shard.count for shard in shards), 0)
+    for shard, share in zip(shards, _allocations(free, len(shards))):
+        shard.capacity = shard.count + share
+    EventSeatShard.objects.bulk_update(shards, ['capacity'])
+
+
+def rebalance_seat_shards(event_id):
+    """Bagi ulang jatah shard setelah capacity event berubah. Tidak berpengaruh untuk event tanpa shard."""
+    with transaction.atomic():
+        row = Event.objects.filter(pk=event_id, counter_shards__gt=0).values_list('capacity', flat=True).first()
+        if row is None:
+            return
+        _rebalance(event_id, row)
+    cache.delete(_seat_count_key(event_id))
+    flush_seat_counts([event_id])
+
+
+def capacity_changed(event_id):
+    """
+    Dipanggil setelah organizer mengubah capacity. `full` dihitung ulang dari kolom
+    yang tersimpan (UPDATE dengan F(), total_participans tidak ditulis), lalu jatah
+    shard dibagi ulang untuk event ber-shard.
+    """
+    updated = Event.objects.filter(pk=event_id, counter_shards=0).update(
+        full=Case(When(capacity__lte=F('total_participans'), then=Value(True)), default=Value(False)),
+    )
+    if updated:
+        events_updated.send(sender=Event, event_ids=[event_id], fields=SEAT_FIELDS)
+    rebalance_seat_shards(event_id)
+
+
+def reserve_seats(event_id, count=1, shards=None):
+    """Ambil `count` kursi (semua atau tidak sama sekali). False jika tidak cukup."""
+    shards = shard_count(event_id) if shards is None else shards
+    if not shards:
+        return Event.objects.reserve_seats(event_id, count)
+
+    if count == 1:
+        # Shard acak dulu; shard lain dicoba hanya jika jatahnya habis
+        order = list(range(shards))
+        random.shuffle(order)
+        for shard in order:
+            if EventSeatShard.objects.filter(
+                event_id=event_id, shard=shard, count__lt=F('capacity'),
+            ).update(count=F('count') + 1):
+                return True
+        return False
+
+    # Banyak kursi sekaligus (grup, promosi waitlist): kunci semua shard event
+    try:
+        with transaction.atomic():
+            remaining = count
+            for shard in EventSeatShard.objects.select_for_update().filter(event_id=event_id).order_by('shard'):
+                take = min(shard.capacity - shard.count, remaining)
+                if take > 0:
+                    EventSeatShard.objects.filter(pk=shard.pk).update(count=F('count') + take)
+                    remaining -= take
+                if not remaining:
+                    return True
+            raise InsufficientSeats
+    except InsufficientSeats:
+        return False
+
+
+def release_seat(event_id, shards=None):
+    """Kembalikan satu kursi ke shard mana pun yang masih berisi."""
+    shards = shard_count(event_id) if shards is None else shards
+    if not shards:
+        return Event.objects.release_seat(event_id)
+
+    order = list(range(shards))
+    random.shuffle(order)
+    for shard in order:
+        if EventSeatShard.objects.filter(event_id=event_id, shard=shard, count__gt=0).update(count=F('count') - 1):
+            return True
+    return False
+
+
+def seat_counts(event_id, use_cache=True):
+    """(total_participans, full) terkini. Untuk event ber-shard dijumlah dari shard dan di-cache sebentar."""
+    key = _seat_count_key(event_id)
+    if use_cache:
+        counts = cache.get(key)
+        if counts is not None:
+            return counts
+
+    event = Event.objects.filter(pk=event_id).values('capacity', 'total_participans', 'full', 'counter_shards').first()
+    if event is None:
+        return 0, False
+    if not event['counter_shards']:
+        return event['total_participans'], event['full']
+
+    total = EventSeatShard.objects.filter(event_id=event_id).aggregate(total=Sum('count'))['total'] or 0
+    counts = (total, total >= event['capacity'])
+    cache.set(key, counts, SEAT_COUNT_CACHE_TIMEOUT)
+    return counts
+
+
+def flush_seat_counts(event_ids=None):
+    """
+    Tulis jumlah shard ke Event.total_participans/full (satu UPDATE untuk semua event
+    ber-shard yang snapshot-nya berbeda). Mengembalikan id event yang diperbarui.
+    """
+    shard_total = Coalesce(
+        Subquery(
+            EventSeatShard.objects.filter(event=OuterRef('pk'))
+            .values('event')
+            .annotate(total=Sum('count'))
+            .values('total')
+        ),
+        Value(0),
+    )
+    events = Event.objects.filter(counter_shards__gt=0)
+    if event_ids is not None:
+        events = events.filter(pk__in=event_ids)
+    shard_full = Case(When(capacity__lte=shard_total, then=Value(True)), default=Value(False))
+    stale_ids = list(
+        events.annotate(shard_total=shard_total, shard_full=shard_full)
+        .filter(~Q(total_participans=F('shard_total')) | ~Q(full=F('shard_full')))
+        .values_list('pk', flat=True)
+    )
+    if stale_ids:
+        Event.objects.filter(pk__in=stale_ids).update(total_participans=shard_total, full=shard_full)
+        events_updated.send(sender=Event, event_ids=stale_ids, fields=SEAT_FIELDS)
+    return stale_ids
+
+
+def seats_changed(event_id, shards):
+    """
+    Dipanggil setelah kursi berubah. Event tanpa shard: refresh read model langsung.
+    Event ber-shard: snapshot di baris event disinkronkan paling sering sekali per FLUSH_INTERVAL.
+    """
+    if not shards:
+        events_updated.send(sender=Event, event_ids=[event_id], fields=SEAT_FIELDS)
+    elif cache.add(f'seat_counts:flush:{event_id}', True, FLUSH_INTERVAL):
+        # Perubahan di dalam jendela disusulkan oleh job terjadwal
+        flush_seat_counts([event_id])
@@ -0,0 +1,108 @@
+"""
+Export event secara streaming (XML / NDJSON) dan roster peserta (CSV / NDJSON).
+
+Queryset dibaca dengan .iterator(chunk_size=...) dan setiap chunk langsung
+dikirim ke client, sehingga memori worker tetap datar berapa pun jumlah baris.
+"""
+import csv
+import json
+from io import StringIO
+
+from django.conf import settings
+from django.core.serializers.xml_serializer import Serializer as XMLSerializer
+from django.utils.text import compress_sequence
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .read_model import payloads_for
+
+EXPORT_CHUNK_SIZE = 500
+
+XML_HEADER = '<?xml version="1.0" encoding="utf-8"?>\n<django-objects version="1.0">'
+XML_FOOTER = '</django-objects>'
+
+
+class _XMLChunkSerializer(XMLSerializer):
+    """Serializer XML Django tanpa pembuka/penutup dokumen, untuk satu chunk objek."""
+
+    def start_serialization(self):
+        self.xml = SimplerXMLGenerator(self.stream, self.options.get("encoding", settings.DEFAULT_CHARSET))
+
+    def end_serialization(self):
+        pass
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_events_xml(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Hasil sama dengan serializers.serialize("xml", queryset), tapi per chunk."""
+    queryset = queryset.prefetch_related('event_category').order_by('pk')
+    serializer = _XMLChunkSerializer()
+    yield XML_HEADER
+    for chunk in _chunks(queryset.iterator(chunk_size=chunk_size), chunk_size):
+        buffer = StringIO()
+        serializer.serialize(chunk, stream=buffer)
+        yield buffer.getvalue()
+    yield XML_FOOTER
+
+
+def iter_events_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Satu payload read model per baris."""
+    rows = queryset.order_by('pk').values_list('id', 'read_model__payload')
+    for chunk in _chunks(rows.iterator(chunk_size=chunk_size), chunk_size):
+        yield ''.join(payload + '\n' for payload in payloads_for(chunk))
+
+
+ROSTER_FIELDS = ['username', 'email', 'category', 'participant_id', 'status', 'registered_at']
+
+
+def _roster_rows(attendances, chunk_size):
+    attendances = attendances.select_related('runner__user', 'category').only(
+        'participant_id', 'status', 'registered_at', 'event_id',
+        'runner__user__username', 'runner__user__email', 'category__category',
+    ).order_by('pk')
+    for attendance in attendances.iterator(chunk_size=chunk_size):
+        yield [
+            attendance.runner.user.username,
+            attendance.runner.user.email,
+            attendance.category.category if attendance.category else '',
+            str(attendance.participant_id),
+            attendance.status,
+            attendance.registered_at.isoformat(),
+        ]
+
+
+def iter_roster_csv(attendances, chunk_size=EXPORT_CHUNK_SIZE):
+    """Roster peserta sebagai CSV (dengan header), satu chunk string per `chunk_size` baris."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ROSTER_FIELDS)
+    for chunk in _chunks(_roster_rows(attendances, chunk_size), chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_roster_ndjson(attendances, chunk_size=EXPORT_CHUNK_SIZE):
+    """Roster peserta, satu objek JSON per baris."""
+    for chunk in _chunks(_roster_rows(attendances, chunk_size), chunk_size):
+        yield ''.join(json.dumps(dict(zip(ROSTER_FIELDS, row))) + '\n' for row in chunk)
+
+
+def encode_stream(chunks, gzip=False):
+    """Ubah chunk string menjadi bytes, opsional dikompresi gzip on the fly."""
+    encoded = (chunk.encode('utf-8') for chunk in chunks)
+    if gzip:
+        return compress_sequence(encoded)
+    return encoded
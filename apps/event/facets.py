@@ -0,0 +1,97 @@
+"""
+Jumlah event per nilai filter (kategori, lokasi, status) untuk halaman utama.
+
+Setiap facet dihitung dengan satu query GROUP BY dan memperhitungkan filter
+aktif lainnya (facet kategori memakai filter lokasi/status/pencarian, tapi
+tidak filter kategori itu sendiri). Hasil di-cache per kombinasi filter dan
+otomatis kedaluwarsa saat event berubah lewat invalidate_event_facets().
+"""
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Event, EventCategory
+from .search import get_search_backend, search_terms
+
+FACET_CACHE_TIMEOUT = 300
+FACET_VERSION_KEY = 'event_facets:version'
+
+
+def _facet_version():
+    version = cache.get(FACET_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(FACET_VERSION_KEY, version, None)
+        version = cache.get(FACET_VERSION_KEY, version)
+    return version
+
+
+def invalidate_event_facets():
+    """Panggil setiap kali event berubah (termasuk lewat queryset.update())."""
+    cache.set(FACET_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _cache_key(filters):
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    return f'event_facets:{_facet_version()}:{digest}'
+
+
+def _counts(events, field, choices):
+    rows = (
+        events.order_by()
+        .values(field)
+        .annotate(count=Count('id', distinct=True))
+        .values_list(field, 'count')
+    )
+    counts = dict(rows)
+    return [
+        {'value': value, 'label': str(label), 'count': counts.get(value, 0)}
+        for value, label in choices
+    ]
+
+
+def compute_event_facets(category='', location='', status='', query=''):
+    events = Event.objects.all()
+    if query:
+        # Cukup filter hasil pencarian, ranking tidak dibutuhkan untuk menghitung
+        terms = search_terms(query)
+        events = get_search_backend().filter(events, terms) if terms else events.none()
+    return {
+        'category': _counts(
+            events.apply_filters(location=location, status=status),
+            'event_category__category',
+            EventCategory.CATEGORY_CHOICES,
+        ),
+        'location': _counts(
+            events.apply_filters(category=category, status=status),
+            'location',
+            Event.cities,
+        ),
+        'status': _counts(
+            events.apply_filters(category=category, location=location),
+            'event_status',
+            Event.status,
+        ),
+    }
+
+
+def get_event_facets(category='', location='', status='', query=''):
+    """Facet untuk kombinasi filter aktif, dari cache jika ada."""
+    filters = {'category': category, 'location': location, 'status': status, 'q': query}
+    key = _cache_key(filters)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_event_facets(category, location, status, query)
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
+
+
+def facet_counts(facets):
+    """{'category': {'5k': 3, ...}, ...} agar mudah dibaca di template."""
+    return {
+        name: {row['value']: row['count'] for row in rows}
+        for name, rows in facets.items()
+    }
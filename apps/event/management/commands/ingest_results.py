@@ -0,0 +1,41 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.event.models import Event
+from apps.event.results import RESULT_BATCH_SIZE, RESULT_FORMATS, decode_lines, ingest_results, iter_result_rows
+
+
+class Command(BaseCommand):
+    help = "Ingest hasil lomba (CSV/NDJSON berisi participant_id, finish_time, category) secara streaming"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', help="ID event")
+        parser.add_argument('path', help="Path file hasil (.csv atau .ndjson)")
+        parser.add_argument('--format', choices=RESULT_FORMATS, default='', help="Default: dari ekstensi file")
+        parser.add_argument('--batch-size', type=int, default=RESULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options['event_id'])
+        except (Event.DoesNotExist, ValidationError):
+            raise CommandError(f"Event {options['event_id']} tidak ditemukan")
+
+        path = options['path']
+        result_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        try:
+            with open(path, 'rb') as file:
+                report = ingest_results(
+                    event,
+                    iter_result_rows(decode_lines(file), result_format),
+                    batch_size=options['batch_size'],
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(json.dumps(report, indent=2))
+        self.stderr.write(self.style.SUCCESS(
+            f"{report['updated']} attendance ditandai finished, "
+            f"{report['unmatched']} tidak cocok, {report['invalid']} baris tidak valid."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.event.read_model import rebuild_event_read_model
+
+
+class Command(BaseCommand):
+    help = "Backfill / rebuild read model JSON untuk semua event"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_event_read_model(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Read model selesai dibangun ulang untuk {total} event."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.event.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild full-text search index event (name + description)"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS("Index pencarian event berhasil dibangun ulang."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.event.reconcile import reconcile_participant_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Cocokkan total_participans event dengan jumlah Attendance sebenarnya, laporkan "
+        "selisihnya, lalu perbaiki (inkremental: hanya event yang berubah sejak run terakhir)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Periksa semua event, bukan hanya yang berubah")
+        parser.add_argument('--dry-run', action='store_true', help="Hanya laporkan selisih, tanpa memperbaiki")
+
+    def handle(self, *args, **options):
+        checked, drift, repaired = reconcile_participant_counts(
+            full=options['full'], repair=not options['dry_run'],
+        )
+        for row in drift:
+            note = " (ber-shard, tidak diperbaiki)" if row['sharded'] else ""
+            self.stdout.write(
+                f"{row['event_id']} {row['name']}: tersimpan {row['stored']}, "
+                f"sebenarnya {row['actual']} ({row['actual'] - row['stored']:+d}){note}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{checked} event diperiksa, {len(drift)} menyimpang, {repaired} diperbaiki."
+        ))
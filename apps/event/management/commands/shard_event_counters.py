@@ -0,0 +1,47 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.event.counters import MAX_SHARDS, disable_seat_shards, enable_seat_shards, flush_seat_counts
+from apps.event.models import Event
+
+
+class Command(BaseCommand):
+    help = "Aktifkan/nonaktifkan counter peserta ber-shard untuk event yang ramai, atau sinkronkan snapshot-nya"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', help="ID event")
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=0,
+            help=f"Jumlah shard (1-{MAX_SHARDS}), 0 = kembalikan counter ke baris event",
+        )
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help="Hanya tulis jumlah shard ke total_participans semua event ber-shard",
+        )
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            flushed = flush_seat_counts()
+            self.stdout.write(self.style.SUCCESS(f"{len(flushed)} event disinkronkan."))
+            return
+
+        if not options['event_ids']:
+            raise CommandError("Berikan minimal satu ID event, atau --flush")
+        shards = options['shards']
+        if not 0 <= shards <= MAX_SHARDS:
+            raise CommandError(f"--shards harus antara 0 dan {MAX_SHARDS}")
+
+        for event_id in options['event_ids']:
+            try:
+                name = Event.objects.values_list('name', flat=True).get(pk=event_id)
+            except (Event.DoesNotExist, ValidationError):
+                raise CommandError(f"Event {event_id} tidak ditemukan")
+            if shards:
+                enable_seat_shards(event_id, shards)
+                self.stdout.write(self.style.SUCCESS(f"{name}: counter dipecah ke {shards} shard."))
+            else:
+                disable_seat_shards(event_id)
+                self.stdout.write(self.style.SUCCESS(f"{name}: counter kembali ke baris event."))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.event.counters import flush_seat_counts
+from apps.event.status import transition_event_statuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Update status event (coming_soon/on_going/finished) dan attendance sesuai tanggal event, "
+        "lalu sinkronkan snapshot counter peserta event ber-shard"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help="Jalankan terus setiap N detik (0 = sekali jalan)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            changed = transition_event_statuses()
+            if changed is None:
+                self.stdout.write("Transisi status sedang dijalankan worker lain, dilewati.")
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{len(changed['finished'])} event finished, "
+                    f"{len(changed['on_going'])} event on going, "
+                    f"{len(changed['coming_soon'])} event coming soon, "
+                    f"{changed['attendances_finished']} attendance finished, "
+                    f"{changed['coins_awarded']} runner mendapat koin."
+                ))
+            # Trailing flush snapshot kursi yang tertahan jendela FLUSH_INTERVAL (counters.py)
+            flushed = flush_seat_counts()
+            if flushed:
+                self.stdout.write(f"{len(flushed)} snapshot kursi event ber-shard disinkronkan.")
+            if interval <= 0:
+                break
+            time.sleep(interval)
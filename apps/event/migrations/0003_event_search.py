@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS event_search USING fts5("
+            "event_id UNINDEXED, name, description, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO event_search (event_id, name, description) "
+            "SELECT id, name, description FROM event_event"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS event_search ("
+            "event_id uuid PRIMARY KEY REFERENCES event_event(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS event_search_document_gin ON event_search USING gin (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO event_search (event_id, document) "
+            "SELECT id, setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B') FROM event_event"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS event_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0003_event_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventReadModel',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='read_model', serialize=False, to='event.event')),
+                ('payload', models.TextField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0004_event_read_model'),
+        ('event_organizer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_date', 'id'], name='event_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location', 'event_date'], name='event_location_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_status', 'event_date'], name='event_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user_eo', '-event_date'], name='event_eo_date_idx'),
+        ),
+    ]
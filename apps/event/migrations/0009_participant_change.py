@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0008_event_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParticipantChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.UUIDField()),
+                ('changed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
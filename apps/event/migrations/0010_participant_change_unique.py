@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:15
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def keep_latest_change(apps, schema_editor):
+    # Sisakan satu baris (yang terbaru) per event sebelum event_id dibuat unik
+    ParticipantChange = apps.get_model('event', 'ParticipantChange')
+    latest = ParticipantChange.objects.values('event_id').annotate(latest=Max('id')).values('latest')
+    ParticipantChange.objects.exclude(id__in=list(latest)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0009_participant_change'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_latest_change, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='participantchange',
+            name='changed_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='participantchange',
+            name='event_id',
+            field=models.UUIDField(unique=True),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
 import uuid
 
+from .proximity import cities_within, distance_expression
+
 class EventCategory(models.Model):
     CATEGORY_CHOICES = [
         ('fun_run', 'Fun Run'),
@@ -14,6 +17,86 @@ class EventCategory(models.Model):
     def __str__(self):
         return self.get_category_display()
 
+class EventQuerySet(models.QuerySet):
+    """Filter bersama untuk halaman utama dan feed JSON event."""
+
+    def apply_filters(self, category='', location='', status='', date_from=None, date_to=None, has_seats=False):
+        events = self
+        # event_category adalah ManyToMany, jadi perlu distinct
+        if category:
+            events = events.filter(event_category__category=category).distinct()
+        if location:
+            events = events.filter(location=location)
+        if status:
+            events = events.filter(event_status=status)
+        if date_from:
+            events = events.filter(event_date__date__gte=date_from)
+        if date_to:
+            events = events.filter(event_date__date__lte=date_to)
+        if has_seats:
+            events = events.filter(total_participans__lt=F('capacity'))
+        return events
+
+    def search(self, query):
+        """
+        Filter event yang cocok dengan query full-text dan anotasi `search_rank`
+        (makin kecil makin relevan). Urutkan dengan order_by('search_rank', 'id').
+        """
+        from .search import get_search_backend
+
+        return get_search_backend().search(self, query)
+
+    def near(self, city, max_distance=None):
+        """
+        Anotasi `distance_km` dari kota `city` ke lokasi event.
+        Jika `max_distance` diisi, hanya event dalam radius tersebut (filter location__in, memakai index).
+        """
+        events = self
+        if max_distance is not None:
+            events = events.filter(location__in=cities_within(city, max_distance))
+        return events.annotate(distance_km=distance_expression(city))
+
+    def reserve_seat(self, event_id):
+        """
+        Ambil satu kursi dengan satu UPDATE bersyarat (tanpa read-modify-write):
+        total_participans + 1 hanya jika masih < capacity, `full` dihitung di statement yang sama.
+        Mengembalikan False jika event sudah penuh (atau tidak ada).
+        """
+        return self.reserve_seats(event_id, 1)
+
+    def reserve_seats(self, event_id, count):
+        """Seperti reserve_seat, tapi `count` kursi sekaligus (semua atau tidak sama sekali)."""
+        return self.filter(pk=event_id, total_participans__lte=F('capacity') - count).update(
+            total_participans=F('total_participans') + count,
+            full=Case(
+                When(capacity__lte=F('total_participans') + count, then=Value(True)),
+                default=Value(False),
+            ),
+        ) == 1
+
+    def release_seat(self, event_id):
+        """Kembalikan satu kursi (tidak pernah di bawah 0)."""
+        return self.filter(pk=event_id, total_participans__gt=0).update(
+            total_participans=F('total_participans') - 1,
+            full=False,
+        ) == 1
+
+    def keyset_order(self):
+        """Urutan stabil (event_date, id) untuk pagination berbasis cursor."""
+        return self.order_by(F('event_date').asc(nulls_last=True), 'id')
+
+    def after_cursor(self, event_date, event_id):
+        """Ambil event yang berada setelah posisi cursor (event_date, id)."""
+        if event_date is None:
+            # Event tanpa tanggal selalu berada di akhir urutan
+            return self.filter(event_date__isnull=True, id__gt=event_id)
+        return self.filter(
+            Q(event_date__gt=event_date)
+            | Q(event_date=event_date, id__gt=event_id)
+            | Q(event_date__isnull=True)
+        )
+
+
 class Event(models.Model):
     user_eo = models.ForeignKey('event_organizer.EventOrganizer', on_delete=models.CASCADE, null=True)
     cities = [
@@ -50,6 +133,22 @@ class Event(models.Model):
     event_status = models.CharField(max_length=20, choices=status, default='coming_soon')
     event_category = models.ManyToManyField(EventCategory, related_name= 'events')
     coin = models.PositiveIntegerField(default=0)
+    # Jumlah shard counter peserta (0 = counter langsung di baris event), lihat counters.py
+    counter_shards = models.PositiveSmallIntegerField(default=0)
+    # Versi tampilan event (cache fragmen card_event.html). update() massal dan perubahan
+    # kategori menyentuh kolom ini lewat signals.touch_events()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        # Disesuaikan dengan query di show_main, feed JSON, dan halaman organizer
+        indexes = [
+            models.Index(fields=['event_date', 'id'], name='event_date_id_idx'),
+            models.Index(fields=['location', 'event_date'], name='event_location_date_idx'),
+            models.Index(fields=['event_status', 'event_date'], name='event_status_date_idx'),
+            models.Index(fields=['user_eo', '-event_date'], name='event_eo_date_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -75,4 +174,54 @@ class Event(models.Model):
         # else:
         # Jika sudah 0, jangan lakukan apa-apa
         
-        self.save()
\ No newline at end of file
+        self.save()
+
+class EventSeatShard(models.Model):
+    """
+    Satu shard counter peserta untuk event dengan counter_shards > 0.
+    Setiap shard punya jatah kursi sendiri (capacity) sehingga total count
+    tidak pernah melebihi capacity event.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='seat_shards')
+    shard = models.PositiveSmallIntegerField()
+    capacity = models.PositiveIntegerField(default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('event', 'shard')
+
+    def __str__(self):
+        return f"{self.event_id} shard {self.shard}: {self.count}/{self.capacity}"
+
+class EventReadModel(models.Model):
+    """
+    Payload JSON event yang sudah diserialisasi (read model).
+    Diperbarui lewat signal di apps/event/signals.py, dibaca oleh endpoint JSON event.
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='read_model')
+    payload = models.TextField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Read model {self.event_id}"
+
+class ParticipantChange(models.Model):
+    """
+    Event yang Attendance-nya dihapus/diedit di luar helper registrasi (admin, cascade
+    hapus user, hapus akun per chunk), satu baris per event. Dibaca rekonsiliasi
+    inkremental, lihat reconcile.py.
+    """
+    # Bukan FK: baris tetap boleh ditulis saat event-nya sedang ikut dihapus
+    event_id = models.UUIDField(unique=True)
+    changed_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.event_id} @ {self.changed_at}"
+
+class JobCheckpoint(models.Model):
+    """Waktu terakhir job terjadwal berjalan, agar job bisa berjalan inkremental."""
+    name = models.CharField(max_length=100, unique=True)
+    last_run_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_run_at}"
@@ -0,0 +1,99 @@
+"""
+Jarak antar kota Jabodetabek untuk fitur "event terdekat".
+
+Event.location dan Runner.base_location memakai kode kota yang sama, jadi
+jarak cukup dihitung sekali untuk 9 x 9 pasangan kota (saat modul ini di-import
+oleh apps.event.models ketika startup), lalu dipakai di query lewat
+CASE WHEN location = ... THEN <jarak>.
+"""
+import math
+
+from django.db.models import Case, IntegerField, Value, When
+
+# Titik tengah perkiraan setiap kota (lat, lon)
+CITY_COORDINATES = {
+    'jakarta_barat': (-6.1683, 106.7589),
+    'jakarta_pusat': (-6.1805, 106.8284),
+    'jakarta_selatan': (-6.2615, 106.8106),
+    'jakarta_timur': (-6.2250, 106.9004),
+    'jakarta_utara': (-6.1381, 106.8636),
+    'bekasi': (-6.2383, 106.9756),
+    'bogor': (-6.5971, 106.8060),
+    'depok': (-6.4025, 106.7942),
+    'tangerang': (-6.1783, 106.6319),
+}
+
+# Jarak tempuh jalan raya rata-rata lebih panjang dari garis lurus
+ROAD_FACTOR = 1.3
+EARTH_RADIUS_KM = 6371.0
+
+
+def _haversine_km(origin, destination):
+    lat1, lon1 = map(math.radians, origin)
+    lat2, lon2 = map(math.radians, destination)
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def build_distance_matrix():
+    """{kota_asal: {kota_tujuan: jarak tempuh dalam km (dibulatkan)}}"""
+    return {
+        origin: {
+            destination: round(_haversine_km(origin_point, destination_point) * ROAD_FACTOR)
+            for destination, destination_point in CITY_COORDINATES.items()
+        }
+        for origin, origin_point in CITY_COORDINATES.items()
+    }
+
+
+DISTANCE_MATRIX = build_distance_matrix()
+
+
+def is_known_city(city):
+    return city in DISTANCE_MATRIX
+
+
+def cities_within(city, max_distance):
+    """Kode kota yang jaraknya dari `city` paling jauh `max_distance` km."""
+    return [
+        destination for destination, distance in DISTANCE_MATRIX[city].items()
+        if distance <= max_distance
+    ]
+
+
+def distance_expression(city):
+    """Ekspresi SQL jarak (km) dari `city` ke Event.location."""
+    return Case(
+        *[
+            When(location=destination, then=Value(distance))
+            for destination, distance in DISTANCE_MATRIX[city].items()
+        ],
+        default=Value(None),
+        output_field=IntegerField(),
+    )
+
+
+def base_city_for(user, city=''):
+    """
+    Kota asal untuk pencarian terdekat: parameter `city` jika valid,
+    selain itu base_location runner yang sedang login. None jika tidak ada.
+    """
+    if is_known_city(city):
+        return city
+    runner = getattr(user, 'runner', None) if user.is_authenticated else None
+    if runner is not None and is_known_city(runner.base_location):
+        return runner.base_location
+    return None
+
+
+def parse_max_distance(value):
+    """Radius dalam km dari query string, None jika kosong. ValueError jika tidak valid."""
+    if not value:
+        return None
+    max_distance = int(value)
+    if max_distance < 0:
+        raise ValueError("Invalid max_distance")
+    return max_distance
@@ -0,0 +1,103 @@
+"""
+Read model untuk endpoint JSON event.
+
+Setiap event punya satu baris EventReadModel berisi payload JSON yang sudah jadi,
+sehingga show_json, show_json_by_id dan api_events cukup membaca kolom payload
+tanpa membangun dict per baris.
+"""
+import json
+
+from django.utils import timezone
+
+from .models import Event, EventReadModel
+
+
+def build_event_payload(event):
+    """Bentuk dict event yang dipakai semua endpoint JSON event."""
+    category_names = [
+        category.get_category_display()
+        for category in event.event_category.all()
+    ]
+    return {
+        'id': str(event.id),
+        'name': event.name,
+        'description': event.description,
+        'location': event.get_location_display(),
+        'event_status': event.event_status,
+        'image': event.image,
+        'image2': event.image2,
+        'image3': event.image3,
+        'event_date': event.event_date.isoformat() if event.event_date else None,
+        'regist_deadline': event.regist_deadline.isoformat() if event.regist_deadline else None,
+        'contact': event.contact,
+        'capacity': event.capacity,
+        'total_participans': event.total_participans,
+        'full': event.full,
+        'coin': event.coin,
+        'user_eo': {
+            'id': event.user_eo_id,
+            'username': event.user_eo.user.username if event.user_eo_id else None,
+        },
+        'event_categories': category_names,
+    }
+
+
+def refresh_event_read_model(event_ids):
+    """Bangun ulang payload untuk event dengan id tertentu (bulk upsert)."""
+    event_ids = list(event_ids)
+    if not event_ids:
+        return {}
+    events = Event.objects.filter(pk__in=event_ids).select_related(
+        'user_eo__user'
+    ).prefetch_related('event_category')
+
+    now = timezone.now()
+    rows = [
+        EventReadModel(
+            event_id=event.pk,
+            payload=json.dumps(build_event_payload(event)),
+            updated_at=now,
+        )
+        for event in events
+    ]
+    EventReadModel.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['event'],
+        update_fields=['payload', 'updated_at'],
+    )
+    return {row.event_id: row.payload for row in rows}
+
+
+def rebuild_event_read_model(batch_size=500):
+    """Backfill seluruh read model secara bertahap. Mengembalikan jumlah event."""
+    total = 0
+    event_ids = Event.objects.order_by('pk').values_list('pk', flat=True)
+    batch = []
+    for event_id in event_ids.iterator(chunk_size=batch_size):
+        batch.append(event_id)
+        if len(batch) >= batch_size:
+            refresh_event_read_model(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        refresh_event_read_model(batch)
+        total += len(batch)
+    EventReadModel.objects.exclude(event__in=Event.objects.all()).delete()
+    return total
+
+
+def payloads_for(rows):
+    """
+    Ambil payload dari list (event_id, payload). Baris yang belum punya read model
+    (payload None) dibangun saat itu juga agar respons tetap lengkap.
+    """
+    missing = [event_id for event_id, payload in rows if payload is None]
+    built = refresh_event_read_model(missing) if missing else {}
+    payloads = [payload if payload is not None else built.get(event_id) for event_id, payload in rows]
+    return [payload for payload in payloads if payload is not None]
+
+
+def json_array(payloads):
+    """Gabungkan payload JSON yang sudah jadi menjadi satu array JSON."""
+    return '[' + ','.join(payloads) + ']'
@@ -0,0 +1,150 @@
+"""
+Rekonsiliasi Event.total_participans dengan jumlah Attendance sebenarnya.
+
+Jumlah peserta sebenarnya = Attendance yang tidak dibatalkan ('attending' dan
+'finished', karena attendance yang selesai tetap memakai kursi). Semua event
+dihitung dengan satu query GROUP BY, event yang menyimpang diperbaiki dengan satu
+UPDATE berbasis subquery (nilai dihitung ulang di statement yang sama, jadi
+registrasi yang terjadi di antaranya tidak tertimpa).
+
+Mode inkremental hanya memeriksa event yang berubah sejak run terakhir:
+- read model berubah (setiap perubahan kursi lewat helper registrasi memperbarui
+  EventReadModel.updated_at);
+- Attendance dihapus atau diedit di luar helper (admin, cascade hapus user, hapus
+  akun per chunk) -> dicatat di ParticipantChange oleh signal di apps/main/signals.py.
+  Signal hanya mengumpulkan event_id; satu upsert per transaksi (per chunk, per
+  cascade) ditulis saat commit, satu baris per event.
+Event ber-shard (counter_shards > 0) hanya dilaporkan, tidak diperbaiki.
+"""
+import threading
+
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.main.models import Attendance
+from .models import Event, EventReadModel, JobCheckpoint, ParticipantChange
+from .signals import events_updated
+
+CHECKPOINT_NAME = 'reconcile_participants'
+SEAT_FIELDS = ['total_participans', 'full']
+ACTIVE_STATUSES = ('attending', 'finished')
+
+# event_id dari signal Attendance yang belum ditulis ke ParticipantChange (per thread)
+_pending_changes = threading.local()
+
+
+def record_participant_changes(event_ids):
+    """Tandai event sebagai berubah sekarang (satu upsert, satu baris per event)."""
+    now = timezone.now()
+    ParticipantChange.objects.bulk_create(
+        [ParticipantChange(event_id=event_id, changed_at=now) for event_id in set(event_ids)],
+        update_conflicts=True,
+        unique_fields=['event_id'],
+        update_fields=['changed_at'],
+    )
+
+
+def _flush_participant_changes():
+    event_ids = getattr(_pending_changes, 'event_ids', None)
+    _pending_changes.event_ids = None
+    if event_ids:
+        record_participant_changes(event_ids)
+
+
+def participant_changed(event_id):
+    """
+    Dipanggil per Attendance dari signal. Ditulis saat transaksi commit, jadi cascade
+    atau chunk yang menghapus banyak attendance hanya menulis sekali.
+    """
+    event_ids = getattr(_pending_changes, 'event_ids', None)
+    if event_ids is None:
+        event_ids = _pending_changes.event_ids = set()
+    event_ids.add(event_id)
+    # Callback berikutnya di commit yang sama tidak menemukan sisa dan tidak menulis apa-apa;
+    # jika rollback, event_id-nya ikut ditulis di commit berikutnya (hanya diperiksa ulang)
+    transaction.on_commit(_flush_participant_changes)
+
+
+def touched_event_ids(since):
+    touched = set(EventReadModel.objects.filter(updated_at__gte=since).values_list('event_id', flat=True))
+    touched.update(ParticipantChange.objects.filter(changed_at__gte=since).values_list('event_id', flat=True))
+    return touched
+
+
+def _actual_counts(event_ids=None):
+    attendances = Attendance.objects.filter(status__in=ACTIVE_STATUSES)
+    if event_ids is not None:
+        attendances = attendances.filter(event_id__in=event_ids)
+    return dict(
+        attendances.order_by().values('event_id').annotate(total=Count('id')).values_list('event_id', 'total')
+    )
+
+
+def find_drift(event_ids=None):
+    """List drift {'event_id', 'name', 'stored', 'actual', 'sharded'} untuk event yang menyimpang."""
+    actual = _actual_counts(event_ids)
+    events = Event.objects.all()
+    if event_ids is not None:
+        events = events.filter(pk__in=event_ids)
+    drift = []
+    for event_id, name, stored, sharded in events.values_list('pk', 'name', 'total_participans', 'counter_shards').iterator():
+        if stored != actual.get(event_id, 0):
+            drift.append({
+                'event_id': event_id,
+                'name': name,
+                'stored': stored,
+                'actual': actual.get(event_id, 0),
+                'sharded': bool(sharded),
+            })
+    return drift
+
+
+def repair_drift(event_ids):
+    """Tulis ulang total_participans/full dari jumlah Attendance (satu UPDATE)."""
+    event_ids = list(event_ids)
+    if not event_ids:
+        return 0
+    actual = Coalesce(
+        Subquery(
+            Attendance.objects.filter(event=OuterRef('pk'), status__in=ACTIVE_STATUSES)
+            .order_by()
+            .values('event')
+            .annotate(total=Count('id'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+    with transaction.atomic():
+        updated = Event.objects.filter(pk__in=event_ids, counter_shards=0).update(
+            total_participans=actual,
+            full=Case(When(capacity__lte=actual, then=Value(True)), default=Value(False)),
+        )
+        events_updated.send(sender=Event, event_ids=event_ids, fields=SEAT_FIELDS)
+    return updated
+
+
+def reconcile_participant_counts(full=False, repair=True):
+    """
+    Jalankan rekonsiliasi. Inkremental (sejak checkpoint terakhir) kecuali `full=True`
+    atau belum pernah berjalan. Mengembalikan (jumlah event diperiksa, list drift, jumlah diperbaiki).
+    """
+    started = timezone.now()
+    checkpoint = JobCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+    if full or checkpoint is None:
+        event_ids = None
+        checked = Event.objects.count()
+    else:
+        event_ids = list(touched_event_ids(checkpoint.last_run_at))
+        checked = len(event_ids)
+
+    drift = find_drift(event_ids) if checked else []
+    repaired = 0
+    if repair:
+        repaired = repair_drift(row['event_id'] for row in drift if not row['sharded'])
+        JobCheckpoint.objects.update_or_create(name=CHECKPOINT_NAME, defaults={'last_run_at': started})
+        # Catatan sebelum run ini sudah tercakup, run berikutnya mulai dari `started`
+        ParticipantChange.objects.filter(changed_at__lt=started).delete()
+    return checked, drift, repaired
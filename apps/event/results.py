@@ -0,0 +1,168 @@
+"""
+Ingest hasil lomba (streaming) dari CSV atau NDJSON.
+
+Setiap baris berisi participant_id, finish_time dan (opsional) category:
+
+    participant_id,finish_time,category
+    3f0c...,1:02:33,10k
+
+    {"participant_id": "3f0c...", "finish_time": "1:02:33", "category": "10k"}
+
+File dibaca baris per baris (tidak pernah dimuat utuh ke memori), dikelompokkan
+per RESULT_BATCH_SIZE baris, dicocokkan dengan Attendance event dalam satu query
+per batch, lalu ditulis dengan satu UPDATE (status 'finished') dan bulk_update (finish_time, category).
+"""
+import codecs
+import csv
+import json
+import re
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.main.coins import award_finished_events
+from apps.main.models import Attendance
+from apps.main.profile_cache import invalidate_profiles
+
+RESULT_BATCH_SIZE = 1000
+RESULT_FORMATS = ('csv', 'ndjson')
+# Jumlah contoh baris bermasalah yang dikembalikan di laporan
+MAX_REPORTED_ERRORS = 20
+
+_TIME_PATTERN = re.compile(r'^(?:(\d+):)?(\d{1,2}):(\d{1,2}(?:\.\d+)?)$')
+
+
+def parse_finish_time(value):
+    """'H:MM:SS', 'MM:SS' (boleh pecahan detik) atau jumlah detik -> timedelta."""
+    value = str(value).strip()
+    match = _TIME_PATTERN.match(value)
+    if match:
+        hours, minutes, seconds = match.groups()
+        if int(minutes) >= 60 or float(seconds) >= 60:
+            raise ValueError(f"Invalid finish time {value!r}")
+        return timedelta(hours=int(hours or 0), minutes=int(minutes), seconds=float(seconds))
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid finish time {value!r}")
+    if seconds < 0:
+        raise ValueError(f"Invalid finish time {value!r}")
+    return timedelta(seconds=seconds)
+
+
+def decode_lines(binary_lines):
+    """Iterasi baris bytes (file upload, request body, file di disk) menjadi str."""
+    return codecs.iterdecode(binary_lines, 'utf-8-sig')
+
+
+def iter_result_rows(lines, result_format):
+    """Generator dict baris hasil dari iterator baris teks."""
+    if result_format == 'csv':
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else {}
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class IngestReport:
+    def __init__(self):
+        self.rows = 0
+        self.updated = 0
+        self.unmatched = 0
+        self.invalid = 0
+        self.coins_awarded = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'updated': self.updated,
+            'unmatched': self.unmatched,
+            'invalid': self.invalid,
+            'coins_awarded': self.coins_awarded,
+            'errors': self.errors,
+        }
+
+
+def _parse_row(row, categories):
+    try:
+        participant_id = uuid.UUID(str(row.get('participant_id', '')).strip())
+    except ValueError:
+        raise ValueError("Invalid participant_id")
+    finish_time = parse_finish_time(row.get('finish_time', ''))
+    category_key = str(row.get('category') or '').strip()
+    if category_key and category_key not in categories:
+        raise ValueError(f"Category {category_key!r} is not part of this event")
+    return participant_id, finish_time, categories.get(category_key)
+
+
+def ingest_results(event, rows, batch_size=RESULT_BATCH_SIZE):
+    """
+    Terapkan hasil lomba ke Attendance event. `rows` boleh iterator (streaming).
+    Attendance yang dibatalkan tidak diubah (dihitung unmatched). Mengembalikan laporan dict.
+    """
+    categories = {category.category: category for category in event.event_category.all()}
+    report = IngestReport()
+    recorded_at = timezone.now()
+
+    numbered = enumerate(rows, start=1)
+    for batch in _batches(numbered, batch_size):
+        parsed = {}
+        for line, row in batch:
+            report.rows += 1
+            try:
+                participant_id, finish_time, category = _parse_row(row, categories)
+            except ValueError as e:
+                report.error(line, str(e))
+                continue
+            # Baris duplikat: yang terakhir di file yang dipakai
+            parsed[participant_id] = (finish_time, category)
+
+        attendances = list(
+            Attendance.objects.filter(event=event, participant_id__in=parsed)
+            .exclude(status='canceled')
+            .only('id', 'runner_id', 'participant_id', 'status', 'finish_time', 'category_id', 'result_recorded_at')
+        )
+        for attendance in attendances:
+            finish_time, category = parsed[attendance.participant_id]
+            attendance.finish_time = finish_time
+            if category is not None:
+                attendance.category = category
+        with transaction.atomic():
+            # Kolom yang sama untuk semua baris cukup satu UPDATE biasa
+            Attendance.objects.filter(pk__in=[attendance.pk for attendance in attendances]).update(
+                status='finished', result_recorded_at=recorded_at,
+            )
+            Attendance.objects.bulk_update(attendances, ['finish_time', 'category'])
+            invalidate_profiles(attendance.runner_id for attendance in attendances)
+        report.updated += len(attendances)
+        report.unmatched += len(parsed) - len(attendances)
+
+    # Hasil yang masuk setelah event selesai tetap mendapat koin
+    report.coins_awarded = sum(award_finished_events([event.pk]).values()) if report.updated else 0
+    return report.as_dict()
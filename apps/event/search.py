@@ -0,0 +1,174 @@
+"""
+Full-text search untuk Event (name + description).
+
+SQLite memakai virtual table FTS5 `event_search`, PostgreSQL memakai tabel
+`event_search` berisi kolom tsvector dengan index GIN. Keduanya dibuat di
+migration 0003 dan diperbarui lewat signal post_save/post_delete Event.
+
+Pencocokan dan ranking dijalankan di SQL query event itu sendiri
+(WHERE id IN (subquery index) dan anotasi `search_rank` dari subquery
+berkorelasi), jadi semua hasil bisa dipaginasi tanpa batas jumlah id.
+"""
+import re
+import uuid
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Batas jumlah kata yang diproses dari input user
+SEARCH_MAX_TERMS = 8
+
+
+def search_terms(query):
+    """Pecah input user menjadi kata-kata aman (tanpa sintaks query FTS)."""
+    return re.findall(r'\w+', (query or '').lower())[:SEARCH_MAX_TERMS]
+
+
+class BaseSearchBackend:
+    def index(self, event):
+        raise NotImplementedError
+
+    def remove(self, event_id):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def filter(self, events, terms):
+        """Batasi queryset event ke yang cocok dengan `terms` (tanpa ranking)."""
+        raise NotImplementedError
+
+    def rank(self, terms):
+        """Ekspresi ranking per event, makin kecil makin relevan."""
+        raise NotImplementedError
+
+    def search(self, events, query):
+        """Filter `events` yang cocok dengan query dan anotasi `search_rank`."""
+        terms = search_terms(query)
+        if not terms:
+            return events.none()
+        return self.filter(events, terms).annotate(search_rank=self.rank(terms))
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    # Bobot bm25 per kolom: event_id (unindexed), name, description
+    RANK = "bm25(event_search, 0.0, 10.0, 1.0)"
+
+    def index(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM event_search WHERE event_id = %s", [event.pk.hex])
+            cursor.execute(
+                "INSERT INTO event_search (event_id, name, description) VALUES (%s, %s, %s)",
+                [event.pk.hex, event.name or '', event.description or ''],
+            )
+
+    def remove(self, event_id):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM event_search WHERE event_id = %s", [uuid.UUID(str(event_id)).hex])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM event_search")
+            cursor.execute(
+                "INSERT INTO event_search (event_id, name, description) "
+                "SELECT id, name, description FROM event_event"
+            )
+
+    @staticmethod
+    def _match(terms):
+        # Setiap kata di-quote dan dicocokkan sebagai prefix, digabung dengan AND
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def filter(self, events, terms):
+        return events.filter(id__in=RawSQL(
+            "SELECT event_id FROM event_search WHERE event_search MATCH %s", [self._match(terms)],
+        ))
+
+    def rank(self, terms):
+        # bm25 negatif, makin kecil makin relevan
+        return RawSQL(
+            f"SELECT {self.RANK} FROM event_search "
+            f"WHERE event_search MATCH %s AND event_search.event_id = event_event.id",
+            [self._match(terms)],
+            output_field=FloatField(),
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    DOCUMENT = (
+        "setweight(to_tsvector('simple', coalesce(%s, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(%s, '')), 'B')"
+    )
+
+    def index(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO event_search (event_id, document) VALUES (%s, {self.DOCUMENT}) "
+                f"ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document",
+                [event.pk, event.name, event.description],
+            )
+
+    def remove(self, event_id):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM event_search WHERE event_id = %s", [event_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM event_search")
+            cursor.execute(
+                "INSERT INTO event_search (event_id, document) "
+                "SELECT id, setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'B') FROM event_event"
+            )
+
+    @staticmethod
+    def _tsquery(terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def filter(self, events, terms):
+        return events.filter(id__in=RawSQL(
+            "SELECT event_id FROM event_search WHERE document @@ to_tsquery('simple', %s)",
+            [self._tsquery(terms)],
+        ))
+
+    def rank(self, terms):
+        # Lookup primary key event_search per event yang cocok; ts_rank dinegasikan (kecil = relevan)
+        return RawSQL(
+            "SELECT -ts_rank(document, to_tsquery('simple', %s)) FROM event_search "
+            "WHERE event_search.event_id = event_event.id",
+            [self._tsquery(terms)],
+            output_field=FloatField(),
+        )
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """Untuk database lain: tidak ada index, cocokkan dengan icontains."""
+
+    def index(self, event):
+        pass
+
+    def remove(self, event_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def filter(self, events, terms):
+        for term in terms:
+            events = events.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return events
+
+    def rank(self, terms):
+        # Tanpa ranking, urutan jatuh ke id (lihat EventQuerySet.search)
+        return Value(0.0, output_field=FloatField())
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)()
@@ -0,0 +1,202 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from spot_runner.payload_cache import bump
+from .facets import invalidate_event_facets
+from .models import Event, EventCategory
+from .read_model import refresh_event_read_model
+from .search import get_search_backend
+
+# Dikirim setelah Event.objects...update() (status, kuota, dst.) dengan argumen
+# event_ids dan opsional fields (kolom yang berubah), karena update() tidak memicu post_save
+events_updated = Signal()
+
+# Kolom yang memengaruhi hitungan facet halaman utama
+FACET_FIELDS = {'event_status', 'location', 'event_category'}
+# Kolom kuota, tidak tampil di card_event.html
+SEAT_FIELDS = {'total_participans', 'full'}
+
+REFRESH_BATCH_SIZE = 500
+
+
+@receiver(post_save, sender=Event)
+def index_event_for_search(sender, instance, raw=False, **kwargs):
+    # Jangan sentuh index saat loaddata (raw), rebuild_event_search yang menangani
+    if raw:
+        return
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_search(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+# ==========================
+# Read model event JSON
+# ==========================
+
+@receiver(post_save, sender=Event)
+def refresh_event_payload(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_event_read_model([instance.pk])
+
+
+@receiver(events_updated)
+def refresh_updated_event_payloads(sender, event_ids, **kwargs):
+    event_ids = list(event_ids)
+    for start in range(0, len(event_ids), REFRESH_BATCH_SIZE):
+        refresh_event_read_model(event_ids[start:start + REFRESH_BATCH_SIZE])
+
+
+@receiver(m2m_changed, sender=Event.event_category.through)
+def refresh_event_payload_on_category_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # instance adalah Event
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_event_read_model([instance.pk])
+        return
+
+    # instance adalah EventCategory, pk_set berisi id Event
+    if action == 'pre_clear':
+        instance._cleared_event_ids = list(instance.events.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_event_read_model(getattr(instance, '_cleared_event_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_event_read_model(pk_set or [])
+
+
+@receiver(post_save, sender=EventCategory)
+def refresh_payload_on_category_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_event_read_model(instance.events.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=EventCategory)
+def remember_category_events(sender, instance, **kwargs):
+    # Baris M2M ikut terhapus tanpa m2m_changed, simpan id event sebelum hilang
+    instance._deleted_event_ids = list(instance.events.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=EventCategory)
+def refresh_payload_on_category_delete(sender, instance, **kwargs):
+    refresh_event_read_model(getattr(instance, '_deleted_event_ids', []))
+
+
+# ==========================
+# Cache facet halaman utama
+# ==========================
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_facets_on_event_change(sender, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_event_facets()
+
+
+@receiver(events_updated)
+def invalidate_facets_on_bulk_update(sender, fields=None, **kwargs):
+    # Perubahan kuota (total_participans/full) tidak mengubah facet
+    if fields is not None and not FACET_FIELDS.intersection(fields):
+        return
+    invalidate_event_facets()
+
+
+@receiver(m2m_changed, sender=Event.event_category.through)
+def invalidate_facets_on_category_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_event_facets()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_payload_on_organizer_rename(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Payload menyimpan username organizer
+    if raw or instance.role != 'event_organizer':
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    refresh_event_read_model(
+        Event.objects.filter(user_eo__user=instance).values_list('pk', flat=True)
+    )
+    bump('event')
+
+
+# ==========================
+# Versi tampilan event (Event.updated_at, key cache fragmen card_event.html)
+# save() sudah mengisi updated_at (auto_now); ini untuk update() massal dan kategori
+# ==========================
+
+def touch_events(event_ids):
+    event_ids = list(event_ids)
+    if event_ids:
+        Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+@receiver(events_updated)
+def touch_events_on_bulk_update(sender, event_ids, fields=None, **kwargs):
+    if fields is not None and SEAT_FIELDS.issuperset(fields):
+        return
+    touch_events(event_ids)
+
+
+@receiver(m2m_changed, sender=Event.event_category.through)
+def touch_events_on_category_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        touch_events([instance.pk])
+    elif action == 'post_clear':
+        # _cleared_event_ids diisi saat pre_clear oleh refresh_event_payload_on_category_change
+        touch_events(getattr(instance, '_cleared_event_ids', []))
+    else:
+        touch_events(pk_set or [])
+
+
+@receiver(post_save, sender=EventCategory)
+def touch_events_on_category_save(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    touch_events(instance.events.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=EventCategory)
+def touch_events_on_category_delete(sender, instance, **kwargs):
+    touch_events(getattr(instance, '_deleted_event_ids', []))
+
+
+# ==========================
+# Cache payload bersama (spot_runner/payload_cache.py)
+# Didaftarkan setelah read model agar payload yang di-cache sudah yang baru
+# ==========================
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def bump_event_payloads(sender, raw=False, **kwargs):
+    if raw:
+        return
+    # Payload review menyimpan nama event
+    bump('event', 'review')
+
+
+@receiver(events_updated)
+def bump_event_payloads_on_bulk_update(sender, **kwargs):
+    bump('event')
+
+
+@receiver(m2m_changed, sender=Event.event_category.through)
+def bump_event_payloads_on_category_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump('event')
+
+
+@receiver(post_save, sender=EventCategory)
+@receiver(post_delete, sender=EventCategory)
+def bump_event_payloads_on_category_edit(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump('event')
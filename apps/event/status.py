@@ -0,0 +1,83 @@
+"""
+Transisi status event (coming_soon -> on_going -> finished) secara set-based.
+
+Dijalankan oleh command `transition_event_status` (sekali jalan atau dengan
+--interval sebagai worker), tidak di dalam request. Jadwal ini WAJIB (cron atau
+worker, lihat README): tanpa itu status event tidak pernah berubah. Setiap status diupdate
+dengan satu UPDATE ... WHERE event_date ..., lalu Attendance 'attending' milik
+event yang sudah selesai ikut menjadi 'finished'. Aman dijalankan dari beberapa
+worker sekaligus: semua UPDATE idempotent, dan di PostgreSQL hanya satu worker
+yang mendapat advisory lock per putaran.
+
+Setelah transaksi transisi selesai, finisher event yang baru selesai dibayar
+koinnya per batch (apps/main/coins.py).
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.main.coins import award_finished_events
+from apps.main.models import Attendance
+from .models import Event
+from .signals import events_updated
+
+# Kunci advisory PostgreSQL untuk engine transisi status
+STATUS_LOCK_ID = 5_121_001
+
+
+def _day_bounds(now):
+    """Awal hari ini dan awal besok menurut TIME_ZONE proyek."""
+    start_of_today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start_of_today, start_of_today + timedelta(days=1)
+
+
+def _acquire_lock():
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [STATUS_LOCK_ID])
+        return cursor.fetchone()[0]
+
+
+def status_conditions(now=None):
+    """Kondisi event_date untuk setiap status pada waktu `now`."""
+    start_of_today, start_of_tomorrow = _day_bounds(now or timezone.now())
+    return {
+        'finished': Q(event_date__lt=start_of_today),
+        'on_going': Q(event_date__gte=start_of_today, event_date__lt=start_of_tomorrow),
+        'coming_soon': Q(event_date__gte=start_of_tomorrow),
+    }
+
+
+def transition_event_statuses(now=None):
+    """
+    Pindahkan status event sesuai tanggalnya.
+    Mengembalikan dict {status: [id event yang berubah], 'attendances_finished': n,
+    'coins_awarded': jumlah runner yang dikredit}, atau None jika worker lain sedang
+    menjalankan transisi.
+    """
+    changed = {}
+    with transaction.atomic():
+        if not _acquire_lock():
+            return None
+
+        for status, condition in status_conditions(now).items():
+            events = Event.objects.filter(condition).exclude(event_status=status)
+            changed[status] = list(events.values_list('pk', flat=True))
+            if changed[status]:
+                events.update(event_status=status)
+
+        changed['attendances_finished'] = Attendance.objects.filter(
+            status='attending',
+            event__event_status='finished',
+        ).update(status='finished')
+
+        event_ids = changed['finished'] + changed['on_going'] + changed['coming_soon']
+        if event_ids:
+            events_updated.send(sender=Event, event_ids=event_ids, fields=['event_status'])
+
+    # Di luar transaksi transisi: event besar dibayar per batch dengan transaksi pendek
+    changed['coins_awarded'] = sum(award_finished_events(changed['finished']).values()) if changed['finished'] else 0
+    return changed
@@ -2,10 +2,15 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from apps.event_organizer.models import EventOrganizer
-from apps.event.models import Event, EventCategory
+from apps.event.models import Event, EventCategory, EventReadModel
 from apps.main.models import Runner 
 from .forms import EventForm
 import json
+import re
+import uuid
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
 from django.utils import timezone
 from datetime import timedelta
 
@@ -82,6 +87,58 @@ class EventViewTests(TestCase):
         self.event.refresh_from_db()
         self.assertEqual(self.event.name, 'Edited Event')
 
+    def test_edit_keeps_seats_reserved_during_request(self):
+        """Kursi yang diambil setelah event dimuat tidak tertimpa oleh edit"""
+        from unittest import mock
+        from apps.event import views
+
+        def load_then_reserve(*args, **kwargs):
+            event = Event.objects.filter(pk=self.event.pk).first()
+            self.assertTrue(Event.objects.reserve_seat(self.event.pk))
+            return event
+
+        local = timezone.localtime()
+        data = {
+            'name': 'Edited Event',
+            'description': 'Updated',
+            'location': 'jakarta_barat',
+            'event_date': (local + timedelta(days=10)).strftime('%Y-%m-%dT%H:%M'),
+            'regist_deadline': (local + timedelta(days=5)).strftime('%Y-%m-%dT%H:%M'),
+            'contact': '08123456789',
+            'capacity': 2,
+            'coin': 100,
+            'event_category': [EventCategory.objects.create(category='5k').pk],
+        }
+        with mock.patch.object(views, 'get_object_or_404', side_effect=load_then_reserve):
+            response = self.client.post(reverse('event:edit_event', args=[self.event.id]), data)
+        self.assertEqual(response.status_code, 302)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.name, self.event.total_participans, self.event.full), ('Edited Event', 1, False))
+
+        # Flutter: capacity diturunkan ke jumlah peserta, full dihitung ulang dari kolom tersimpan
+        payload = {
+            'name': 'Edited Again', 'description': 'Updated', 'location': 'jakarta_barat',
+            'contact': '08123456789', 'capacity': 2, 'coin': 10,
+        }
+        with mock.patch.object(Event.objects, 'get', side_effect=load_then_reserve):
+            response = self.client.post(
+                reverse('event:edit_event_flutter', args=[self.event.id]),
+                data=json.dumps(payload), content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.name, self.event.total_participans, self.event.full), ('Edited Again', 2, True))
+
+        Event.objects.filter(pk=self.event.pk).update(total_participans=1, full=False)
+        payload['capacity'] = 1
+        self.client.post(
+            reverse('event:edit_event_flutter', args=[self.event.id]),
+            data=json.dumps(payload), content_type='application/json',
+        )
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.total_participans, self.event.full), (1, True))
+        self.assertTrue(json.loads(EventReadModel.objects.get(event=self.event).payload)['full'])
+
     def test_delete_event_post(self):
         """POST delete_event menghapus event"""
         url = reverse('event:delete_event', args=[self.event.id])
@@ -189,3 +246,871 @@ class EventViewTests(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 404)
 
+
+
+class EventFeedTests(TestCase):
+    """Tes feed JSON event dengan filter dan pagination cursor."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='feed_eo', password='password', email="feed_eo@gmail.com")
+        self.event_organizer = EventOrganizer.objects.create(user=self.user)
+        self.cat_5k = EventCategory.objects.create(category='5k')
+        self.cat_10k = EventCategory.objects.create(category='10k')
+
+        base = timezone.now() + timedelta(days=1)
+        self.events = []
+        for i in range(5):
+            event = Event.objects.create(
+                user_eo=self.event_organizer,
+                name=f'Feed Event {i}',
+                location='bogor' if i % 2 else 'depok',
+                event_status='coming_soon',
+                event_date=base + timedelta(days=i),
+                capacity=10,
+                total_participans=10 if i == 4 else 0,
+            )
+            event.event_category.add(self.cat_5k if i % 2 else self.cat_10k)
+            self.events.append(event)
+
+    def test_show_json_without_pagination_returns_list(self):
+        response = self.client.get(reverse('event:show_json'))
+        data = json.loads(response.content)
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]['user_eo']['username'], 'feed_eo')
+
+    def test_show_json_cursor_pagination(self):
+        url = reverse('event:show_json')
+        names = []
+        cursor = None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = json.loads(self.client.get(url, params).content)
+            names.extend(item['name'] for item in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(names, [f'Feed Event {i}' for i in range(5)])
+
+    def test_show_json_filters(self):
+        url = reverse('event:show_json')
+        data = json.loads(self.client.get(url, {'category': '5k', 'limit': 10}).content)
+        self.assertEqual([e['name'] for e in data['results']], ['Feed Event 1', 'Feed Event 3'])
+
+        data = json.loads(self.client.get(url, {'location': 'depok', 'has_seats': 'true'}).content)
+        self.assertEqual([e['name'] for e in data], ['Feed Event 0', 'Feed Event 2'])
+
+        date_to = timezone.localtime(self.events[1].event_date).date().isoformat()
+        data = json.loads(self.client.get(url, {'date_to': date_to}).content)
+        self.assertEqual(len(data), 2)
+
+    def test_show_json_invalid_cursor(self):
+        response = self.client.get(reverse('event:show_json'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_show_json_single_query_for_organizer(self):
+        # Filter, organizer dan kategori sudah ada di read model: cukup 1 query
+        with self.assertNumQueries(1):
+            self.client.get(reverse('event:show_json'), {'limit': 5})
+
+
+class EventSearchTests(TestCase):
+    """Tes full-text search event (FTS5 di SQLite)."""
+
+    def setUp(self):
+        self.client = Client()
+        self.marathon = Event.objects.create(
+            name='Jakarta Marathon',
+            description='Lari pagi keliling Monas',
+            event_date=timezone.now() + timedelta(days=3),
+        )
+        self.fun_run = Event.objects.create(
+            name='Bogor Fun Run',
+            description='Fun run santai, rute dekat Jakarta',
+            event_date=timezone.now() + timedelta(days=1),
+        )
+        self.other = Event.objects.create(
+            name='Depok Night Run',
+            description='Lari malam',
+            event_date=timezone.now() + timedelta(days=2),
+        )
+
+    def test_search_ranks_name_match_first(self):
+        results = list(Event.objects.search('jakarta').order_by('search_rank'))
+        self.assertEqual(results, [self.marathon, self.fun_run])
+
+    def test_search_prefix_and_multiple_terms(self):
+        results = list(Event.objects.search('lar mal'))
+        self.assertEqual(results, [self.other])
+
+    def test_search_index_follows_save_and_delete(self):
+        self.other.name = 'Depok Sunrise Run'
+        self.other.save()
+        self.assertEqual(list(Event.objects.search('sunrise')), [self.other])
+        self.assertFalse(Event.objects.search('night').exists())
+
+        self.other.delete()
+        self.assertFalse(Event.objects.search('sunrise').exists())
+
+    def test_search_ignores_query_syntax(self):
+        self.assertFalse(Event.objects.search('"*) OR (').exists())
+
+    def test_show_json_search_pagination(self):
+        url = reverse('event:show_json')
+        data = json.loads(self.client.get(url, {'q': 'jakarta', 'limit': 1}).content)
+        self.assertEqual([e['name'] for e in data['results']], ['Jakarta Marathon'])
+        data = json.loads(self.client.get(url, {'q': 'jakarta', 'limit': 1, 'cursor': data['next_cursor']}).content)
+        self.assertEqual([e['name'] for e in data['results']], ['Bogor Fun Run'])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_show_json_search_pagination_with_equal_ranks(self):
+        twins = {Event.objects.create(name='Kemang Run', event_date=timezone.now()).pk for _ in range(3)}
+        url = reverse('event:show_json')
+        seen, cursor = [], None
+        while True:
+            params = {'q': 'kemang', 'limit': 1}
+            if cursor:
+                params['cursor'] = cursor
+            data = json.loads(self.client.get(url, params).content)
+            seen += [uuid.UUID(e['id']) for e in data['results']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(set(seen), twins)
+
+    def test_show_main_search(self):
+        response = self.client.get(reverse('main:show_main'), {'q': 'monas'})
+        self.assertEqual(list(response.context['events']), [self.marathon])
+        self.assertEqual(response.context['search_query'], 'monas')
+
+
+class EventReadModelTests(TestCase):
+    """Tes read model payload JSON event."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='rm_eo', password='password', email='rm_eo@gmail.com', role='event_organizer'
+        )
+        self.event_organizer = EventOrganizer.objects.create(user=self.user)
+        self.cat_5k = EventCategory.objects.create(category='5k')
+        self.event = Event.objects.create(
+            user_eo=self.event_organizer,
+            name='Read Model Run',
+            location='bogor',
+            event_date=timezone.now() + timedelta(days=7),
+            regist_deadline=timezone.now() + timedelta(days=5),
+            capacity=10,
+        )
+
+    def payload(self):
+        return json.loads(EventReadModel.objects.get(event=self.event).payload)
+
+    def test_payload_follows_event_and_category_changes(self):
+        self.assertEqual(self.payload()['event_categories'], [])
+        self.assertEqual(self.payload()['location'], 'Bogor')
+
+        self.event.event_category.add(self.cat_5k)
+        self.assertEqual(self.payload()['event_categories'], ['5K'])
+
+        self.event.name = 'Renamed Run'
+        self.event.save()
+        self.assertEqual(self.payload()['name'], 'Renamed Run')
+
+        self.cat_5k.events.clear()
+        self.assertEqual(self.payload()['event_categories'], [])
+
+    def test_payload_follows_category_delete_and_organizer_rename(self):
+        self.event.event_category.add(self.cat_5k)
+        self.cat_5k.delete()
+        self.assertEqual(self.payload()['event_categories'], [])
+
+        self.user.username = 'rm_eo_renamed'
+        self.user.save()
+        self.assertEqual(self.payload()['user_eo']['username'], 'rm_eo_renamed')
+
+    def test_read_model_removed_with_event(self):
+        self.event.delete()
+        self.assertFalse(EventReadModel.objects.exists())
+
+    def test_json_endpoints_share_payload(self):
+        list_data = json.loads(self.client.get(reverse('event:show_json')).content)
+        detail = json.loads(self.client.get(reverse('event:show_json_by_id', args=[self.event.id])).content)
+        self.assertEqual(list_data, [detail])
+
+        self.client.login(username='rm_eo', password='password')
+        api_data = json.loads(self.client.get(reverse('main:api_events')).content)
+        self.assertEqual(api_data, [detail])
+
+    def test_missing_read_model_is_built_on_read(self):
+        EventReadModel.objects.all().delete()
+        response = self.client.get(reverse('event:show_json_by_id', args=[self.event.id]))
+        self.assertEqual(json.loads(response.content)['name'], 'Read Model Run')
+        self.assertTrue(EventReadModel.objects.filter(event=self.event).exists())
+
+    def test_rebuild_command(self):
+        EventReadModel.objects.all().delete()
+        call_command('rebuild_event_read_model', stdout=StringIO())
+        self.assertEqual(self.payload()['name'], 'Read Model Run')
+
+
+class EventExportTests(TestCase):
+    """Tes export event streaming (XML / NDJSON / gzip)."""
+
+    def setUp(self):
+        self.client = Client()
+        self.category = EventCategory.objects.create(category='5k')
+        for i in range(3):
+            event = Event.objects.create(name=f'Export Run {i}', event_date=timezone.now() + timedelta(days=i))
+            event.event_category.add(self.category)
+
+    def test_streamed_xml_matches_serializer(self):
+        from django.core import serializers
+        response = self.client.get(reverse('event:show_xml'))
+        self.assertTrue(response.streaming)
+        expected = serializers.serialize("xml", Event.objects.order_by('pk'))
+        self.assertEqual(b''.join(response.streaming_content).decode(), expected)
+
+    def test_ndjson_export(self):
+        response = self.client.get(reverse('event:export_events'), {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(sorted(json.loads(line)['name'] for line in lines), ['Export Run 0', 'Export Run 1', 'Export Run 2'])
+
+    def test_gzip_export(self):
+        import gzip
+        response = self.client.get(reverse('event:export_events'), {'format': 'xml'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertTrue(body.endswith('</django-objects>'))
+        self.assertEqual(body.count('model="event.event"'), 3)
+
+    def test_invalid_format(self):
+        response = self.client.get(reverse('event:export_events'), {'format': 'csv'})
+        self.assertEqual(response.status_code, 400)
+
+
+class EventStatusTransitionTests(TestCase):
+    """Tes engine transisi status event set-based."""
+
+    def setUp(self):
+        from apps.main.models import Attendance
+        user = get_user_model().objects.create_user(username='status_runner', email='status1@test.com', password='pass12345', role='runner')
+        self.runner = Runner.objects.create(user=user, base_location='jakarta')
+        now = timezone.now()
+        self.past = Event.objects.create(name='Past', event_date=now - timedelta(days=2), event_status='coming_soon')
+        self.today = Event.objects.create(name='Today', event_date=timezone.localtime(now).replace(hour=12))
+        self.future = Event.objects.create(name='Future', event_date=now + timedelta(days=3), event_status='finished')
+        self.attending = Attendance.objects.create(runner=self.runner, event=self.past, status='attending')
+        other = get_user_model().objects.create_user(username='status_runner2', email='status2@test.com', password='pass12345', role='runner')
+        other_runner = Runner.objects.create(user=other, base_location='bogor')
+        self.canceled = Attendance.objects.create(runner=other_runner, event=self.past, status='canceled')
+
+    def test_transition_updates_statuses(self):
+        from apps.event.status import transition_event_statuses
+        changed = transition_event_statuses()
+        self.assertEqual(changed['finished'], [self.past.pk])
+        self.assertEqual(changed['on_going'], [self.today.pk])
+        self.assertEqual(changed['coming_soon'], [self.future.pk])
+        self.assertEqual(changed['attendances_finished'], 1)
+
+        statuses = dict(Event.objects.values_list('name', 'event_status'))
+        self.assertEqual(statuses, {'Past': 'finished', 'Today': 'on_going', 'Future': 'coming_soon'})
+        self.attending.refresh_from_db()
+        self.canceled.refresh_from_db()
+        self.assertEqual(self.attending.status, 'finished')
+        self.assertEqual(self.canceled.status, 'canceled')
+
+        payload = json.loads(EventReadModel.objects.get(event=self.past).payload)
+        self.assertEqual(payload['event_status'], 'finished')
+
+    def test_transition_is_idempotent(self):
+        from apps.event.status import transition_event_statuses
+        transition_event_statuses()
+        with self.assertNumQueries(6):
+            changed = transition_event_statuses()
+        self.assertEqual(changed, {'finished': [], 'on_going': [], 'coming_soon': [], 'attendances_finished': 0, 'coins_awarded': 0})
+
+    def test_command(self):
+        out = StringIO()
+        call_command('transition_event_status', stdout=out)
+        self.assertIn('1 event finished', out.getvalue())
+        self.assertEqual(Event.objects.get(pk=self.past.pk).event_status, 'finished')
+
+
+class QueryPlanTests(TestCase):
+    """
+    Regression test query plan: query penting tidak boleh kembali menjadi
+    full table scan (atau sort tanpa index) setelah data membesar.
+    """
+    EVENT_COUNT = 2000
+
+    @classmethod
+    def setUpTestData(cls):
+        from apps.main.models import Attendance
+        from apps.review.models import Review
+        from apps.merchandise.models import Merchandise, Redemption
+
+        User = get_user_model()
+        users = User.objects.bulk_create([
+            User(username=f'plan{i}', email=f'plan{i}@test.com', role='event_organizer' if i < 20 else 'runner')
+            for i in range(220)
+        ])
+        cls.organizers = EventOrganizer.objects.bulk_create([EventOrganizer(user=user) for user in users[:20]])
+        cls.runners = Runner.objects.bulk_create([Runner(user=user) for user in users[20:]])
+        categories = EventCategory.objects.bulk_create([
+            EventCategory(category=category) for category, _ in EventCategory.CATEGORY_CHOICES
+        ])
+
+        now = timezone.now()
+        locations = [location for location, _ in Event.cities]
+        statuses = [status for status, _ in Event.status]
+        cls.events = Event.objects.bulk_create([
+            Event(
+                name=f'Plan Run {i}',
+                user_eo=cls.organizers[i % 20],
+                location=locations[i % len(locations)],
+                event_status=statuses[i % len(statuses)],
+                event_date=now + timedelta(hours=i),
+                capacity=100,
+            )
+            for i in range(cls.EVENT_COUNT)
+        ])
+        Event.event_category.through.objects.bulk_create([
+            Event.event_category.through(event=event, eventcategory=categories[i % len(categories)])
+            for i, event in enumerate(cls.events)
+        ])
+        Attendance.objects.bulk_create([
+            Attendance(runner=runner, event=cls.events[(i * 7 + j) % cls.EVENT_COUNT], status='attending')
+            for i, runner in enumerate(cls.runners) for j in range(10)
+        ])
+        Review.objects.bulk_create([
+            Review(runner=runner, event=cls.events[i], event_organizer=cls.events[i].user_eo, rating=5)
+            for i, runner in enumerate(cls.runners)
+        ])
+        merchandise = Merchandise.objects.bulk_create([
+            Merchandise(name=f'Plan Merch {i}', organizer=organizer, description='-', image_url='https://example.com/a.png')
+            for i, organizer in enumerate(cls.organizers)
+        ])
+        Redemption.objects.bulk_create([
+            Redemption(user=runner, merchandise=merchandise[i % len(merchandise)])
+            for i, runner in enumerate(cls.runners)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertIndexedPlan(self, queryset, ordered=False):
+        plan = queryset.explain()
+        if connection.vendor == 'postgresql':
+            self.assertNotRegex(plan, r'Seq Scan on', plan)
+            return
+        # SQLite: "SCAN <tabel>" tanpa "USING ... INDEX" berarti full table scan
+        full_scans = [line for line in plan.splitlines() if re.search(r'\bSCAN \w+$', line.strip())]
+        self.assertEqual(full_scans, [], plan)
+        if ordered:
+            self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_show_main_default_order(self):
+        self.assertIndexedPlan(Event.objects.order_by('event_date')[:20], ordered=True)
+
+    def test_feed_keyset_order(self):
+        event = self.events[100]
+        events = Event.objects.keyset_order().after_cursor(event.event_date, event.pk)[:20]
+        self.assertIndexedPlan(events, ordered=True)
+
+    def test_location_filter(self):
+        events = Event.objects.apply_filters(location='jakarta_barat').order_by('event_date')[:20]
+        self.assertIndexedPlan(events, ordered=True)
+
+    def test_status_filter(self):
+        events = Event.objects.apply_filters(status='on_going').order_by('event_date')[:20]
+        self.assertIndexedPlan(events, ordered=True)
+
+    def test_category_filter(self):
+        self.assertIndexedPlan(Event.objects.apply_filters(category='5k').order_by('event_date')[:20])
+
+    def test_nearby_radius_filter(self):
+        self.assertIndexedPlan(Event.objects.near('depok', 25).order_by('distance_km', 'event_date')[:20])
+
+    def test_organizer_events(self):
+        events = Event.objects.filter(user_eo=self.organizers[0]).order_by('-event_date')
+        self.assertIndexedPlan(events, ordered=True)
+
+    def test_organizer_reviews(self):
+        from apps.review.models import Review
+        self.assertIndexedPlan(Review.objects.filter(event__user_eo=self.organizers[0]).order_by('-created_at'))
+
+    def test_runner_active_attendances(self):
+        from apps.main.models import Attendance
+        self.assertIndexedPlan(Attendance.objects.filter(runner=self.runners[0], status='attending'))
+
+    def test_event_attendances(self):
+        from apps.main.models import Attendance
+        self.assertIndexedPlan(Attendance.objects.filter(event=self.events[0], status='attending'))
+
+    def test_runner_redemptions(self):
+        from apps.merchandise.models import Redemption
+        redemptions = Redemption.objects.filter(user=self.runners[0]).order_by('-redeemed_at')
+        self.assertIndexedPlan(redemptions, ordered=True)
+
+    def test_organizer_redemptions(self):
+        from apps.merchandise.models import Redemption
+        self.assertIndexedPlan(Redemption.objects.filter(merchandise__organizer=self.organizers[0]).order_by('-redeemed_at'))
+
+
+class EventProximityTests(TestCase):
+    """Tes ranking event terdekat dari base_location runner."""
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user(username='near_runner', email='near@test.com', password='pass12345', role='runner')
+        Runner.objects.create(user=user, base_location='depok')
+        date = timezone.now() + timedelta(days=5)
+        for name, location in [('Bogor Run', 'bogor'), ('Depok Run', 'depok'), ('Tangerang Run', 'tangerang'), ('Selatan Run', 'jakarta_selatan')]:
+            Event.objects.create(name=name, location=location, event_date=date)
+
+    def test_distance_matrix_is_symmetric(self):
+        from apps.event.proximity import DISTANCE_MATRIX
+        for origin, row in DISTANCE_MATRIX.items():
+            self.assertEqual(row[origin], 0)
+            for destination, distance in row.items():
+                self.assertEqual(distance, DISTANCE_MATRIX[destination][origin])
+
+    def test_near_orders_by_distance_in_query(self):
+        events = Event.objects.near('depok').order_by('distance_km')
+        self.assertEqual(
+            [event.name for event in events],
+            ['Depok Run', 'Selatan Run', 'Bogor Run', 'Tangerang Run'],
+        )
+
+    def test_json_nearby_uses_runner_base_location(self):
+        self.client.login(username='near_runner', password='pass12345')
+        response = self.client.get(reverse('event:show_json_nearby'), {'max_distance': 30})
+        data = json.loads(response.content)
+        self.assertEqual(data['from'], 'depok')
+        self.assertEqual([row['event']['name'] for row in data['results']], ['Depok Run', 'Selatan Run', 'Bogor Run'])
+        self.assertEqual(data['results'][0]['distance_km'], 0)
+
+    def test_json_nearby_requires_origin(self):
+        response = self.client.get(reverse('event:show_json_nearby'))
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('event:show_json_nearby'), {'from': 'bogor', 'max_distance': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_show_main_sort_nearest(self):
+        self.client.login(username='near_runner', password='pass12345')
+        response = self.client.get(reverse('main:show_main'), {'sort': 'nearest'})
+        self.assertEqual(response.context['near_city'], 'depok')
+        self.assertEqual([event.name for event in response.context['events']][0], 'Depok Run')
+        self.assertContains(response, '0 km')
+
+
+class EventFacetTests(TestCase):
+    """Tes jumlah facet kategori/lokasi/status untuk halaman utama."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.client = Client()
+        self.cat_5k = EventCategory.objects.create(category='5k')
+        self.cat_10k = EventCategory.objects.create(category='10k')
+        date = timezone.now() + timedelta(days=3)
+        for name, location, status, category in [
+            ('Depok 5K', 'depok', 'coming_soon', self.cat_5k),
+            ('Depok 10K', 'depok', 'finished', self.cat_10k),
+            ('Bogor 5K', 'bogor', 'coming_soon', self.cat_5k),
+        ]:
+            event = Event.objects.create(name=name, location=location, event_status=status, event_date=date)
+            event.event_category.add(category)
+
+    def counts(self, facets, name):
+        return {row['value']: row['count'] for row in facets[name] if row['count']}
+
+    def test_counts_use_other_active_filters(self):
+        from apps.event.facets import get_event_facets
+        facets = get_event_facets(category='5k', location='depok')
+        # Facet kategori tidak dibatasi kategori aktif, tapi dibatasi lokasi
+        self.assertEqual(self.counts(facets, 'category'), {'5k': 1, '10k': 1})
+        self.assertEqual(self.counts(facets, 'location'), {'depok': 1, 'bogor': 1})
+        self.assertEqual(self.counts(facets, 'status'), {'coming_soon': 1})
+        self.assertEqual(len(facets['location']), len(Event.cities))
+
+    def test_cached_and_invalidated_on_event_change(self):
+        from apps.event.facets import get_event_facets
+        with self.assertNumQueries(3):
+            get_event_facets()
+        with self.assertNumQueries(0):
+            get_event_facets()
+        Event.objects.create(name='Bogor Baru', location='bogor', event_date=timezone.now())
+        self.assertEqual(self.counts(get_event_facets(), 'location'), {'depok': 2, 'bogor': 2})
+
+    def test_invalidated_by_status_transition(self):
+        from apps.event.facets import get_event_facets
+        from apps.event.status import transition_event_statuses
+        self.assertEqual(self.counts(get_event_facets(), 'status'), {'coming_soon': 2, 'finished': 1})
+        transition_event_statuses()
+        self.assertEqual(self.counts(get_event_facets(), 'status'), {'coming_soon': 3})
+
+    def test_facet_endpoint_and_main_context(self):
+        response = self.client.get(reverse('event:show_facets'), {'status': 'coming_soon'})
+        data = json.loads(response.content)
+        self.assertEqual(self.counts(data, 'category'), {'5k': 2})
+
+        response = self.client.get(reverse('main:show_main'), {'location': 'depok'})
+        self.assertEqual(response.context['facet_counts']['category']['10k'], 1)
+        self.assertContains(response, 'Bogor (1)')
+
+
+class SeatShardTests(TestCase):
+    """Tes counter peserta ber-shard: capacity tetap terjamin dan snapshot tersinkron."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.event = Event.objects.create(name='Hot Race', event_date=timezone.now() + timedelta(days=5), capacity=10, total_participans=3)
+
+    def test_enable_moves_existing_participants(self):
+        from apps.event.counters import enable_seat_shards, seat_counts
+        from apps.event.models import EventSeatShard
+        enable_seat_shards(self.event.pk, 4)
+        shards = list(EventSeatShard.objects.filter(event=self.event).order_by('shard'))
+        self.assertEqual(len(shards), 4)
+        self.assertEqual(sum(shard.count for shard in shards), 3)
+        self.assertEqual(sum(shard.capacity for shard in shards), 10)
+        self.assertEqual(seat_counts(self.event.pk), (3, False))
+
+    def test_sharded_reservations_never_exceed_capacity(self):
+        from apps.event.counters import enable_seat_shards, flush_seat_counts, release_seat, reserve_seats, seat_counts
+        enable_seat_shards(self.event.pk, 3)
+        results = [reserve_seats(self.event.pk) for _ in range(10)]
+        self.assertEqual(results.count(True), 7)
+        self.assertEqual(seat_counts(self.event.pk, use_cache=False), (10, True))
+
+        # Snapshot di baris event belum berubah sampai di-flush
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.total_participans, 3)
+        self.assertEqual(flush_seat_counts(), [self.event.pk])
+        self.assertEqual(flush_seat_counts(), [])
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.total_participans, self.event.full), (10, True))
+        payload = json.loads(EventReadModel.objects.get(event=self.event).payload)
+        self.assertEqual(payload['total_participans'], 10)
+
+        self.assertTrue(release_seat(self.event.pk))
+        self.assertTrue(reserve_seats(self.event.pk))
+        self.assertFalse(reserve_seats(self.event.pk))
+
+    def test_multi_seat_reservation_is_all_or_nothing(self):
+        from apps.event.counters import enable_seat_shards, reserve_seats, seat_counts
+        enable_seat_shards(self.event.pk, 4)
+        self.assertFalse(reserve_seats(self.event.pk, 8))
+        self.assertEqual(seat_counts(self.event.pk, use_cache=False)[0], 3)
+        self.assertTrue(reserve_seats(self.event.pk, 7))
+        self.assertEqual(seat_counts(self.event.pk, use_cache=False), (10, True))
+
+    def test_capacity_change_rebalances_shards(self):
+        from apps.event.counters import enable_seat_shards, rebalance_seat_shards, reserve_seats, seat_counts
+        enable_seat_shards(self.event.pk, 2)
+        self.assertTrue(reserve_seats(self.event.pk, 7))
+        Event.objects.filter(pk=self.event.pk).update(capacity=12)
+        rebalance_seat_shards(self.event.pk)
+        self.assertTrue(reserve_seats(self.event.pk, 2))
+        self.assertFalse(reserve_seats(self.event.pk))
+        self.assertEqual(seat_counts(self.event.pk, use_cache=False), (12, True))
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.total_participans, self.event.full), (10, False))
+
+    def test_changes_inside_flush_window_are_flushed_later(self):
+        from apps.event.counters import enable_seat_shards, reserve_seats, seats_changed
+        enable_seat_shards(self.event.pk, 2)
+        self.assertTrue(reserve_seats(self.event.pk, 1, shards=2))
+        seats_changed(self.event.pk, 2)  # leading edge: langsung di-flush
+        self.assertTrue(reserve_seats(self.event.pk, 1, shards=2))
+        seats_changed(self.event.pk, 2)  # masih dalam jendela: hanya ditandai
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.total_participans, 4)
+
+        # Request biasa tidak menyentuh snapshot, job terjadwal yang menyusulkan flush
+        self.client.get(reverse('event:show_facets'))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.total_participans, 4)
+        out = StringIO()
+        call_command('transition_event_status', stdout=out)
+        self.assertIn('1 snapshot kursi event ber-shard disinkronkan.', out.getvalue())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.total_participans, 5)
+
+    def test_registration_and_command_round_trip(self):
+        from apps.main.registration import JOINED, REJOINED, cancel_registration, register_runner
+        from apps.main.models import Attendance
+        category = EventCategory.objects.create(category='5k')
+        user = get_user_model().objects.create_user(username='shardrunner', email='shard@example.com', password='pass12345', role='runner')
+        runner = Runner.objects.create(user=user)
+
+        call_command('shard_event_counters', str(self.event.pk), '--shards', '4', stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.counter_shards, 4)
+        self.assertEqual(register_runner(runner, self.event, category), JOINED)
+        self.assertTrue(cancel_registration(Attendance.objects.get(runner=runner, event=self.event)))
+        self.assertEqual(register_runner(runner, Event.objects.get(pk=self.event.pk), category), REJOINED)
+
+        call_command('shard_event_counters', str(self.event.pk), '--shards', '0', stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.counter_shards, self.event.total_participans), (0, 4))
+        self.assertFalse(self.event.seat_shards.exists())
+
+
+class ParticipantReconciliationTests(TestCase):
+    """Tes rekonsiliasi total_participans dengan Attendance."""
+
+    def setUp(self):
+        from apps.main.models import Attendance
+        self.category = EventCategory.objects.create(category='5k')
+        date = timezone.now() + timedelta(days=5)
+        self.drifted = Event.objects.create(name='Drifted', event_date=date, capacity=2, total_participans=0)
+        self.correct = Event.objects.create(name='Correct', event_date=date, capacity=5, total_participans=1)
+        runners = []
+        for i in range(3):
+            user = get_user_model().objects.create_user(
+                username=f'recon{i}', email=f'recon{i}@example.com', password='pass12345', role='runner',
+            )
+            runners.append(Runner.objects.create(user=user))
+        Attendance.objects.create(runner=runners[0], event=self.drifted, status='attending')
+        Attendance.objects.create(runner=runners[1], event=self.drifted, status='finished')
+        Attendance.objects.create(runner=runners[2], event=self.drifted, status='canceled')
+        Attendance.objects.create(runner=runners[0], event=self.correct, status='attending')
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('reconcile_participants', *args, stdout=out)
+        return out.getvalue()
+
+    def test_reports_and_repairs_drift(self):
+        output = self.run_command('--dry-run')
+        self.assertIn('Drifted: tersimpan 0, sebenarnya 2 (+2)', output)
+        self.assertNotIn('Correct:', output)
+        self.drifted.refresh_from_db()
+        self.assertEqual(self.drifted.total_participans, 0)
+
+        output = self.run_command()
+        self.assertIn('2 event diperiksa, 1 menyimpang, 1 diperbaiki.', output)
+        self.drifted.refresh_from_db()
+        self.assertEqual((self.drifted.total_participans, self.drifted.full), (2, True))
+        payload = json.loads(EventReadModel.objects.get(event=self.drifted).payload)
+        self.assertEqual(payload['total_participans'], 2)
+
+    def test_incremental_run_only_checks_touched_events(self):
+        from apps.event.models import JobCheckpoint
+        self.run_command()
+        JobCheckpoint.objects.update(last_run_at=timezone.now() + timedelta(seconds=1))
+        self.assertIn('0 event diperiksa', self.run_command())
+
+        # Drift pada event yang tidak disentuh tidak terlihat oleh run inkremental
+        Event.objects.filter(pk=self.correct.pk).update(total_participans=4)
+        self.assertIn('0 event diperiksa', self.run_command())
+        self.assertIn('1 menyimpang, 1 diperbaiki', self.run_command('--full'))
+
+        EventReadModel.objects.filter(event=self.correct).update(updated_at=timezone.now() + timedelta(minutes=1))
+        Event.objects.filter(pk=self.correct.pk).update(total_participans=3)
+        self.assertIn('1 event diperiksa, 1 menyimpang', self.run_command())
+
+    def test_incremental_run_sees_attendance_deleted_outside_helpers(self):
+        from apps.event.models import JobCheckpoint
+        from apps.main.models import Attendance
+        self.run_command()
+        JobCheckpoint.objects.update(last_run_at=timezone.now() - timedelta(seconds=1))
+        EventReadModel.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+
+        # Hapus lewat queryset/admin tidak melewati helper registrasi
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.filter(event=self.correct).delete()
+        self.assertIn('1 event diperiksa, 1 menyimpang, 1 diperbaiki', self.run_command())
+        self.correct.refresh_from_db()
+        self.assertEqual(self.correct.total_participans, 0)
+
+    def test_bulk_delete_records_one_change_per_event(self):
+        from django.test.utils import CaptureQueriesContext
+        from apps.event.models import ParticipantChange
+        from apps.main.models import Attendance
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.filter(event=self.drifted, status='canceled').get().save()
+        self.assertTrue(ParticipantChange.objects.filter(event_id=self.drifted.pk).exists())
+
+        # 3 attendance di 2 event dihapus dalam satu transaksi: satu upsert
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.exclude(status='canceled').delete()
+        writes = [query for query in queries.captured_queries if 'event_participantchange' in query['sql']]
+        self.assertEqual(len(writes), 1)
+        # Event yang sudah tercatat di-upsert, bukan ditambah baris baru
+        for event in (self.drifted, self.correct):
+            self.assertEqual(ParticipantChange.objects.filter(event_id=event.pk).count(), 1)
+
+    def test_grouped_count_query_count_is_constant(self):
+        from apps.event.reconcile import find_drift
+        with self.assertNumQueries(2):
+            find_drift()
+
+
+class RaceResultsIngestTests(TestCase):
+    """Tes ingest hasil lomba streaming (CSV/NDJSON) lewat endpoint dan command."""
+
+    RUNNERS = 1200
+
+    def setUp(self):
+        from apps.main.models import Attendance
+        UserModel = get_user_model()
+        self.eo_user = UserModel.objects.create_user(username='resulteo', password='password', email='resulteo@example.com', role='event_organizer')
+        self.event = Event.objects.create(
+            user_eo=EventOrganizer.objects.create(user=self.eo_user),
+            name='City Marathon', event_date=timezone.now() - timedelta(hours=5), capacity=self.RUNNERS,
+        )
+        self.cat_5k = EventCategory.objects.create(category='5k')
+        self.cat_10k = EventCategory.objects.create(category='10k')
+        self.event.event_category.add(self.cat_5k, self.cat_10k)
+        users = UserModel.objects.bulk_create([
+            UserModel(username=f'finisher{i}', email=f'finisher{i}@example.com', role='runner')
+            for i in range(self.RUNNERS)
+        ])
+        runners = Runner.objects.bulk_create([Runner(user=user) for user in users])
+        Attendance.objects.bulk_create([
+            Attendance(runner=runner, event=self.event, status='attending', category=self.cat_5k)
+            for runner in runners
+        ])
+        self.attendances = list(Attendance.objects.filter(event=self.event).order_by('id'))
+        self.url = reverse('event:upload_results', args=[self.event.pk])
+
+    def csv_body(self, attendances, category='10k'):
+        lines = ['participant_id,finish_time,category']
+        lines += [f'{attendance.participant_id},1:{i % 60:02d}:30,{category}' for i, attendance in enumerate(attendances)]
+        return '\n'.join(lines) + '\n'
+
+    def test_csv_body_marks_finishers_in_batches(self):
+        from apps.main.models import Attendance
+        self.client.force_login(self.eo_user)
+        from django.test.utils import CaptureQueriesContext
+        # Per batch 1000 baris: satu SELECT + UPDATE massal, tidak per baris
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.csv_body(self.attendances), content_type='text/csv')
+        self.assertLess(len(queries), 30)
+        report = response.json()
+        self.assertEqual((report['rows'], report['updated'], report['invalid']), (self.RUNNERS, self.RUNNERS, 0))
+
+        attendance = Attendance.objects.get(pk=self.attendances[1].pk)
+        self.assertEqual(attendance.status, 'finished')
+        self.assertEqual(attendance.finish_time, timedelta(hours=1, minutes=1, seconds=30))
+        self.assertEqual(attendance.category, self.cat_10k)
+
+    def test_invalid_and_unmatched_rows_are_reported(self):
+        from apps.main.models import Attendance
+        self.client.force_login(self.eo_user)
+        Attendance.objects.filter(pk=self.attendances[0].pk).update(status='canceled')
+        body = '\n'.join([
+            json.dumps({'participant_id': str(self.attendances[0].participant_id), 'finish_time': '25:10'}),
+            json.dumps({'participant_id': str(self.attendances[1].participant_id), 'finish_time': '1:99:00'}),
+            json.dumps({'participant_id': 'not-a-uuid', 'finish_time': '25:10'}),
+            json.dumps({'participant_id': str(self.attendances[2].participant_id), 'finish_time': '1510.5', 'category': 'full_marathon'}),
+            json.dumps({'participant_id': str(self.attendances[3].participant_id), 'finish_time': '1510.5'}),
+        ])
+        report = self.client.post(self.url, body, content_type='application/x-ndjson').json()
+        self.assertEqual((report['rows'], report['updated'], report['unmatched'], report['invalid']), (5, 1, 1, 3))
+        self.assertEqual([error['line'] for error in report['errors']], [2, 3, 4])
+        self.assertEqual(Attendance.objects.get(pk=self.attendances[0].pk).status, 'canceled')
+        self.assertEqual(Attendance.objects.get(pk=self.attendances[3].pk).finish_time, timedelta(seconds=1510.5))
+
+    def test_only_event_organizer_can_upload(self):
+        runner_user = get_user_model().objects.get(username='finisher0')
+        self.client.force_login(runner_user)
+        response = self.client.post(self.url, self.csv_body(self.attendances[:1]), content_type='text/csv')
+        self.assertEqual(response.status_code, 403)
+
+    def test_multipart_upload_and_command(self):
+        import os
+        import tempfile
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from apps.main.models import Attendance
+        self.client.force_login(self.eo_user)
+        upload = SimpleUploadedFile('results.csv', self.csv_body(self.attendances[:10]).encode())
+        self.assertEqual(self.client.post(self.url, {'file': upload}).json()['updated'], 10)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as file:
+            for attendance in self.attendances[10:20]:
+                file.write(json.dumps({'participant_id': str(attendance.participant_id), 'finish_time': '0:45:00'}) + '\n')
+        try:
+            call_command('ingest_results', str(self.event.pk), file.name, '--batch-size', '3', stdout=StringIO(), stderr=StringIO())
+        finally:
+            os.unlink(file.name)
+        self.assertEqual(Attendance.objects.filter(event=self.event, status='finished').count(), 20)
+
+
+class RosterExportTests(TestCase):
+    """Tes export roster peserta (CSV/NDJSON) yang di-stream untuk organizer."""
+
+    def setUp(self):
+        from apps.main.models import Attendance
+        UserModel = get_user_model()
+        self.eo_user = UserModel.objects.create_user(username='rostereo', password='password', email='rostereo@example.com', role='event_organizer')
+        self.event = Event.objects.create(
+            user_eo=EventOrganizer.objects.create(user=self.eo_user),
+            name='Roster Run', event_date=timezone.now() + timedelta(days=3), capacity=50,
+        )
+        self.category = EventCategory.objects.create(category='5k')
+        users = UserModel.objects.bulk_create([
+            UserModel(username=f'rosterrunner{i}', email=f'rosterrunner{i}@example.com', role='runner')
+            for i in range(12)
+        ])
+        runners = Runner.objects.bulk_create([Runner(user=user) for user in users])
+        Attendance.objects.bulk_create([
+            Attendance(runner=runner, event=self.event, category=self.category, status='canceled' if i == 0 else 'attending')
+            for i, runner in enumerate(runners)
+        ])
+        self.url = reverse('event:export_roster', args=[self.event.pk])
+
+    def test_csv_roster_is_streamed_with_header(self):
+        import csv
+        from apps.event import export
+        self.client.force_login(self.eo_user)
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment', response['Content-Disposition'])
+        body = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(body.splitlines()))
+        self.assertEqual(rows[0], export.ROSTER_FIELDS)
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(rows[1][:3], ['rosterrunner0', 'rosterrunner0@example.com', '5k'])
+        self.assertEqual(rows[1][4], 'canceled')
+
+        # Chunk kecil: header tetap sekali, baris tidak hilang di batas chunk
+        attendances = self.event.attendance_records.all()
+        chunks = list(export.iter_roster_csv(attendances, chunk_size=5))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(''.join(chunks), body)
+
+    def test_ndjson_roster_with_status_filter(self):
+        self.client.force_login(self.eo_user)
+        response = self.client.get(self.url, {'format': 'ndjson', 'status': 'attending'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 11)
+        first = json.loads(lines[0])
+        self.assertEqual(first['username'], 'rosterrunner1')
+        self.assertEqual(first['status'], 'attending')
+        self.assertIn('participant_id', first)
+
+    def test_roster_queries_do_not_grow_per_participant(self):
+        from django.test.utils import CaptureQueriesContext
+        self.client.force_login(self.eo_user)
+        response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            b''.join(response.streaming_content)
+        self.assertEqual(len(queries), 1)
+
+    def test_only_event_organizer_can_export(self):
+        self.client.force_login(get_user_model().objects.get(username='rosterrunner1'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(self.eo_user)
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
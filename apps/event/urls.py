@@ -12,10 +12,15 @@ urlpatterns = [
     path('edit-flutter/<str:event_id>/', edit_event_flutter, name='edit_event_flutter'),
     path('delete-flutter/<str:event_id>/', delete_event_flutter, name='delete_event_flutter'),
     path('xml/', show_xml, name='show_xml'),
+    path('export/', views.export_events, name='export_events'),
     path('json/', show_json, name='show_json'),
+    path('json/nearby/', views.show_json_nearby, name='show_json_nearby'),
+    path('facets/', views.show_facets, name='show_facets'),
     path('xml/<str:event_id>/', show_xml_by_id, name='show_xml_by_id'),
     path('json/<str:event_id>/', show_json_by_id, name='show_json_by_id'),
     path('<uuid:id>/edit/', edit_event, name='edit_event'),
     path('<uuid:id>/delete/', delete_event, name='delete_event'),
+    path('<uuid:id>/results/', views.upload_results, name='upload_results'),
+    path('<uuid:id>/roster/', views.export_roster, name='export_roster'),
     path('<str:id>/', show_event, name='show_event'),
 ]
\ No newline at end of file
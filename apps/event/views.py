@@ -1,22 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
 
 from apps.main.models import User
+from apps.main.registration import promote_waitlist
+from .counters import capacity_changed
 from .forms import EventForm
 from django.views.decorators.http import require_POST
-from .models import Event, EventCategory
+from .models import Event, EventCategory, EventReadModel
+from .read_model import json_array, payloads_for, refresh_event_read_model
+from .proximity import base_city_for, parse_max_distance
+from .facets import get_event_facets
+from .export import encode_stream, iter_events_ndjson, iter_events_xml, iter_roster_csv, iter_roster_ndjson
+from .results import RESULT_FORMATS, decode_lines, ingest_results, iter_result_rows
 from apps.event_organizer.models import EventOrganizer
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse
+from apps.event_organizer.ratings import reviews_removed
+from spot_runner.payload_cache import cached_payload, conditional_feed
+from django.http import Http404, HttpResponse, StreamingHttpResponse, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse
 from django.core import serializers
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ValidationError
 from apps.review.models import Review
 from django.contrib import messages
+import csv
 import json
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.html import strip_tags
 from datetime import datetime
 from django.db import transaction
+from django.db.models import F, Q
+from django.utils.dateparse import parse_date
+import base64
+import binascii
+import uuid
+
+# Kolom yang diubah form edit event. total_participans/full tidak pernah ditulis
+# dari instance yang dimuat di awal request: kursi yang diambil/dilepas sementara
+# itu (reserve_seat/release_seat) akan tertimpa.
+EVENT_EDIT_FIELDS = [
+    'name', 'description', 'location', 'image', 'image2', 'image3',
+    'event_date', 'regist_deadline', 'contact', 'capacity', 'coin', 'updated_at',
+]
 
 @login_required
 def create_event(request):
@@ -70,8 +93,12 @@ def edit_event(request, id):
         is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
         if form.is_valid():
             event_instance = form.save(commit=False) 
-            event_instance.save() 
+            event_instance.save(update_fields=EVENT_EDIT_FIELDS) 
             form.save_m2m() 
+            if 'capacity' in form.changed_data:
+                # Hitung ulang full, bagi ulang jatah shard, isi kursi baru dari waitlist
+                capacity_changed(event.pk)
+                promote_waitlist(event.pk)
             detail_url = reverse('event:show_event', kwargs={'id': event.id})
             if is_ajax:
                 return JsonResponse({
@@ -104,7 +131,10 @@ def delete_event(request, id):
             messages.error(request, 'You are not authorized to delete this event.')
             return redirect('event:show_event', id=id)
         is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
-        event.delete()
+        with transaction.atomic():
+            # Review event ikut terhapus (cascade), kurangi dari counter rating organizer
+            reviews_removed(Review.objects.filter(event=event))
+            event.delete()
         event.user_eo.total_events -= 1
         event.user_eo.save(update_fields=['total_events'])
         
@@ -130,43 +160,254 @@ def show_event(request, id):
     }
     return render(request, "event_detail.html", context)
 
+EXPORT_FORMATS = {
+    'xml': (iter_events_xml, 'application/xml', 'xml'),
+    'ndjson': (iter_events_ndjson, 'application/x-ndjson', 'ndjson'),
+}
+
+
+ROSTER_FORMATS = {
+    'csv': (iter_roster_csv, 'text/csv', 'csv'),
+    'ndjson': (iter_roster_ndjson, 'application/x-ndjson', 'ndjson'),
+}
+
+
+def _stream_response(request, chunks, content_type, filename, disposition='inline'):
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    response = StreamingHttpResponse(encode_stream(chunks, gzip=use_gzip), content_type=content_type)
+    if use_gzip:
+        response['Content-Encoding'] = 'gzip'
+    response['Vary'] = 'Accept-Encoding'
+    response['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+    return response
+
+
+def _streaming_export(request, export_format):
+    generator, content_type, extension = EXPORT_FORMATS[export_format]
+    return _stream_response(request, generator(Event.objects.all()), content_type, f'events.{extension}')
+
+
 def show_xml(request):
-    event_list = Event.objects.all()
-    xml_data = serializers.serialize("xml", event_list)
-    return HttpResponse(xml_data, content_type="application/xml")
+    # Di-stream per chunk agar dokumen tidak dibangun utuh di memori
+    return _streaming_export(request, 'xml')
+
+
+def export_events(request):
+    """
+    Export semua event untuk integrasi partner.
+    URL: /event/export/?format=xml|ndjson (default ndjson), gzip jika Accept-Encoding mendukung.
+    """
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({"status": "error", "message": "Format must be xml or ndjson"}, status=400)
+    return _streaming_export(request, export_format)
+
+def export_roster(request, id):
+    """
+    Roster peserta event untuk organizer (check-in, ekspor ke timing/panitia).
+    URL: /event/<id>/roster/?format=csv|ndjson (default csv), ?status= untuk filter
+    status attendance. Di-stream per chunk, gzip jika Accept-Encoding mendukung.
+    """
+    event = get_object_or_404(Event, pk=id)
+    if not request.user.is_authenticated or event.user_eo is None or event.user_eo.user_id != request.user.pk:
+        return JsonResponse({"status": "error", "message": "Only the event organizer can export the roster"}, status=403)
+
+    roster_format = request.GET.get('format', 'csv')
+    if roster_format not in ROSTER_FORMATS:
+        return JsonResponse({"status": "error", "message": "Format must be csv or ndjson"}, status=400)
+    attendances = event.attendance_records.all()
+    status = request.GET.get('status')
+    if status:
+        attendances = attendances.filter(status=status)
+
+    generator, content_type, extension = ROSTER_FORMATS[roster_format]
+    return _stream_response(
+        request, generator(attendances), content_type, f'roster-{event.pk}.{extension}', disposition='attachment',
+    )
+
+@csrf_exempt
+@require_POST
+def upload_results(request, id):
+    """
+    Ingest hasil lomba oleh organizer event (streaming, lihat results.py).
+    Kirim file multipart `file` (.csv / .ndjson) atau body mentah dengan
+    Content-Type text/csv / application/x-ndjson. ?format= mengesampingkan deteksi.
+    """
+    event = get_object_or_404(Event, pk=id)
+    if not request.user.is_authenticated or event.user_eo is None or event.user_eo.user_id != request.user.pk:
+        return JsonResponse({"status": "error", "message": "Only the event organizer can upload results"}, status=403)
+
+    upload = request.FILES.get('file')
+    if upload is not None:
+        source = upload
+        guessed = 'csv' if upload.name.lower().endswith('.csv') else 'ndjson'
+    else:
+        # Body dibaca baris per baris langsung dari stream request
+        source = request
+        guessed = 'csv' if 'csv' in request.content_type else 'ndjson'
+    result_format = request.GET.get('format', guessed)
+    if result_format not in RESULT_FORMATS:
+        return JsonResponse({"status": "error", "message": "Format must be csv or ndjson"}, status=400)
+
+    try:
+        report = ingest_results(event, iter_result_rows(decode_lines(source), result_format))
+    except (UnicodeDecodeError, csv.Error) as e:
+        return JsonResponse({"status": "error", "message": f"Unreadable file: {e}"}, status=400)
+    return JsonResponse({"status": "success", **report})
+
+FEED_DEFAULT_LIMIT = 20
+FEED_MAX_LIMIT = 100
+
+
+def _encode_cursor(row, searching):
+    if searching:
+        # Hasil pencarian diurutkan berdasarkan (ranking, id), bukan tanggal
+        payload = {'r': row['search_rank'], 'id': str(row['id'])}
+    else:
+        payload = {
+            'd': row['event_date'].isoformat() if row['event_date'] else None,
+            'id': str(row['id']),
+        }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _apply_cursor(event_list, cursor, searching):
+    """Terapkan cursor ke queryset, ValueError jika cursor tidak valid."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if searching:
+            rank = float(payload['r'])
+            return event_list.filter(
+                Q(search_rank__gt=rank) | Q(search_rank=rank, id__gt=uuid.UUID(payload['id']))
+            )
+        event_date = datetime.fromisoformat(payload['d']) if payload['d'] else None
+        return event_list.after_cursor(event_date, uuid.UUID(payload['id']))
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
 
+
+def _parse_date_param(value):
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError("Invalid date")
+    return parsed
+
+
+def _json_response(content, status=200):
+    # Payload dari read model sudah berupa string JSON, tidak perlu di-serialize ulang
+    return HttpResponse(content, content_type='application/json', status=status)
+
+
+@conditional_feed('event')
+@cached_payload('event')
 def show_json(request):
-    event_list = Event.objects.prefetch_related('event_category', 'user_eo').all()
-    data = []
-    for event in event_list:        
-        category_names = [
-            category.get_category_display() 
-            for category in event.event_category.all()
-        ]        
-        data.append({
-            'id': str(event.id),
-            'name': event.name,
-            'description': event.description,
-            'location': event.get_location_display(), 
-            'event_status' : event.event_status,
-            'image': event.image,
-            'image2': event.image2,
-            'image3': event.image3,
-            'event_date': event.event_date.isoformat() if event.event_date else None,
-            'regist_deadline': event.regist_deadline.isoformat() if event.regist_deadline else None,
-            'contact': event.contact,
-            'capacity': event.capacity,
-            'total_participans': event.total_participans,
-            'full': event.full,            
-            'coin': event.coin, 
-            'user_eo': {
-                'id': event.user_eo_id,
-                'username': event.user_eo.user.username if event.user_eo else None
-                },            
-            'event_categories': category_names 
-        })
-        
-    return JsonResponse(data, safe=False)
+    """
+    Feed event untuk Flutter.
+    Filter: category, location, status, date_from, date_to (YYYY-MM-DD), has_seats=true.
+    Pencarian full-text: q=<kata kunci>, hasil diurutkan berdasarkan relevansi.
+    Jika `limit` atau `cursor` dikirim, hasil dipaginasi dengan keyset (event_date, id)
+    atau (ranking, id) saat mencari, dan dibungkus dalam {"results": [...], "next_cursor": ...}.
+    Isi setiap event dibaca langsung dari EventReadModel, respons di-cache per query string.
+    """
+    try:
+        date_from = _parse_date_param(request.GET.get('date_from', ''))
+        date_to = _parse_date_param(request.GET.get('date_to', ''))
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid date format, use YYYY-MM-DD"}, status=400)
+
+    event_list = Event.objects.apply_filters(
+        category=request.GET.get('category', ''),
+        location=request.GET.get('location', ''),
+        status=request.GET.get('status', ''),
+        date_from=date_from,
+        date_to=date_to,
+        has_seats=request.GET.get('has_seats', '').lower() in ('1', 'true', 'yes'),
+    )
+
+    query = request.GET.get('q', '').strip()
+    fields = ['id', 'event_date', 'read_model__payload']
+    if query:
+        event_list = event_list.search(query).order_by('search_rank', 'id')
+        fields.append('search_rank')
+    else:
+        event_list = event_list.keyset_order()
+
+    paginate = 'limit' in request.GET or 'cursor' in request.GET
+    if not paginate:
+        rows = event_list.values_list('id', 'read_model__payload')
+        return _json_response(json_array(payloads_for(rows)))
+
+    try:
+        limit = int(request.GET.get('limit', FEED_DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid limit"}, status=400)
+    limit = max(1, min(limit, FEED_MAX_LIMIT))
+
+    cursor = request.GET.get('cursor', '')
+    if cursor:
+        try:
+            event_list = _apply_cursor(event_list, cursor, searching=bool(query))
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "Invalid cursor"}, status=400)
+
+    # Ambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+    page = list(event_list.values(*fields)[:limit + 1])
+    has_next = len(page) > limit
+    page = page[:limit]
+
+    payloads = payloads_for([(row['id'], row['read_model__payload']) for row in page])
+    next_cursor = _encode_cursor(page[-1], searching=bool(query)) if has_next else None
+    return _json_response(
+        '{"results": ' + json_array(payloads) + ', "next_cursor": ' + json.dumps(next_cursor) + '}'
+    )
+
+def show_facets(request):
+    """
+    Jumlah event per kategori, lokasi, dan status untuk filter yang sedang aktif.
+    URL: /event/facets/?category=&location=&status=&q=
+    """
+    facets = get_event_facets(
+        category=request.GET.get('category', ''),
+        location=request.GET.get('location', ''),
+        status=request.GET.get('status', ''),
+        query=request.GET.get('q', '').strip(),
+    )
+    return JsonResponse(facets)
+
+def show_json_nearby(request):
+    """
+    Event terdekat untuk Flutter, diurutkan berdasarkan jarak lalu tanggal event.
+    Kota asal: `from` (kode kota, mis. depok) atau base_location runner yang login.
+    Opsional: max_distance (km), limit, serta filter category, status, has_seats.
+    Respons: {"from": <kota>, "results": [{"distance_km": n, "event": {...}}, ...]}
+    """
+    city = base_city_for(request.user, request.GET.get('from', ''))
+    if city is None:
+        return JsonResponse({"status": "error", "message": "Unknown origin city"}, status=400)
+    try:
+        max_distance = parse_max_distance(request.GET.get('max_distance', ''))
+        limit = int(request.GET.get('limit', FEED_DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid max_distance or limit"}, status=400)
+    limit = max(1, min(limit, FEED_MAX_LIMIT))
+
+    event_list = Event.objects.apply_filters(
+        category=request.GET.get('category', ''),
+        status=request.GET.get('status', ''),
+        has_seats=request.GET.get('has_seats', '').lower() in ('1', 'true', 'yes'),
+    ).near(city, max_distance).order_by('distance_km', F('event_date').asc(nulls_last=True), 'id')
+
+    rows = list(event_list.values_list('id', 'read_model__payload', 'distance_km')[:limit])
+    missing = [event_id for event_id, payload, _ in rows if payload is None]
+    built = refresh_event_read_model(missing) if missing else {}
+    results = []
+    for event_id, payload, distance in rows:
+        payload = payload if payload is not None else built.get(event_id)
+        if payload is not None:
+            results.append('{"distance_km": ' + json.dumps(distance) + ', "event": ' + payload + '}')
+    return _json_response('{"from": ' + json.dumps(city) + ', "results": ' + json_array(results) + '}')
 
 def show_xml_by_id(request, event_id):
    try:
@@ -176,38 +417,23 @@ def show_xml_by_id(request, event_id):
    except Event.DoesNotExist:
        return HttpResponse(status=404)
 
+@cached_payload('event')
 def show_json_by_id(request, event_id):
-    event = get_object_or_404(
-        Event.objects.prefetch_related('event_category', 'user_eo'), 
-        pk=event_id
-    )
-    category_names = [
-        category.get_category_display() 
-        for category in event.event_category.all() 
-    ]
-    data = {
-        'id': str(event.id),
-        'name': event.name,
-        'description': event.description,
-        'location': event.get_location_display(), 
-        'event_status' : event.status,
-        'image': event.image,
-        'image2': event.image2,
-        'image3': event.image3,
-        'event_date': event.event_date.isoformat(),
-        'regist_deadline': event.regist_deadline.isoformat(),
-        'contact': event.contact,
-        'capacity': event.capacity,
-        'total_participans': event.total_participans,
-        'full': event.full,        
-        'coin' : event.coin, 
-        'user_eo': {
-            'id': event.user_eo_id,
-            'username': event.user_eo.user.username if event.user_eo_id else None
-            },        
-        'event_categories': category_names 
-    }
-    return JsonResponse(data)
+    try:
+        rows = list(
+            EventReadModel.objects.filter(event_id=event_id).values_list('event_id', 'payload')
+        )
+    except ValidationError:
+        # event_id bukan UUID yang valid
+        raise Http404("Event not found")
+    if not rows:
+        # Read model belum ada (mis. sebelum backfill), bangun dari Event
+        event = get_object_or_404(Event, pk=event_id)
+        rows = [(event.pk, None)]
+    payloads = payloads_for(rows)
+    if not payloads:
+        raise Http404("Event not found")
+    return _json_response(payloads[0])
 
 @csrf_exempt
 def create_event_flutter(request):
@@ -271,6 +497,7 @@ def edit_event_flutter(request, event_id):
         try:
             event = Event.objects.get(pk=event_id)
             data = json.loads(request.body)
+            old_capacity = event.capacity
             event.name = data.get("name")
             event.description = data.get("description")
             event.location = data.get("location")
@@ -284,7 +511,7 @@ def edit_event_flutter(request, event_id):
                 event.event_date = datetime.fromisoformat(data.get("event_date"))
             if data.get("regist_deadline"):
                 event.regist_deadline = datetime.fromisoformat(data.get("regist_deadline"))
-            event.save()
+            event.save(update_fields=EVENT_EDIT_FIELDS)
             categories_data = data.get("categories", [])
             if categories_data:
                 event.event_category.clear()
@@ -292,6 +519,9 @@ def edit_event_flutter(request, event_id):
                     cat_obj = EventCategory.objects.filter(category=cat_name).first()
                     if cat_obj:
                         event.event_category.add(cat_obj)
+            if event.capacity != old_capacity:
+                capacity_changed(event.pk)
+                promote_waitlist(event.pk)
 
             return JsonResponse({"status": "success"}, status=200)
 
@@ -310,7 +540,9 @@ def delete_event_flutter(request, event_id):
             eo = event.user_eo
             eo.total_events = max(0, eo.total_events - 1)
             eo.save(update_fields=['total_events'])
-            event.delete()
+            with transaction.atomic():
+                reviews_removed(Review.objects.filter(event=event))
+                event.delete()
 
             return JsonResponse({"status": "success", "message": "Event deleted successfully"}, status=200)
 
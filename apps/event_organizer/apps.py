@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EventOrganizerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.event_organizer'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.event_organizer.ratings import reconcile_organizer_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Cocokkan rating dan review_count organizer dengan review sebenarnya, laporkan "
+        "selisihnya, lalu perbaiki"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Hanya laporkan selisih, tanpa memperbaiki")
+
+    def handle(self, *args, **options):
+        checked, drift, repaired = reconcile_organizer_ratings(repair=not options['dry_run'])
+        for row in drift:
+            stored_count, stored_sum = row['stored']
+            actual_count, actual_sum = row['actual']
+            self.stdout.write(
+                f"{row['username']}: tersimpan {stored_count} review (jumlah rating {stored_sum}), "
+                f"sebenarnya {actual_count} review (jumlah rating {actual_sum})"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{checked} organizer diperiksa, {len(drift)} menyimpang, {repaired} diperbaiki."
+        ))
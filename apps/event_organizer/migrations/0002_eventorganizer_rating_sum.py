@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    # Isi counter dari review yang sudah ada (selanjutnya dipelihara oleh ratings.py)
+    EventOrganizer = apps.get_model('event_organizer', 'EventOrganizer')
+    Review = apps.get_model('review', 'Review')
+    stats = (
+        Review.objects.order_by().values('event__user_eo')
+        .annotate(count=Count('id'), total=Sum('rating'))
+        .values_list('event__user_eo', 'count', 'total')
+    )
+    EventOrganizer.objects.update(review_count=0, rating_sum=0, rating=0.0)
+    for organizer_id, count, total in stats:
+        if organizer_id is not None:
+            EventOrganizer.objects.filter(pk=organizer_id).update(
+                review_count=count, rating_sum=total or 0, rating=(total or 0) / count,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_organizer', '0001_initial'),
+        ('review', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventorganizer',
+            name='rating_sum',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
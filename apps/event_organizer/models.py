@@ -29,8 +29,10 @@ class EventOrganizer(models.Model):
     profile_picture = models.URLField(blank=True, null=True)
     base_location = models.CharField(max_length=50, choices=CITY_CHOICES)
     total_events = models.IntegerField(default=0)
+    # Dipelihara inkremental oleh ratings.py (rating = rating_sum / review_count)
     rating = models.FloatField(default=0.0)
     review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
     coin = models.IntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,154 @@
+"""
+Rating dan jumlah review EventOrganizer yang dipelihara secara inkremental.
+
+EventOrganizer menyimpan rating_sum (jumlah semua rating) dan review_count;
+rating = rating_sum / review_count dihitung ulang di UPDATE yang sama
+(SET rating_sum = rating_sum + x, review_count = review_count + y, ...), jadi
+review yang ditulis bersamaan tidak saling menimpa. View review (web dan Flutter)
+memanggil review_created/review_rating_changed/review_deleted di transaksi yang
+sama dengan perubahan review, sehingga counter ikut commit atau rollback.
+
+Review milik organizer = review untuk event organizer tersebut (Event.user_eo),
+sama seperti daftar review di dashboard/profil. Hapus event dan hapus akun runner
+memanggil reviews_removed(); perubahan lain (admin, shell) diperbaiki oleh
+`python manage.py reconcile_organizer_ratings`.
+
+UPDATE lewat queryset tidak mengirim signal, jadi payload organizer/merchandise
+dan profil organizer di-invalidate di sini.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.lookups import GreaterThan
+
+from apps.event.models import Event
+from apps.main.profile_cache import invalidate_profiles
+from apps.review.models import Review
+from spot_runner.payload_cache import bump
+from .models import EventOrganizer
+
+
+def _average(rating_sum, review_count):
+    return Case(
+        When(GreaterThan(review_count, 0), then=Cast(rating_sum, FloatField()) / review_count),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _organizers_changed(organizer_ids):
+    bump('organizer', 'merchandise')
+    invalidate_profiles(organizer_ids)
+
+
+def apply_rating_delta(organizer_id, count_delta, sum_delta):
+    """Tambahkan selisih jumlah review dan jumlah rating ke organizer (satu UPDATE)."""
+    if organizer_id is None or (not count_delta and not sum_delta):
+        return
+    review_count = F('review_count') + count_delta
+    rating_sum = F('rating_sum') + sum_delta
+    EventOrganizer.objects.filter(pk=organizer_id).update(
+        review_count=review_count,
+        rating_sum=rating_sum,
+        rating=_average(rating_sum, review_count),
+    )
+    _organizers_changed([organizer_id])
+
+
+def review_created(organizer_id, rating):
+    apply_rating_delta(organizer_id, 1, rating)
+
+
+def review_rating_changed(organizer_id, old_rating, new_rating):
+    apply_rating_delta(organizer_id, 0, new_rating - old_rating)
+
+
+def review_deleted(organizer_id, rating):
+    apply_rating_delta(organizer_id, -1, -rating)
+
+
+def organizer_of_event(event_id):
+    return Event.objects.filter(pk=event_id).values_list('user_eo_id', flat=True).first()
+
+
+def reviews_removed(reviews):
+    """
+    Kurangi counter organizer untuk review di queryset `reviews` (panggil sebelum
+    review dihapus, di transaksi yang sama). Satu UPDATE per organizer.
+    """
+    totals = (
+        reviews.order_by().values('event__user_eo')
+        .annotate(count=Count('id'), total=Sum('rating'))
+        .values_list('event__user_eo', 'count', 'total')
+    )
+    for organizer_id, count, total in list(totals):
+        apply_rating_delta(organizer_id, -count, -(total or 0))
+
+
+# ==========================
+# Rekonsiliasi
+# ==========================
+
+def _actual_stats(organizer_ids=None):
+    reviews = Review.objects.all()
+    if organizer_ids is not None:
+        reviews = reviews.filter(event__user_eo__in=organizer_ids)
+    return {
+        organizer_id: (count, total or 0)
+        for organizer_id, count, total in reviews.order_by().values('event__user_eo')
+        .annotate(count=Count('id'), total=Sum('rating'))
+        .values_list('event__user_eo', 'count', 'total')
+    }
+
+
+def find_rating_drift(organizer_ids=None):
+    """List drift {'organizer_id', 'username', 'stored', 'actual'} (tuple (count, sum)) untuk organizer yang menyimpang."""
+    actual = _actual_stats(organizer_ids)
+    organizers = EventOrganizer.objects.all()
+    if organizer_ids is not None:
+        organizers = organizers.filter(pk__in=organizer_ids)
+    drift = []
+    rows = organizers.values_list('pk', 'user__username', 'review_count', 'rating_sum', 'rating')
+    for organizer_id, username, count, total, rating in rows.iterator():
+        expected = actual.get(organizer_id, (0, 0))
+        expected_rating = expected[1] / expected[0] if expected[0] else 0.0
+        if (count, total) != expected or abs(rating - expected_rating) > 1e-9:
+            drift.append({
+                'organizer_id': organizer_id,
+                'username': username,
+                'stored': (count, total),
+                'actual': expected,
+            })
+    return drift
+
+
+def repair_rating_drift(organizer_ids):
+    """Tulis ulang review_count/rating_sum/rating dari tabel review (satu UPDATE)."""
+    organizer_ids = list(organizer_ids)
+    if not organizer_ids:
+        return 0
+    reviews = Review.objects.filter(event__user_eo=OuterRef('pk')).order_by().values('event__user_eo')
+    review_count = Coalesce(
+        Subquery(reviews.annotate(count=Count('id')).values('count'), output_field=IntegerField()),
+        Value(0),
+    )
+    rating_sum = Coalesce(
+        Subquery(reviews.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()),
+        Value(0),
+    )
+    with transaction.atomic():
+        updated = EventOrganizer.objects.filter(pk__in=organizer_ids).update(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating=_average(rating_sum, review_count),
+        )
+        _organizers_changed(organizer_ids)
+    return updated
+
+
+def reconcile_organizer_ratings(repair=True):
+    """Periksa semua organizer. Mengembalikan (jumlah diperiksa, list drift, jumlah diperbaiki)."""
+    checked = EventOrganizer.objects.count()
+    drift = find_rating_drift()
+    repaired = repair_rating_drift(row['organizer_id'] for row in drift) if repair else 0
+    return checked, drift, repaired
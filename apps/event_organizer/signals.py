@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from spot_runner.payload_cache import bump
+from .models import EventOrganizer
+
+# Kolom user yang ikut tampil di payload organizer dan merchandise
+ORGANIZER_USER_FIELDS = {'username', 'email', 'first_name', 'last_name'}
+
+# ==========================
+# Cache payload bersama (spot_runner/payload_cache.py)
+# ==========================
+
+@receiver(post_save, sender=EventOrganizer)
+@receiver(post_delete, sender=EventOrganizer)
+def bump_organizer_payloads(sender, raw=False, **kwargs):
+    # Payload merchandise menyimpan data organizer (rating, total_events, ...)
+    if raw:
+        return
+    bump('organizer', 'merchandise')
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def bump_organizer_payloads_on_user_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.role != 'event_organizer':
+        return
+    if update_fields is not None and not ORGANIZER_USER_FIELDS.intersection(update_fields):
+        return
+    bump('organizer', 'merchandise')
@@ -6,8 +6,15 @@ from datetime import date, timedelta
 
 from apps.event_organizer.models import EventOrganizer
 from apps.event.models import Event
+from apps.event.status import transition_event_statuses
+from apps.event_organizer.ratings import find_rating_drift, reconcile_organizer_ratings
+from apps.main.models import Attendance, Runner
 from apps.review.models import Review
+from django.core.cache import cache
+from django.core.management import call_command
 from django.utils import timezone
+from io import StringIO
+import json
 
 User = get_user_model()
 
@@ -101,7 +108,7 @@ class EventOrganizerViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'event_organizer/change_password.html')
 
-    def test_dashboard_updates_event_status(self):
+    def test_transition_updates_dashboard_event_status(self):
         self.client.login(username='eo_user', password='password123')
 
         past_event = Event.objects.create(
@@ -112,7 +119,102 @@ class EventOrganizerViewTests(TestCase):
             event_status="on_going"
         )
 
+        # Dashboard hanya membaca, status diupdate oleh engine transisi
         response = self.client.get(reverse('event_organizer:dashboard'))
         past_event.refresh_from_db()
+        self.assertEqual(past_event.event_status, "on_going")
 
-        self.assertEqual(past_event.event_status, "finished")
\ No newline at end of file
+        transition_event_statuses()
+        past_event.refresh_from_db()
+
+        self.assertEqual(past_event.event_status, "finished")
+
+
+class OrganizerRatingCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        eo_user = User.objects.create_user(username='rating_eo', email='rating_eo@example.com', password='password123', role='event_organizer')
+        self.organizer = EventOrganizer.objects.create(user=eo_user, base_location='jakarta_pusat')
+        self.event = Event.objects.create(
+            name="Rated Event",
+            user_eo=self.organizer,
+            event_date=timezone.now() - timedelta(days=1),
+            regist_deadline=timezone.now() - timedelta(days=2),
+            event_status="finished",
+        )
+        self.runners = []
+        for i in range(2):
+            user = User.objects.create_user(username=f'rating_runner_{i}', email=f'rating_runner_{i}@example.com', password='password123', role='runner')
+            runner = Runner.objects.create(user=user, base_location='jakarta_pusat')
+            Attendance.objects.create(runner=runner, event=self.event, status='finished')
+            self.runners.append(runner)
+
+    def _post(self, username, url, data):
+        self.client.login(username=username, password='password123')
+        return self.client.post(url, json.dumps(data), content_type='application/json')
+
+    def _assert_counters(self, count, total):
+        self.organizer.refresh_from_db()
+        self.assertEqual(self.organizer.review_count, count)
+        self.assertEqual(self.organizer.rating_sum, total)
+        self.assertAlmostEqual(self.organizer.rating, total / count if count else 0.0)
+
+    def test_web_create_edit_delete_update_counters(self):
+        response = self._post('rating_runner_0', reverse('review:create_review', args=[self.event.id]), {'rating': 5})
+        self.assertEqual(response.status_code, 201)
+        review_id = response.json()['review']['id']
+        self._post('rating_runner_1', reverse('review:create_review', args=[self.event.id]), {'rating': 2})
+        self._assert_counters(2, 7)
+
+        self._post('rating_runner_0', reverse('review:edit_review', args=[review_id]), {'rating': 3})
+        self._assert_counters(2, 5)
+
+        self._post('rating_runner_0', reverse('review:delete_review', args=[review_id]), {})
+        self._assert_counters(1, 2)
+
+    def test_flutter_create_edit_delete_update_counters(self):
+        response = self._post('rating_runner_0', reverse('review:create_review_flutter'), {
+            'event_id': str(self.event.id), 'rating': '4', 'review_text': 'Mantap',
+        })
+        self.assertEqual(response.status_code, 201)
+        review_id = response.json()['review_id']
+        self._assert_counters(1, 4)
+
+        self._post('rating_runner_0', reverse('review:edit_review_flutter', args=[review_id]), {
+            'rating': 1, 'review_text': 'Berubah pikiran',
+        })
+        self._assert_counters(1, 1)
+
+        self._post('rating_runner_0', reverse('review:delete_review_flutter', args=[review_id]), {})
+        self._assert_counters(0, 0)
+
+    def test_dashboard_reads_stored_counters(self):
+        Review.objects.create(runner=self.runners[0], event=self.event, event_organizer=self.organizer, rating=5)
+        EventOrganizer.objects.filter(pk=self.organizer.pk).update(review_count=1, rating_sum=5, rating=5.0)
+        self.client.login(username='rating_eo', email='rating_eo@example.com', password='password123')
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('event_organizer:dashboard'))
+        self.assertEqual(response.context['organizer_average_rating'], 5.0)
+        self.assertEqual(response.context['organizer_total_reviews'], 1)
+
+    def test_deleting_event_removes_its_reviews_from_counters(self):
+        self._post('rating_runner_0', reverse('review:create_review', args=[self.event.id]), {'rating': 4})
+        self.client.login(username='rating_eo', email='rating_eo@example.com', password='password123')
+        self.client.post(reverse('event:delete_event', args=[self.event.id]))
+        self._assert_counters(0, 0)
+
+    def test_reconcile_repairs_drift(self):
+        # bulk_create/admin tidak melewati ratings.py
+        Review.objects.bulk_create([
+            Review(runner=runner, event=self.event, event_organizer=self.organizer, rating=rating)
+            for runner, rating in zip(self.runners, (5, 2))
+        ])
+        drift = find_rating_drift()
+        self.assertEqual(drift[0]['stored'], (0, 0))
+        self.assertEqual(drift[0]['actual'], (2, 7))
+
+        out = StringIO()
+        call_command('reconcile_organizer_ratings', stdout=out)
+        self.assertIn('1 diperbaiki', out.getvalue())
+        self._assert_counters(2, 7)
+        self.assertEqual(reconcile_organizer_ratings(), (1, [], 0))
@@ -5,13 +5,13 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth import update_session_auth_hash, logout
 from django.contrib.auth.forms import PasswordChangeForm
-from django.db.models import Avg, Count, Prefetch
 from apps.event.models import Event
 from apps.main.models import User
 from .models import EventOrganizer
 from apps.review.models import Review
-from datetime import date
 from django.views.decorators.csrf import csrf_exempt
+from apps.main.profile_cache import get_profile_payload
+from spot_runner.payload_cache import cached_payload, conditional_feed
 
 
 @login_required
@@ -25,24 +25,8 @@ def dashboard_view(request):
         defaults={'base_location': ''}
     )
 
-    events = Event.objects.filter(user_eo=organizer)
-    today = date.today()
-    updated_events = []
-    
-    for event in events:
-        if event.event_status not in ['finished', 'cancelled']:
-            event_date = event.event_date.date()
-            new_status = event.event_status
-            if event_date < today:
-                new_status = "finished"
-            elif event_date == today:
-                new_status = "on_going"
-            elif event.regist_deadline.date() < today:
-                pass
-            if new_status != event.event_status:
-                event.event_status = new_status
-                event.save()
-        updated_events.append(event)
+    # Status event diupdate oleh command transition_event_status, dashboard hanya membaca
+    updated_events = list(Event.objects.filter(user_eo=organizer))
 
     total_events = len(updated_events)
     ongoing_events = [e for e in updated_events if e.event_status == 'on_going'] 
@@ -55,13 +39,9 @@ def dashboard_view(request):
         'event'
     ).order_by('-created_at')
 
-    stats = reviews.aggregate(
-        avg=Avg('rating'),
-        count=Count('rating')
-    )
-
-    avg_rating = round(stats['avg'] or 0, 2)
-    review_count = stats['count'] or 0
+    # Rating dan jumlah review disimpan di organizer (dipelihara oleh ratings.py)
+    avg_rating = round(organizer.rating, 2)
+    review_count = organizer.review_count
 
     context = {
         'organizer': organizer,
@@ -110,14 +90,9 @@ def show_profile(request, username=None):
         'event'
     ).order_by('-created_at')
     
-    # Hitung average rating dan total review count
-    review_stats = reviews.aggregate(
-        avg_rating=Avg('rating'),
-        total_reviews=Count('id')
-    )
-    
-    overall_avg_rating = round(review_stats['avg_rating'] or 0, 1)
-    overall_review_count = review_stats['total_reviews'] or 0
+    # Average rating dan total review count tersimpan di organizer (ratings.py)
+    overall_avg_rating = round(organizer.rating, 1)
+    overall_review_count = organizer.review_count
     
     context = {
         'organizer': organizer,
@@ -334,8 +309,10 @@ def delete_account_flutter(request):
         'message': 'Account deleted'
     })
 
+@conditional_feed('organizer')
+@cached_payload('organizer')
 def show_json(request):
-    """Show all Event Organizers data in JSON format"""
+    """Show all Event Organizers data in JSON format (di-cache, lihat spot_runner/payload_cache.py)"""
     organizers = EventOrganizer.objects.select_related('user').all()
     
     data = []
@@ -363,6 +340,20 @@ def show_json(request):
         'data': data
     })
 
+def _organizer_profile_payload(user):
+    organizer = EventOrganizer.objects.get(user=user)
+    return {
+        'profile_picture': organizer.profile_picture or None,
+        'base_location': organizer.base_location,
+        'total_events': organizer.total_events,
+        'rating': organizer.rating,
+        'review_count': organizer.review_count,
+        'coin': organizer.coin,
+        'created_at': organizer.created_at.isoformat(),
+        'updated_at': organizer.updated_at.isoformat(),
+    }
+
+
 @login_required
 def profile_json(request):
     """
@@ -370,11 +361,11 @@ def profile_json(request):
     (Used by Flutter Profile Screen)
     """
     try:
-        organizer = EventOrganizer.objects.select_related('user').get(
-            user=request.user
-        )
+        # Statistik organizer di-cache per user (apps/main/profile_cache.py),
+        # field user diambil dari request.user tanpa query
+        organizer_data = get_profile_payload(request.user.pk, 'organizer_profile', lambda: _organizer_profile_payload(request.user))
 
-        user = organizer.user
+        user = request.user
 
         return JsonResponse({
             'status': 'success',
@@ -386,9 +377,9 @@ def profile_json(request):
                 'last_name': user.last_name,
 
                 # Profile-specific
-                'name': organizer.name,
-                'profile_picture': organizer.profile_picture or None,
-                'base_location': organizer.base_location,
+                'name': f"{user.first_name} {user.last_name}".strip() or user.username,
+                'profile_picture': organizer_data['profile_picture'],
+                'base_location': organizer_data['base_location'],
 
                 # Metadata
                 'joined': user.date_joined.strftime('%Y-%m-%d'),
@@ -396,13 +387,13 @@ def profile_json(request):
                     if user.last_login else None,
 
                 # Stats
-                'total_events': organizer.total_events,
-                'rating': organizer.rating,
-                'review_count': organizer.review_count,
-                'coin': organizer.coin,
+                'total_events': organizer_data['total_events'],
+                'rating': organizer_data['rating'],
+                'review_count': organizer_data['review_count'],
+                'coin': organizer_data['coin'],
 
-                'created_at': organizer.created_at.isoformat(),
-                'updated_at': organizer.updated_at.isoformat(),
+                'created_at': organizer_data['created_at'],
+                'updated_at': organizer_data['updated_at'],
             }
         })
 
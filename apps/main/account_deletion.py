@@ -0,0 +1,152 @@
+"""
+Hapus akun secara set-based.
+
+Kursi semua event yang masih diikuti runner dilepas dengan satu UPDATE
+agregat (Event di-join ke Attendance 'attending' milik runner), bukan
+decrement_participans() per event. Data milik runner lalu dihapus per chunk
+(transaksi pendek) sebelum baris user dihapus.
+
+Akun dengan data besar (> ASYNC_THRESHOLD baris) dihapus di background:
+kursi langsung dilepas dan akun dinonaktifkan, sisanya diproses oleh
+`python manage.py process_account_deletions`. Status bisa dicek lewat
+api/delete-account/status/<id>/.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.event.counters import SEAT_FIELDS, release_seat, seats_changed
+from apps.event.models import Event
+from apps.event.signals import events_updated
+from apps.event_organizer.ratings import reviews_removed
+from apps.merchandise.models import Redemption
+from apps.review.models import Review
+from .models import AccountDeletion, Attendance, RegistrationTicket, User, WaitlistEntry
+from .profile_cache import invalidate_profiles
+from .registration import promote_waitlist
+
+DELETE_CHUNK_SIZE = 500
+ASYNC_THRESHOLD = 1000
+
+
+def release_runner_seats(runner):
+    """Lepas kursi semua event 'attending' milik runner. Mengembalikan id event yang terdampak."""
+    with transaction.atomic():
+        attending = Attendance.objects.filter(runner=runner, status='attending')
+        rows = list(
+            attending.select_for_update(of=('self',))
+            .values_list('event_id', 'event__counter_shards')
+        )
+        if not rows:
+            return []
+
+        # Satu UPDATE untuk semua event ber-counter biasa (WHERE id IN (subquery attendance))
+        Event.objects.filter(
+            counter_shards=0,
+            total_participans__gt=0,
+            attendance_records__runner=runner,
+            attendance_records__status='attending',
+        ).update(total_participans=F('total_participans') - 1, full=False)
+        attending.update(status='canceled')
+        invalidate_profiles([runner.pk])
+
+        # Event ber-shard (jarang): kursi dikembalikan ke shard masing-masing
+        for event_id, shards in rows:
+            if shards:
+                release_seat(event_id, shards=shards)
+                seats_changed(event_id, shards)
+        plain = [event_id for event_id, shards in rows if not shards]
+        if plain:
+            events_updated.send(sender=Event, event_ids=plain, fields=SEAT_FIELDS)
+
+        # Kursi yang dilepas langsung diberikan ke waitlist event tersebut
+        WaitlistEntry.objects.filter(runner=runner).delete()
+        event_ids = [event_id for event_id, _ in rows]
+        waiting = WaitlistEntry.objects.filter(event_id__in=event_ids)
+        for event_id in waiting.order_by().values_list('event_id', flat=True).distinct():
+            promote_waitlist(event_id)
+    return event_ids
+
+
+def _delete_in_chunks(queryset, chunk_size=DELETE_CHUNK_SIZE, before_delete=None):
+    """
+    Hapus isi queryset per `chunk_size` baris, satu transaksi pendek per chunk.
+    `before_delete(chunk)` dipanggil di transaksi yang sama sebelum chunk dihapus.
+    """
+    deleted = 0
+    model = queryset.model
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            chunk = model.objects.filter(pk__in=ids)
+            if before_delete is not None:
+                before_delete(chunk)
+            chunk.delete()
+        deleted += len(ids)
+
+
+def _runner_querysets(runner):
+    return [
+        WaitlistEntry.objects.filter(runner=runner),
+        RegistrationTicket.objects.filter(runner=runner),
+        Attendance.objects.filter(runner=runner),
+        Review.objects.filter(runner=runner),
+        Redemption.objects.filter(user=runner),
+    ]
+
+
+def account_size(user):
+    """Jumlah baris milik akun yang ikut terhapus (untuk memilih hapus langsung atau background)."""
+    runner = getattr(user, 'runner', None)
+    if runner is None:
+        return 0
+    return sum(queryset.count() for queryset in _runner_querysets(runner))
+
+
+def delete_account(user, chunk_size=DELETE_CHUNK_SIZE):
+    """Lepas kursi, hapus data runner per chunk, lalu hapus user."""
+    runner = getattr(user, 'runner', None)
+    if runner is not None:
+        release_runner_seats(runner)
+        for queryset in _runner_querysets(runner):
+            # Review yang dihapus dikurangkan dari counter rating organizer
+            before_delete = reviews_removed if queryset.model is Review else None
+            _delete_in_chunks(queryset, chunk_size, before_delete)
+    user.delete()
+
+
+def request_account_deletion(user):
+    """
+    Antrikan hapus akun di background. Kursi langsung dilepas dan akun dinonaktifkan
+    agar tidak bisa login lagi; datanya dihapus oleh process_account_deletions().
+    """
+    runner = getattr(user, 'runner', None)
+    with transaction.atomic():
+        if runner is not None:
+            release_runner_seats(runner)
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        return AccountDeletion.objects.create(user_id=user.pk, username=user.username)
+
+
+def process_account_deletions(limit=10):
+    """Proses permintaan hapus akun yang antri. Mengembalikan jumlah yang diproses."""
+    with transaction.atomic():
+        jobs = AccountDeletion.objects.filter(status='queued').order_by('requested_at')
+        if transaction.get_connection().features.has_select_for_update_skip_locked:
+            jobs = jobs.select_for_update(skip_locked=True)
+        jobs = list(jobs[:limit])
+        AccountDeletion.objects.filter(pk__in=[job.pk for job in jobs]).update(status='running')
+
+    for job in jobs:
+        try:
+            user = User.objects.filter(pk=job.user_id).first()
+            if user is not None:
+                delete_account(user)
+            job.status, job.error = 'done', ''
+        except Exception as e:
+            job.status, job.error = 'failed', str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+    return len(jobs)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, Runner, Attendance
+from .models import User, Runner, Attendance, WaitlistEntry, RegistrationTicket, AccountDeletion
 
 
 # ======================
@@ -80,4 +80,38 @@ class AttendanceAdmin(admin.ModelAdmin):
     def event_name(self, obj):
         """Menampilkan nama event."""
         return obj.event.name
-    event_name.short_description = "Event"
\ No newline at end of file
+    event_name.short_description = "Event"
+
+# ======================
+# 4️⃣ Waitlist Admin
+# ======================
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('runner', 'event', 'category', 'joined_at')
+    search_fields = ('runner__user__username', 'event__name')
+    readonly_fields = ('joined_at',)
+    ordering = ('event', 'id')
+
+
+# ======================
+# 5️⃣ Registration Ticket Admin
+# ======================
+@admin.register(RegistrationTicket)
+class RegistrationTicketAdmin(admin.ModelAdmin):
+    list_display = ('runner', 'event', 'status', 'result', 'created_at', 'processed_at')
+    list_filter = ('status', 'result')
+    search_fields = ('runner__user__username', 'event__name')
+    readonly_fields = ('created_at', 'processed_at')
+    ordering = ('-created_at',)
+
+
+# ======================
+# 6️⃣ Account Deletion Admin
+# ======================
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ('username', 'status', 'requested_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('username',)
+    readonly_fields = ('user_id', 'username', 'requested_at', 'finished_at', 'error')
+    ordering = ('-requested_at',)
@@ -0,0 +1,149 @@
+"""
+Admission control untuk api_participate_event dan api_participate_group saat event ramai diserbu.
+
+Setiap event punya token bucket: maksimal REGISTRATION_ADMISSION['BURST'] token,
+diisi ulang 'RATE' token per detik, satu token per registrasi. Request yang masih dapat token
+langsung diproses; sisanya disimpan sebagai RegistrationTicket dan diproses
+berurutan oleh drainer (`python manage.py drain_registration_queue --interval 1`)
+per batch, sehingga database menerima laju tulis yang stabil. Klien mem-polling
+status tiket.
+
+Nonaktif secara default (ENABLED=False). Jika diaktifkan, drainer WAJIB berjalan:
+selama masih ada tiket antri, registrasi baru untuk event itu ikut antri.
+
+Bucket disimpan di tabel AdmissionBucket (satu baris per event). Isi ulang dan
+pengambilan token terjadi di satu UPDATE bersyarat
+(tokens = min(BURST, tokens + selisih waktu * RATE) - n, hanya jika hasilnya >= 0),
+jadi berlaku sama untuk semua worker/host tanpa lock di proses dan tidak pernah
+meloloskan lebih dari BURST sekaligus. Waktu memakai wall-clock (time.time()).
+Cache bersama tidak dipakai karena incr() DatabaseCache (default production) tidak atomik.
+Konsekuensinya setiap registrasi yang lolos admission melakukan satu UPDATE pendek
+di baris bucket event tersebut; registrasi itu sendiri tetap di luar transaksi ini.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from .models import AdmissionBucket, RegistrationTicket
+from .registration import register_or_waitlist
+
+DEFAULT_ADMISSION = {
+    'ENABLED': False,
+    'RATE': 20,         # token (registrasi) yang diisi ulang per detik per event
+    'BURST': 40,        # kapasitas bucket, registrasi maksimum sekaligus
+    'BATCH_SIZE': 100,  # tiket per batch drainer
+}
+
+RESULT_ERROR = 'error'
+
+
+def admission_settings():
+    return {**DEFAULT_ADMISSION, **getattr(settings, 'REGISTRATION_ADMISSION', {})}
+
+
+def _take_from_bucket(event_id, count, rate, burst, now):
+    # Jam host lain yang sedikit di belakang tidak mengurangi token
+    elapsed = Greatest(Value(now) - F('refilled_at'), Value(0.0))
+    refilled = Least(F('tokens') + elapsed * Value(float(rate)), Value(float(burst)))
+    return AdmissionBucket.objects.filter(GreaterThanOrEqual(refilled, count), event_id=event_id).update(
+        tokens=refilled - count,
+        refilled_at=Greatest(F('refilled_at'), Value(now)),
+    ) > 0
+
+
+def take_tokens(event_id, count=1, now=None):
+    """
+    Ambil `count` token registrasi event (semua atau tidak sama sekali).
+    False jika event sedang melebihi rate.
+    """
+    config = admission_settings()
+    if not config['ENABLED']:
+        return True
+    rate, burst = config['RATE'], config['BURST']
+    if rate <= 0 or count > burst:
+        return False
+    now = time.time() if now is None else now
+    if _take_from_bucket(event_id, count, rate, burst, now):
+        return True
+    _, created = AdmissionBucket.objects.get_or_create(
+        event_id=event_id, defaults={'tokens': burst - count, 'refilled_at': now},
+    )
+    # Bucket sudah ada: dibuat request lain bersamaan (coba sekali lagi) atau memang kosong
+    return created or _take_from_bucket(event_id, count, rate, burst, now)
+
+
+def take_token(event_id, now=None):
+    """Ambil satu jatah registrasi event. False jika event sedang melebihi rate."""
+    return take_tokens(event_id, 1, now)
+
+
+def admit(runner, event, category):
+    """
+    None jika request boleh langsung diproses, atau tiket antrian.
+    Jika event masih punya antrian, request baru ikut antri agar urutan tetap adil.
+    """
+    if not admission_settings()['ENABLED']:
+        return None
+    queued = RegistrationTicket.objects.filter(event=event, status='queued')
+    existing = queued.filter(runner=runner).first()
+    if existing is not None:
+        return existing
+    if not queued.exists() and take_token(event.pk):
+        return None
+    return RegistrationTicket.objects.create(runner=runner, event=event, category=category)
+
+
+def admit_group(event, size):
+    """
+    True jika registrasi grup `size` anggota boleh langsung diproses. Grup memakai `size`
+    jatah sekaligus dan tidak diantrikan (semua atau tidak sama sekali), jadi saat event
+    sedang antri atau melebihi rate grup ditolak dan klien mencoba lagi.
+    """
+    if not admission_settings()['ENABLED']:
+        return True
+    if RegistrationTicket.objects.filter(event=event, status='queued').exists():
+        return False
+    return take_tokens(event.pk, size)
+
+
+def queue_position(ticket):
+    """Posisi tiket di antrian event-nya (1 = berikutnya), None jika sudah diproses."""
+    if ticket.status != 'queued':
+        return None
+    return RegistrationTicket.objects.filter(
+        event_id=ticket.event_id, status='queued', created_at__lte=ticket.created_at,
+    ).count()
+
+
+def _next_batch(batch_size):
+    tickets = RegistrationTicket.objects.filter(status='queued').order_by('created_at')
+    if transaction.get_connection().features.has_select_for_update_skip_locked:
+        # Beberapa drainer paralel mengambil batch yang berbeda (PostgreSQL)
+        tickets = tickets.select_for_update(skip_locked=True, of=('self',))
+    return list(tickets.select_related('runner__user', 'event', 'category')[:batch_size])
+
+
+def drain_registration_queue(batch_size=None):
+    """Proses satu batch tiket antrian (tertua dulu). Mengembalikan jumlah tiket."""
+    batch_size = batch_size or admission_settings()['BATCH_SIZE']
+    with transaction.atomic():
+        tickets = _next_batch(batch_size)
+        for ticket in tickets:
+            try:
+                with transaction.atomic():
+                    ticket.result, ticket.waitlist_position = register_or_waitlist(
+                        ticket.runner, ticket.event, ticket.category,
+                    )
+            except Exception:
+                ticket.result, ticket.waitlist_position = RESULT_ERROR, None
+            ticket.status = 'processed'
+            ticket.processed_at = timezone.now()
+        RegistrationTicket.objects.bulk_update(
+            tickets, ['status', 'result', 'waitlist_position', 'processed_at'],
+        )
+    return len(tickets)
@@ -0,0 +1,73 @@
+"""
+Pembayaran koin event ke runner yang menyelesaikan event.
+
+Setiap attendance 'finished' yang hasilnya sudah masuk lewat ingest_results
+(result_recorded_at terisi) di event 'finished' mendapat Event.coin sekali.
+Transisi status event juga menandai semua peserta 'attending' sebagai 'finished',
+jadi status saja tidak membedakan finisher dari peserta yang tidak hadir.
+Per batch (COIN_AWARD_BATCH_SIZE attendance, satu transaksi pendek):
+1. CoinAward dibuat dengan bulk_create(ignore_conflicts=True) dan penanda batch
+   baru; attendance yang sudah pernah dibayar bentrok di unique attendance dan
+   dilewati.
+2. Runner.coin dinaikkan dengan satu UPDATE ... SET coin = coin + N untuk runner
+   yang award-nya masuk di batch ini.
+Menjalankan ulang (atau beberapa worker sekaligus) tidak pernah membayar dua kali.
+"""
+import uuid
+
+from django.db import transaction
+from django.db.models import F
+
+from apps.event.models import Event
+from .models import Attendance, CoinAward, Runner
+from .profile_cache import invalidate_profiles
+
+COIN_AWARD_BATCH_SIZE = 1000
+
+
+def _pending_attendances(event_id):
+    return Attendance.objects.filter(
+        event_id=event_id, status='finished', result_recorded_at__isnull=False, coin_award__isnull=True,
+    ).order_by('id')
+
+
+def award_event_coins(event_id, amount, batch_size=COIN_AWARD_BATCH_SIZE):
+    """Bayar koin event ke semua finisher yang belum dibayar. Mengembalikan jumlah runner yang dikredit."""
+    if amount <= 0:
+        return 0
+    awarded = 0
+    while True:
+        with transaction.atomic():
+            rows = list(_pending_attendances(event_id).values_list('id', 'runner_id')[:batch_size])
+            if not rows:
+                return awarded
+            batch = uuid.uuid4()
+            CoinAward.objects.bulk_create([
+                CoinAward(attendance_id=attendance_id, runner_id=runner_id, event_id=event_id, amount=amount, batch=batch)
+                for attendance_id, runner_id in rows
+            ], ignore_conflicts=True)
+            # Satu runner hanya punya satu attendance per event, jadi +amount sekali per runner
+            awarded += Runner.objects.filter(coin_awards__batch=batch).update(coin=F('coin') + amount)
+            invalidate_profiles(runner_id for _, runner_id in rows)
+
+
+def award_finished_events(event_ids=None, batch_size=COIN_AWARD_BATCH_SIZE):
+    """
+    Bayar koin untuk event 'finished' (semua, atau hanya `event_ids`).
+    Mengembalikan {event_id: jumlah runner yang dikredit} untuk event yang membayar.
+    """
+    events = Event.objects.filter(
+        event_status='finished',
+        coin__gt=0,
+        attendance_records__status='finished',
+        attendance_records__result_recorded_at__isnull=False,
+        attendance_records__coin_award__isnull=True,
+    ).distinct()
+    if event_ids is not None:
+        events = events.filter(pk__in=event_ids)
+    results = {}
+    for event_id, amount in list(events.values_list('pk', 'coin')):
+        awarded = award_event_coins(event_id, amount, batch_size)
+        if awarded:
+            results[event_id] = awarded
+    return results
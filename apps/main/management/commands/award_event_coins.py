@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.coins import COIN_AWARD_BATCH_SIZE, award_finished_events
+
+
+class Command(BaseCommand):
+    help = "Bayar koin event ke finisher (hasil lomba sudah di-ingest) yang belum dibayar (aman dijalankan ulang)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', help="ID event (default: semua event finished)")
+        parser.add_argument('--batch-size', type=int, default=COIN_AWARD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        results = award_finished_events(options['event_ids'] or None, batch_size=options['batch_size'])
+        for event_id, awarded in results.items():
+            self.stdout.write(f"{event_id}: {awarded} runner dikredit")
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(results.values())} runner mendapat koin dari {len(results)} event."
+        ))
@@ -0,0 +1,339 @@
+import json
+import math
+import random
+import subprocess
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.event.models import Event, EventCategory
+from apps.event.read_model import rebuild_event_read_model
+from apps.event.search import get_search_backend
+from apps.event_organizer.models import EventOrganizer
+from apps.event_organizer.ratings import repair_rating_drift
+from apps.main.models import Attendance, Runner, User
+from apps.merchandise.models import Merchandise, Redemption
+from apps.review.models import Review
+
+# Jumlah data per scale factor 1
+ORGANIZERS_PER_SCALE = 5
+RUNNERS_PER_SCALE = 100
+EVENTS_PER_SCALE = 100
+ATTENDANCES_PER_RUNNER = 5
+REVIEWS_PER_RUNNER = 2
+MERCHANDISE_PER_ORGANIZER = 4
+REDEMPTIONS_PER_RUNNER = 2
+
+BATCH_SIZE = 1000
+PERCENTILES = (50, 95, 99)
+# Jumlah request yang diukur memorinya (tracemalloc memperlambat request)
+MEMORY_SAMPLE_REQUESTS = 3
+
+
+class Rollback(Exception):
+    pass
+
+
+def benchmark_caches():
+    """
+    Cache lokal proses khusus benchmark: payload, versi namespace, bucket admission dan
+    cache profil dari data sintetis tidak pernah masuk (atau menghapus) cache bersama.
+    """
+    return {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'benchmark-{uuid.uuid4().hex}',
+            'KEY_PREFIX': 'benchmark',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile dari list yang sudah terurut."""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate data sintetis (bulk insert) dengan scale factor tertentu, lalu ukur "
+        "latency p50/p95/p99, query per request, dan peak memory endpoint utama (output JSON)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help="Scale factor data sintetis (default 1)")
+        parser.add_argument('--requests', type=int, default=50, help="Jumlah request per endpoint (default 50)")
+        parser.add_argument('--seed', type=int, default=42, help="Seed random agar data bisa diulang")
+        parser.add_argument('--output', default='', help="Tulis hasil JSON ke file ini (default stdout)")
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help="Pakai database aktif di dalam transaksi yang di-rollback, bukan database test terpisah",
+        )
+
+    def handle(self, *args, **options):
+        if options['scale'] < 1 or options['requests'] < 1:
+            raise CommandError("--scale dan --requests minimal 1")
+
+        with override_settings(CACHES=benchmark_caches()):
+            if options['current_db']:
+                report = self.run_in_rollback(options)
+            else:
+                # Database test terpisah agar database development tidak tersentuh
+                old_name = connection.settings_dict['NAME']
+                connection.creation.create_test_db(verbosity=0, autoclobber=True)
+                try:
+                    report = self.run(options)
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"✅ Hasil benchmark ditulis ke {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def run_in_rollback(self, options):
+        report = None
+        try:
+            with transaction.atomic():
+                report = self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+        return report
+
+    def run(self, options):
+        # Cache benchmark (benchmark_caches) selalu kosong di awal, cache bersama tidak disentuh
+        started = time.perf_counter()
+        dataset = self.generate(options['scale'], random.Random(options['seed']))
+        seed_seconds = time.perf_counter() - started
+
+        return {
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'scale': options['scale'],
+            'requests_per_endpoint': options['requests'],
+            'dataset': dataset['counts'],
+            'seed_seconds': round(seed_seconds, 3),
+            'endpoints': self.measure_endpoints(dataset, options['requests']),
+        }
+
+    # ==========================
+    # Data sintetis
+    # ==========================
+
+    def generate(self, scale, rng):
+        password = make_password('benchmark-pass')
+        now = timezone.now()
+        cities = [code for code, _ in Event.cities]
+
+        organizer_users = User.objects.bulk_create([
+            User(username=f'bench_eo_{i}', email=f'bench_eo_{i}@example.com', password=password, role='event_organizer')
+            for i in range(ORGANIZERS_PER_SCALE * scale)
+        ], batch_size=BATCH_SIZE)
+        runner_users = User.objects.bulk_create([
+            User(username=f'bench_runner_{i}', email=f'bench_runner_{i}@example.com', password=password, role='runner')
+            for i in range(RUNNERS_PER_SCALE * scale)
+        ], batch_size=BATCH_SIZE)
+
+        organizers = EventOrganizer.objects.bulk_create([
+            EventOrganizer(user=user, base_location=rng.choice(cities), coin=0)
+            for user in organizer_users
+        ], batch_size=BATCH_SIZE)
+        runners = Runner.objects.bulk_create([
+            Runner(user=user, base_location=rng.choice(cities), coin=1_000_000)
+            for user in runner_users
+        ], batch_size=BATCH_SIZE)
+
+        categories = [
+            EventCategory.objects.get_or_create(category=code)[0]
+            for code, _ in EventCategory.CATEGORY_CHOICES
+        ]
+
+        events = []
+        for i in range(EVENTS_PER_SCALE * scale):
+            event_date = now + timedelta(days=rng.randint(-60, 120), hours=rng.randint(0, 23))
+            if event_date.date() < now.date():
+                status = 'finished'
+            elif event_date.date() == now.date():
+                status = 'on_going'
+            else:
+                status = 'coming_soon'
+            events.append(Event(
+                user_eo=rng.choice(organizers),
+                name=f'Benchmark Run {i}',
+                description=f'Synthetic marathon event number {i} for load testing.',
+                location=rng.choice(cities),
+                event_date=event_date,
+                regist_deadline=event_date - timedelta(days=7),
+                contact='08123456789',
+                capacity=rng.randint(50, 1000),
+                event_status=status,
+                coin=rng.randint(10, 100),
+            ))
+        events = Event.objects.bulk_create(events, batch_size=BATCH_SIZE)
+
+        Event.event_category.through.objects.bulk_create([
+            Event.event_category.through(event=event, eventcategory=category)
+            for event in events
+            for category in rng.sample(categories, rng.randint(1, 2))
+        ], batch_size=BATCH_SIZE)
+
+        attendances = []
+        reviews = []
+        participants = {}
+        for runner in runners:
+            attended = rng.sample(events, min(ATTENDANCES_PER_RUNNER, len(events)))
+            for event in attended:
+                finished = event.event_status == 'finished'
+                attendances.append(Attendance(
+                    runner=runner,
+                    event=event,
+                    status='finished' if finished else 'attending',
+                ))
+                participants[event.pk] = participants.get(event.pk, 0) + 1
+            for event in attended[:REVIEWS_PER_RUNNER]:
+                reviews.append(Review(
+                    runner=runner,
+                    event=event,
+                    event_organizer=event.user_eo,
+                    rating=rng.randint(1, 5),
+                    review_text='Synthetic review for load testing.',
+                ))
+        Attendance.objects.bulk_create(attendances, batch_size=BATCH_SIZE)
+        Review.objects.bulk_create(reviews, batch_size=BATCH_SIZE)
+        # bulk_create tidak melewati ratings.py, counter organizer dihitung ulang sekali
+        repair_rating_drift({event.user_eo_id for event in events})
+
+        for event in events:
+            event.total_participans = min(participants.get(event.pk, 0), event.capacity)
+            event.full = event.total_participans >= event.capacity
+        Event.objects.bulk_update(events, ['total_participans', 'full'], batch_size=BATCH_SIZE)
+
+        merchandise = Merchandise.objects.bulk_create([
+            Merchandise(
+                name=f'Benchmark Merch {i}',
+                price_coins=rng.randint(10, 200),
+                organizer=organizer,
+                description='Synthetic merchandise for load testing.',
+                image_url='https://example.com/merch.png',
+                stock=1_000_000,
+            )
+            for i, organizer in enumerate(organizers)
+            for _ in range(MERCHANDISE_PER_ORGANIZER)
+        ], batch_size=BATCH_SIZE)
+        redemptions = []
+        for runner in runners:
+            for item in rng.sample(merchandise, min(REDEMPTIONS_PER_RUNNER, len(merchandise))):
+                redemptions.append(Redemption(
+                    user=runner,
+                    merchandise=item,
+                    quantity=1,
+                    price_per_item=item.price_coins,
+                    total_coins=item.price_coins,
+                ))
+        Redemption.objects.bulk_create(redemptions, batch_size=BATCH_SIZE)
+
+        # bulk_create tidak memicu signal, bangun read model & index pencarian sekaligus
+        rebuild_event_read_model()
+        get_search_backend().rebuild()
+
+        return {
+            'runner': runner_users[0],
+            'merchandise': merchandise[0],
+            'counts': {
+                'organizers': len(organizers),
+                'runners': len(runners),
+                'events': len(events),
+                'attendances': len(attendances),
+                'reviews': len(reviews),
+                'merchandise': len(merchandise),
+                'redemptions': len(redemptions),
+            },
+        }
+
+    # ==========================
+    # Pengukuran endpoint
+    # ==========================
+
+    def endpoints(self, dataset):
+        runner = dataset['runner']
+        merchandise = dataset['merchandise']
+        redeem_body = json.dumps({'quantity': 1})
+        return {
+            'show_main': (None, lambda client: client.get(reverse('main:show_main'))),
+            'show_json': (None, lambda client: client.get(reverse('event:show_json'))),
+            'show_json_page': (None, lambda client: client.get(reverse('event:show_json'), {'limit': 20})),
+            'show_user_json': (runner, lambda client: client.get(reverse('main:show_user_json', args=[runner.username]))),
+            'redeem_merchandise': (runner, lambda client: client.post(
+                reverse('merchandise:redeem_merchandise', args=[merchandise.id]),
+                redeem_body,
+                content_type='application/json',
+            )),
+            'get_all_reviews': (None, lambda client: client.get(reverse('review:get_all_reviews'))),
+        }
+
+    def measure_endpoints(self, dataset, request_count):
+        results = {}
+        for name, (user, call) in self.endpoints(dataset).items():
+            client = Client(HTTP_HOST='localhost')
+            if user is not None:
+                client.force_login(user)
+            call(client)  # warm-up (cache, koneksi, template)
+
+            latencies = []
+            query_counts = []
+            errors = 0
+            for _ in range(request_count):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = call(client)
+                    if getattr(response, 'streaming', False):
+                        b''.join(response.streaming_content)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                query_counts.append(len(queries))
+                errors += int(response.status_code >= 400)
+
+            tracemalloc.start()
+            try:
+                for _ in range(min(MEMORY_SAMPLE_REQUESTS, request_count)):
+                    call(client)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            latencies.sort()
+            results[name] = {
+                **{f'p{p}_ms': round(percentile(latencies, p), 3) for p in PERCENTILES},
+                'mean_ms': round(sum(latencies) / len(latencies), 3),
+                'queries_per_request': round(sum(query_counts) / len(query_counts), 2),
+                'max_queries': max(query_counts),
+                'peak_memory_kb': round(peak / 1024, 1),
+                'errors': errors,
+            }
+        return results
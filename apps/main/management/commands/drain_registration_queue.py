@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.event.counters import flush_seat_counts
+from apps.main.admission import admission_settings, drain_registration_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Proses antrian registrasi (RegistrationTicket) per batch dengan laju tulis yang stabil, "
+        "lalu sinkronkan counter peserta event ber-shard"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help="Jalankan terus, satu batch setiap N detik (0 = kosongkan antrian lalu berhenti)",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=0,
+            help="Jumlah tiket per batch (default REGISTRATION_ADMISSION['BATCH_SIZE'])",
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        batch_size = options['batch_size'] or admission_settings()['BATCH_SIZE']
+        total = 0
+        while True:
+            processed = drain_registration_queue(batch_size)
+            total += processed
+            if processed:
+                self.stdout.write(f"{processed} tiket registrasi diproses.")
+            # Sinkronkan snapshot total_participans event ber-shard yang tertinggal
+            flush_seat_counts()
+            if interval <= 0:
+                if processed:
+                    continue
+                break
+            time.sleep(interval)
+        self.stdout.write(self.style.SUCCESS(f"Selesai, {total} tiket registrasi diproses."))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.main.account_deletion import process_account_deletions
+
+
+class Command(BaseCommand):
+    help = "Proses permintaan hapus akun yang diantrikan (akun dengan data besar)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help="Jalankan terus setiap N detik (0 = kosongkan antrian lalu berhenti)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            processed = process_account_deletions()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"{processed} akun dihapus."))
+            if interval <= 0:
+                if processed:
+                    continue
+                break
+            time.sleep(interval)
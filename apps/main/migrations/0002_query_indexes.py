@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0005_query_indexes'),
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['runner', 'status'], name='attendance_runner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['event', 'status'], name='attendance_event_status_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0005_query_indexes'),
+        ('main', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='event.eventcategory')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='event.event')),
+                ('runner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='main.runner')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['event', 'id'], name='waitlist_event_order_idx')],
+                'unique_together': {('runner', 'event')},
+            },
+        ),
+    ]
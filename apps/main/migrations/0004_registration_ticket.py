@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:23
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0005_query_indexes'),
+        ('main', '0003_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationTicket',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('processed', 'Processed')], default='queued', max_length=20)),
+                ('result', models.CharField(blank=True, max_length=30)),
+                ('waitlist_position', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='event.eventcategory')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registration_tickets', to='event.event')),
+                ('runner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registration_tickets', to='main.runner')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='ticket_status_created_idx'), models.Index(fields=['event', 'status'], name='ticket_event_status_idx')],
+            },
+        ),
+    ]
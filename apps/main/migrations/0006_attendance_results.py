@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_account_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='finish_time',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='result_recorded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0007_job_checkpoint'),
+        ('main', '0006_attendance_results'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoinAward',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.PositiveIntegerField()),
+                ('batch', models.UUIDField(db_index=True)),
+                ('awarded_at', models.DateTimeField(auto_now_add=True)),
+                ('attendance', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='coin_award', to='main.attendance')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coin_awards', to='event.event')),
+                ('runner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coin_awards', to='main.runner')),
+            ],
+        ),
+    ]
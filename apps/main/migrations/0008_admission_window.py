@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_coin_award'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdmissionWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.UUIDField()),
+                ('window', models.BigIntegerField()),
+                ('admitted', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('event_id', 'window'), name='admission_window_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0009_participant_change'),
+        ('main', '0009_create_cache_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdmissionBucket',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='admission_bucket', serialize=False, to='event.event')),
+                ('tokens', models.FloatField()),
+                ('refilled_at', models.FloatField()),
+            ],
+        ),
+        migrations.DeleteModel(
+            name='AdmissionWindow',
+        ),
+    ]
@@ -48,12 +48,175 @@ class Attendance(models.Model):
     
     registered_at = models.DateTimeField(auto_now_add=True)
 
+    # Hasil lomba, diisi lewat ingest hasil (apps/event/results.py)
+    finish_time = models.DurationField(null=True, blank=True)
+    result_recorded_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         unique_together = ('runner', 'event') 
+        indexes = [
+            # Attendance aktif milik runner (edit profil, hapus akun)
+            models.Index(fields=['runner', 'status'], name='attendance_runner_status_idx'),
+            # Peserta per event (transisi status, rekap peserta)
+            models.Index(fields=['event', 'status'], name='attendance_event_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.runner.user.username} @ {self.event.name} ({self.status})"
 
+class WaitlistEntry(models.Model):
+    """Antrian FIFO runner untuk event yang sudah penuh (urutan = id)."""
+
+    runner = models.ForeignKey(
+        'main.Runner',
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+
+    event = models.ForeignKey(
+        'event.Event',
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+
+    category = models.ForeignKey(
+        'event.EventCategory',
+        on_delete=models.SET_NULL,
+        null=True
+    )
+
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('runner', 'event')
+        ordering = ['id']
+        indexes = [
+            # Antrian per event & hitung posisi
+            models.Index(fields=['event', 'id'], name='waitlist_event_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.runner.user.username} waiting for {self.event.name}"
+
+class RegistrationTicket(models.Model):
+    """Registrasi yang diantrikan admission control saat event kebanjiran request."""
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('processed', 'Processed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    runner = models.ForeignKey(
+        'main.Runner',
+        on_delete=models.CASCADE,
+        related_name='registration_tickets'
+    )
+
+    event = models.ForeignKey(
+        'event.Event',
+        on_delete=models.CASCADE,
+        related_name='registration_tickets'
+    )
+
+    category = models.ForeignKey(
+        'event.EventCategory',
+        on_delete=models.SET_NULL,
+        null=True
+    )
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    # Hasil registrasi (joined, rejoined, waitlisted, already_registered, error)
+    result = models.CharField(max_length=30, blank=True)
+    waitlist_position = models.PositiveIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Drainer mengambil tiket antrian tertua lebih dulu
+            models.Index(fields=['status', 'created_at'], name='ticket_status_created_idx'),
+            models.Index(fields=['event', 'status'], name='ticket_event_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.runner.user.username} -> {self.event.name} ({self.status})"
+
+class AdmissionBucket(models.Model):
+    """Token bucket admission control registrasi per event (lihat apps/main/admission.py)."""
+
+    event = models.OneToOneField(
+        'event.Event',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='admission_bucket'
+    )
+
+    tokens = models.FloatField()
+    # Unix time (time.time()) saat tokens terakhir diisi ulang
+    refilled_at = models.FloatField()
+
+    def __str__(self):
+        return f"{self.event_id}: {self.tokens:.2f}"
+
+class CoinAward(models.Model):
+    """Koin yang sudah dibayarkan untuk satu attendance (unik, agar tidak pernah dibayar dua kali)."""
+
+    attendance = models.OneToOneField(
+        'main.Attendance',
+        on_delete=models.CASCADE,
+        related_name='coin_award'
+    )
+
+    runner = models.ForeignKey(
+        'main.Runner',
+        on_delete=models.CASCADE,
+        related_name='coin_awards'
+    )
+
+    event = models.ForeignKey(
+        'event.Event',
+        on_delete=models.CASCADE,
+        related_name='coin_awards'
+    )
+
+    amount = models.PositiveIntegerField()
+    # Penanda batch yang memasukkan baris ini; hanya runner di batch ini yang dikredit
+    batch = models.UUIDField(db_index=True)
+    awarded_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.amount} coins to {self.runner_id} for {self.event_id}"
+
+class AccountDeletion(models.Model):
+    """Permintaan hapus akun yang diproses di background (akun dengan data besar)."""
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Bukan ForeignKey: baris ini harus tetap ada setelah user dihapus
+    user_id = models.BigIntegerField(db_index=True)
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'requested_at'], name='deletion_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Delete {self.username} ({self.status})"
+
 class Runner(models.Model):
 
     user = models.OneToOneField(
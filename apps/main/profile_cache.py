@@ -0,0 +1,67 @@
+"""
+Cache payload profil per user untuk endpoint profil Flutter
+(api_profile, show_user_json, dan profile_json event organizer).
+
+Yang di-cache hanya bagian yang butuh query (profil runner/organizer, attendance,
+review, jumlah event); field dari request.user (username, email, last_login)
+diisi langsung saat respons dibuat, jadi cache hit tidak menjalankan SQL sama sekali.
+
+Key per user: profile:<user_id>:<jenis>. Semua jenis milik user dihapus oleh
+invalidate_profiles() setiap kali data user berubah:
+- signal post_save/post_delete Attendance, Review, Redemption, Runner, EventOrganizer
+  dan User (lihat signals.py), serta Event (nama/status/tanggal di attendance list,
+  jumlah event organizer);
+- pemanggilan langsung di jalur yang memakai update()/bulk_create()/bulk_update()
+  (registrasi, cancel, waitlist, registrasi grup, hapus akun, hasil lomba, koin).
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from spot_runner.payload_cache import cache_stats
+from .models import Attendance
+
+PROFILE_KINDS = ('api_profile', 'runner_profile', 'organizer_profile')
+PROFILE_CACHE_TIMEOUT = 3600
+# Jumlah key per cache.delete_many
+INVALIDATE_BATCH_SIZE = 1000
+
+
+def _profile_key(user_id, kind):
+    return f'profile:{user_id}:{kind}'
+
+
+def get_profile_payload(user_id, kind, build):
+    """Payload profil user dari cache, atau hasil build() yang lalu disimpan."""
+    key = _profile_key(user_id, kind)
+    payload = cache.get(key)
+    cache_stats.record('profile', hit=payload is not None)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, PROFILE_CACHE_TIMEOUT)
+    return payload
+
+
+def _delete_keys(user_ids):
+    keys = [_profile_key(user_id, kind) for user_id in user_ids for kind in PROFILE_KINDS]
+    for start in range(0, len(keys), INVALIDATE_BATCH_SIZE):
+        cache.delete_many(keys[start:start + INVALIDATE_BATCH_SIZE])
+
+
+def invalidate_profiles(user_ids):
+    """Hapus payload profil user (id Runner/EventOrganizer sama dengan id user)."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    _delete_keys(user_ids)
+    # Request lain bisa meng-cache data lama sebelum transaksi ini commit, hapus lagi setelahnya
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _delete_keys(user_ids))
+
+
+def invalidate_event_attendees(event_ids):
+    """Hapus payload profil semua runner yang pernah mendaftar ke event ini."""
+    event_ids = list(event_ids)
+    if event_ids:
+        invalidate_profiles(
+            Attendance.objects.filter(event_id__in=event_ids).values_list('runner_id', flat=True).iterator()
+        )
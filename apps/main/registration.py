@@ -0,0 +1,252 @@
+"""
+Registrasi runner ke event (dipakai view web dan API Flutter).
+
+Kuota dijaga oleh Event.objects.reserve_seat(): satu UPDATE bersyarat yang
+gagal jika event sudah penuh, sehingga registrasi paralel tidak pernah
+melebihi capacity dan tidak perlu mengunci/menyimpan ulang seluruh baris event.
+
+Event dengan counter_shards > 0 memakai counter ber-shard (apps/event/counters.py);
+fungsi di sini memanggil counters.reserve_seats()/release_seat() yang memilih
+jalur yang sesuai.
+
+Runner yang kehabisan kursi masuk waitlist FIFO (WaitlistEntry). Kursi yang
+dilepas saat cancel langsung diberikan ke antrian terdepan dalam transaksi yang
+sama, dan promote_waitlist() mengisi kursi baru saat capacity dinaikkan.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from apps.event.counters import release_seat, reserve_seats, seat_counts, seats_changed, shard_count
+from apps.event.models import Event
+from .models import Attendance, Runner, WaitlistEntry
+from .profile_cache import invalidate_profiles
+
+JOINED = 'joined'
+REJOINED = 'rejoined'
+ALREADY_REGISTERED = 'already_registered'
+SOLD_OUT = 'sold_out'
+WAITLISTED = 'waitlisted'
+
+# Batas anggota per request registrasi grup
+MAX_GROUP_SIZE = 200
+
+
+class GroupRegistrationError(Exception):
+    """Registrasi grup ditolak seluruhnya. `errors` berisi alasan per anggota."""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+
+def register_runner(runner, event, category):
+    """
+    Daftarkan runner ke event. Mengembalikan JOINED, REJOINED,
+    ALREADY_REGISTERED, atau SOLD_OUT (langsung, tanpa menyentuh Attendance).
+    """
+    if event.counter_shards:
+        total, full = seat_counts(event.pk)
+    else:
+        total, full = event.total_participans, event.full
+    if full or total >= event.capacity:
+        # Jalur cepat saat sold out, UPDATE bersyarat tetap jadi penentu akhir
+        return SOLD_OUT
+
+    with transaction.atomic():
+        attendance = Attendance.objects.filter(runner=runner, event=event).first()
+        if attendance is not None and attendance.status != 'canceled':
+            return ALREADY_REGISTERED
+
+        if not reserve_seats(event.pk, 1, shards=event.counter_shards):
+            return SOLD_OUT
+
+        if attendance is None:
+            # Jika runner yang sama mendaftar dua kali bersamaan, unique (runner, event)
+            # membatalkan transaksi ini beserta kursinya
+            Attendance.objects.create(runner=runner, event=event, status='attending', category=category)
+            result = JOINED
+        else:
+            attendance.status = 'attending'
+            attendance.category = category
+            attendance.save(update_fields=['status', 'category'])
+            result = REJOINED
+
+        WaitlistEntry.objects.filter(runner=runner, event=event).delete()
+        seats_changed(event.pk, event.counter_shards)
+    return result
+
+
+def register_or_waitlist(runner, event, category):
+    """
+    Seperti register_runner, tapi runner masuk waitlist jika event penuh.
+    Mengembalikan (hasil, posisi waitlist atau None).
+    """
+    result = register_runner(runner, event, category)
+    if result != SOLD_OUT:
+        return result, None
+    if Attendance.objects.filter(runner=runner, event=event).exclude(status='canceled').exists():
+        return ALREADY_REGISTERED, None
+    entry, _ = WaitlistEntry.objects.get_or_create(runner=runner, event=event, defaults={'category': category})
+    # Kursi bisa dilepas di antara SOLD_OUT dan get_or_create (promote milik cancel itu
+    # belum melihat entri ini), jadi isi ulang kursi kosong dari antrian sekarang
+    if promote_waitlist(event.pk) and not WaitlistEntry.objects.filter(pk=entry.pk).exists():
+        return JOINED, None
+    return WAITLISTED, waitlist_position(entry)
+
+
+def waitlist_position(entry):
+    """Posisi (mulai dari 1) entri di antrian event-nya."""
+    return WaitlistEntry.objects.filter(event_id=entry.event_id, id__lte=entry.id).count()
+
+
+def leave_waitlist(runner, event):
+    return WaitlistEntry.objects.filter(runner=runner, event=event).delete()[0] > 0
+
+
+def _next_entries(event_id, count):
+    # skip_locked: beberapa cancel paralel mengambil entri yang berbeda (PostgreSQL)
+    entries = WaitlistEntry.objects.filter(event_id=event_id).order_by('id')
+    if transaction.get_connection().features.has_select_for_update_skip_locked:
+        entries = entries.select_for_update(skip_locked=True)
+    return list(entries[:count])
+
+
+def _promote(event_id, entries):
+    """Ubah entri waitlist menjadi Attendance 'attending'. Kursi sudah dipegang pemanggil."""
+    by_runner = {entry.runner_id: entry for entry in entries}
+    existing = list(Attendance.objects.filter(event_id=event_id, runner_id__in=by_runner))
+    for attendance in existing:
+        attendance.status = 'attending'
+        attendance.category_id = by_runner[attendance.runner_id].category_id
+    Attendance.objects.bulk_update(existing, ['status', 'category'])
+
+    existing_runner_ids = {attendance.runner_id for attendance in existing}
+    Attendance.objects.bulk_create([
+        Attendance(runner_id=entry.runner_id, event_id=event_id, status='attending', category_id=entry.category_id)
+        for entry in entries if entry.runner_id not in existing_runner_ids
+    ])
+    WaitlistEntry.objects.filter(id__in=[entry.id for entry in entries]).delete()
+    invalidate_profiles(by_runner)
+
+
+def cancel_registration(attendance):
+    """
+    Batalkan attendance 'attending'. Kursinya langsung diberikan ke runner terdepan di
+    waitlist, atau dikembalikan ke kuota jika antrian kosong. False jika tidak ada yang dibatalkan.
+    """
+    with transaction.atomic():
+        canceled = Attendance.objects.filter(pk=attendance.pk, status='attending').update(status='canceled')
+        if not canceled:
+            # Sudah dibatalkan/selesai oleh request lain, samakan status di objek
+            attendance.refresh_from_db(fields=['status'])
+            return False
+        invalidate_profiles([attendance.runner_id])
+        entries = _next_entries(attendance.event_id, 1)
+        if entries:
+            _promote(attendance.event_id, entries)
+        else:
+            shards = shard_count(attendance.event_id)
+            release_seat(attendance.event_id, shards=shards)
+            seats_changed(attendance.event_id, shards)
+    attendance.status = 'canceled'
+    return True
+
+
+def promote_waitlist(event_id):
+    """
+    Isi kursi kosong dari waitlist (mis. setelah organizer menaikkan capacity).
+    Semua runner yang dipromosikan diproses sekaligus. Mengembalikan jumlahnya.
+    """
+    with transaction.atomic():
+        seats = Event.objects.filter(pk=event_id).values_list('capacity', 'total_participans', 'counter_shards').first()
+        if seats is None:
+            return 0
+        capacity, total, shards = seats
+        if shards:
+            total = seat_counts(event_id, use_cache=False)[0]
+        if capacity <= total:
+            return 0
+        entries = _next_entries(event_id, capacity - total)
+        if not entries or not reserve_seats(event_id, len(entries), shards=shards):
+            return 0
+        _promote(event_id, entries)
+        seats_changed(event_id, shards)
+    return len(entries)
+
+
+def register_group(event, members):
+    """
+    Daftarkan banyak runner sekaligus. `members` = [(username, category_key), ...].
+
+    Validasi memakai beberapa query berbasis set (bukan per anggota), kursi diambil
+    dengan satu reserve_seats(), lalu Attendance dibuat dengan bulk_create.
+    Semua anggota berhasil atau tidak ada sama sekali (GroupRegistrationError).
+    Mengembalikan list Attendance yang dibuat/diaktifkan kembali.
+    """
+    if not members:
+        raise GroupRegistrationError("No members given")
+    if len(members) > MAX_GROUP_SIZE:
+        raise GroupRegistrationError(f"A group can register at most {MAX_GROUP_SIZE} members")
+
+    usernames = [username for username, _ in members]
+    duplicates = sorted(username for username, count in Counter(usernames).items() if count > 1)
+    if duplicates:
+        raise GroupRegistrationError("Duplicate members", [
+            {"username": username, "error": "duplicate"} for username in duplicates
+        ])
+
+    runners = {
+        runner.user.username: runner
+        for runner in Runner.objects.select_related('user').filter(user__username__in=usernames)
+    }
+    categories = {
+        category.category: category
+        for category in event.event_category.filter(category__in={key for _, key in members})
+    }
+    errors = []
+    for username, category_key in members:
+        if username not in runners:
+            errors.append({"username": username, "error": "unknown_runner"})
+        elif category_key not in categories:
+            errors.append({"username": username, "error": "invalid_category"})
+    if errors:
+        raise GroupRegistrationError("Some members are invalid", errors)
+
+    with transaction.atomic():
+        existing = {
+            attendance.runner_id: attendance
+            for attendance in Attendance.objects.filter(
+                event=event, runner_id__in=[runner.pk for runner in runners.values()]
+            )
+        }
+        registered = [
+            {"username": username, "error": "already_registered"}
+            for username, _ in members
+            if runners[username].pk in existing and existing[runners[username].pk].status != 'canceled'
+        ]
+        if registered:
+            raise GroupRegistrationError("Some members are already registered", registered)
+
+        if not reserve_seats(event.pk, len(members), shards=event.counter_shards):
+            raise GroupRegistrationError(f"Not enough seats left for {len(members)} members")
+
+        rejoined = []
+        created = []
+        for username, category_key in members:
+            runner = runners[username]
+            attendance = existing.get(runner.pk)
+            if attendance is None:
+                created.append(Attendance(runner=runner, event=event, status='attending', category=categories[category_key]))
+            else:
+                attendance.status = 'attending'
+                attendance.category = categories[category_key]
+                rejoined.append(attendance)
+        Attendance.objects.bulk_update(rejoined, ['status', 'category'])
+        Attendance.objects.bulk_create(created)
+        invalidate_profiles(runner.pk for runner in runners.values())
+
+        WaitlistEntry.objects.filter(event=event, runner_id__in=[runner.pk for runner in runners.values()]).delete()
+        seats_changed(event.pk, event.counter_shards)
+    return rejoined + created
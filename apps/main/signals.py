@@ -0,0 +1,85 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.event.models import Event
+from apps.event.reconcile import participant_changed
+from apps.event.signals import SEAT_FIELDS, events_updated
+from apps.event_organizer.models import EventOrganizer
+from apps.merchandise.models import Redemption
+from apps.review.models import Review
+from .models import Attendance, Runner, User
+from .profile_cache import invalidate_event_attendees, invalidate_profiles
+
+# ==========================
+# Cache payload profil per user (profile_cache.py)
+# ==========================
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_runner_profile(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_profiles([instance.runner_id])
+
+
+@receiver(post_save, sender=Redemption)
+@receiver(post_delete, sender=Redemption)
+def invalidate_profile_on_redemption(sender, instance, raw=False, **kwargs):
+    # Redemption.user adalah Runner (pk = id user)
+    if raw:
+        return
+    invalidate_profiles([instance.user_id])
+
+
+@receiver(post_save, sender=Runner)
+@receiver(post_delete, sender=Runner)
+@receiver(post_save, sender=EventOrganizer)
+@receiver(post_delete, sender=EventOrganizer)
+def invalidate_profile_on_role_profile_change(sender, instance, raw=False, **kwargs):
+    # Koin, base_location, statistik organizer
+    if raw:
+        return
+    invalidate_profiles([instance.user_id])
+
+
+@receiver(post_save, sender=User)
+def invalidate_profile_on_user_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_profiles([instance.pk])
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_profiles_on_event_change(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    # Jumlah event organizer, dan data event di attendance list peserta
+    if instance.user_eo_id:
+        invalidate_profiles([instance.user_eo_id])
+    if not created:
+        invalidate_event_attendees([instance.pk])
+
+
+@receiver(events_updated)
+def invalidate_profiles_on_bulk_event_update(sender, event_ids, fields=None, **kwargs):
+    # Kuota tidak ada di payload profil
+    if fields is not None and SEAT_FIELDS.issuperset(fields):
+        return
+    invalidate_event_attendees(event_ids)
+
+
+# ==========================
+# Rekonsiliasi peserta inkremental (apps/event/reconcile.py)
+# ==========================
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def record_participant_change(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    # Helper registrasi (create() dan save(update_fields=...)) sudah menyentuh read model;
+    # yang dicatat hanya hapus dan save penuh (admin, shell, cascade)
+    if raw or created or update_fields is not None:
+        return
+    participant_changed(instance.event_id)
@@ -1,14 +1,15 @@
 import json
 from datetime import date, timedelta
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages
 from django.utils import timezone 
 
 #
-from apps.main.models import User, Runner, Attendance
+from apps.main.models import User, Runner, Attendance, WaitlistEntry
 from apps.event.models import Event, EventCategory
+from apps.event.status import transition_event_statuses
 from apps.review.models import Review 
 
 
@@ -286,7 +287,7 @@ class UserProfileViewTests(BaseTestCase):
         self.assertEqual(response.context['user'], self.org_user)
         self.assertNotIn('attendance_list', response.context)
 
-    def test_show_user_updates_event_and_attendance_status(self):
+    def test_transition_updates_event_and_attendance_status(self):
         
         past_event = Event.objects.create(
             name='Past Event',
@@ -309,7 +310,12 @@ class UserProfileViewTests(BaseTestCase):
         self.assertEqual(past_attendance.status, 'attending')
         
         
+        # View profil hanya membaca, status diupdate oleh engine transisi
         self.client.get(self.user_profile_url)
+        past_event.refresh_from_db()
+        self.assertEqual(past_event.event_status, 'coming_soon')
+
+        transition_event_statuses()
         
         past_event.refresh_from_db()
         past_attendance.refresh_from_db()
@@ -492,7 +498,8 @@ class EventInteractionViewTests(BaseTestCase):
         
         messages = list(get_messages(response.wsgi_request))
         self.assertEqual(len(messages), 1)
-        self.assertIn(f"Sorry, {self.event_full.name} is already full.", str(messages[0]))
+        self.assertIn(f"{self.event_full.name} is full. You are #1 on the waitlist.", str(messages[0]))
+        self.assertFalse(Attendance.objects.filter(runner=self.runner, event=self.event_full).exists())
 
     def test_participate_event_invalid_category(self):
         if not self.event_detail_url:
@@ -593,3 +600,845 @@ class EventInteractionViewTests(BaseTestCase):
         messages = list(get_messages(response.wsgi_request))
         self.assertEqual(len(messages), 1)
         self.assertIn("You are not authorized to perform this action.", str(messages[0]))
+
+
+class SQLStatsTests(BaseTestCase):
+    """Tes middleware statistik SQL per view dan budget query."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from spot_runner.sql_stats import sql_stats
+        cache.clear()
+        sql_stats.reset()
+
+    def test_middleware_records_per_view(self):
+        from spot_runner.sql_stats import sql_stats
+        self.client.get(self.main_url)
+        self.client.get(self.main_url)
+        stats = sql_stats.snapshot()['main:show_main']
+        self.assertEqual(stats['requests'], 2)
+        self.assertGreater(stats['queries'], 0)
+        self.assertTrue(stats['slowest']['sql'].startswith('SELECT'))
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse('sql_stats')
+        self.client.login(username='testrunner', password=self.password)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save(update_fields=['is_staff'])
+        self.client.get(self.main_url)
+        data = self.client.get(url).json()
+        self.assertIn('main:show_main', data['views'])
+
+    def test_query_budget_fails_when_exceeded(self):
+        from spot_runner.sql_stats import query_budget
+        with self.assertRaises(AssertionError):
+            with query_budget('main:show_main', 0):
+                self.client.get(self.main_url)
+        with self.assertRaises(AssertionError):
+            with query_budget('main:show_main', 100):
+                pass
+
+    def test_view_budgets(self):
+        from spot_runner.sql_stats import query_budget
+        with query_budget('main:show_main', 10):
+            self.client.get(self.main_url)
+        with query_budget('main:show_all_users_json', 1):
+            self.client.get(reverse('main:show_all_users_json'))
+        with query_budget('event:show_json', 1):
+            self.client.get(reverse('event:show_json'))
+        self.client.login(username='testrunner', password=self.password)
+        with query_budget('main:show_user', 10):
+            self.client.get(self.user_profile_url)
+
+
+class BenchmarkCommandTests(TestCase):
+    """Tes command benchmark (mode --current-db, data di-rollback)."""
+
+    def test_benchmark_reports_endpoints_and_rolls_back(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        from django.core.cache import cache
+        from spot_runner.payload_cache import namespace_version
+
+        cache.set('benchmark_test:sentinel', 'kept')
+        event_version = namespace_version('event')
+        out = StringIO()
+        call_command('benchmark', '--current-db', '--requests', '2', stdout=out)
+        report = json.loads(out.getvalue())
+
+        # Cache bersama tidak dikosongkan dan tidak berisi versi/payload data sintetis
+        self.assertEqual(cache.get('benchmark_test:sentinel'), 'kept')
+        self.assertEqual(namespace_version('event'), event_version)
+
+        self.assertEqual(report['dataset']['events'], 100)
+        self.assertIn('show_main', report['endpoints'])
+        for name, result in report['endpoints'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+            self.assertIn('queries_per_request', result)
+            self.assertIn('peak_memory_kb', result)
+        self.assertFalse(User.objects.filter(username__startswith='bench_').exists())
+
+
+
+class SeatReservationTests(BaseTestCase):
+    """Tes reservasi kursi dengan UPDATE bersyarat."""
+
+    def test_reserve_seat_derives_full(self):
+        event = Event.objects.create(name='Two Seats', event_date=self.now + timedelta(days=3), capacity=2)
+        self.assertTrue(Event.objects.reserve_seat(event.pk))
+        event.refresh_from_db()
+        self.assertEqual((event.total_participans, event.full), (1, False))
+
+        self.assertTrue(Event.objects.reserve_seat(event.pk))
+        self.assertFalse(Event.objects.reserve_seat(event.pk))
+        event.refresh_from_db()
+        self.assertEqual((event.total_participans, event.full), (2, True))
+
+        self.assertTrue(Event.objects.release_seat(event.pk))
+        event.refresh_from_db()
+        self.assertEqual((event.total_participans, event.full), (1, False))
+
+    def test_sold_out_registration_returns_immediately(self):
+        from apps.main.registration import SOLD_OUT, register_runner
+        with self.assertNumQueries(0):
+            result = register_runner(self.runner, self.event_full, self.cat_5k)
+        self.assertEqual(result, SOLD_OUT)
+        self.assertFalse(Attendance.objects.filter(runner=self.runner, event=self.event_full).exists())
+
+    def test_register_and_cancel_update_read_model(self):
+        from apps.main.registration import JOINED, cancel_registration, register_runner
+        from apps.event.models import EventReadModel
+        self.assertEqual(register_runner(self.runner, self.event_to_join, self.cat_5k), JOINED)
+        payload = json.loads(EventReadModel.objects.get(event=self.event_to_join).payload)
+        self.assertEqual(payload['total_participans'], 1)
+
+        attendance = Attendance.objects.get(runner=self.runner, event=self.event_to_join)
+        self.assertTrue(cancel_registration(attendance))
+        self.assertFalse(cancel_registration(attendance))
+        self.event_to_join.refresh_from_db()
+        self.assertEqual(self.event_to_join.total_participans, 0)
+
+
+class WaitlistTests(BaseTestCase):
+    """Tes waitlist FIFO: posisi, promosi saat cancel, dan saat capacity naik."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.small_event = Event.objects.create(
+            name='Small Race', event_date=cls.now + timedelta(days=10), capacity=1,
+        )
+        cls.small_event.event_category.add(cls.cat_5k)
+        cls.waiting = []
+        for i in range(3):
+            user = UserModel.objects.create_user(
+                username=f'waiting{i}', email=f'waiting{i}@example.com', password=cls.password, role='runner',
+            )
+            cls.waiting.append(Runner.objects.create(user=user))
+
+    def fill_and_queue(self):
+        from apps.main.registration import JOINED, WAITLISTED, register_or_waitlist
+        self.assertEqual(register_or_waitlist(self.runner, self.small_event, self.cat_5k), (JOINED, None))
+        for position, runner in enumerate(self.waiting, start=1):
+            event = Event.objects.get(pk=self.small_event.pk)
+            self.assertEqual(register_or_waitlist(runner, event, self.cat_5k), (WAITLISTED, position))
+
+    def test_positions_are_fifo_and_rejoin_keeps_place(self):
+        from apps.main.registration import WAITLISTED, register_or_waitlist
+        self.fill_and_queue()
+        event = Event.objects.get(pk=self.small_event.pk)
+        self.assertEqual(register_or_waitlist(self.waiting[1], event, self.cat_5k), (WAITLISTED, 2))
+        self.assertEqual(WaitlistEntry.objects.filter(event=event).count(), 3)
+
+    def test_seat_released_while_joining_waitlist_is_taken(self):
+        from apps.main.registration import JOINED, cancel_registration, register_or_waitlist, register_runner
+        register_runner(self.runner, self.small_event, self.cat_5k)
+        stale_event = Event.objects.get(pk=self.small_event.pk)
+        # Kursi dilepas setelah pemanggil melihat event penuh (antrian masih kosong)
+        cancel_registration(Attendance.objects.get(runner=self.runner, event=self.small_event))
+
+        self.assertEqual(register_or_waitlist(self.waiting[0], stale_event, self.cat_5k), (JOINED, None))
+        self.assertFalse(WaitlistEntry.objects.filter(event=self.small_event).exists())
+        self.assertEqual(
+            Attendance.objects.get(runner=self.waiting[0], event=self.small_event).status, 'attending'
+        )
+
+    def test_cancel_promotes_next_runner(self):
+        from apps.main.registration import cancel_registration
+        self.fill_and_queue()
+        attendance = Attendance.objects.get(runner=self.runner, event=self.small_event)
+        self.assertTrue(cancel_registration(attendance))
+
+        promoted = Attendance.objects.get(runner=self.waiting[0], event=self.small_event)
+        self.assertEqual((promoted.status, promoted.category), ('attending', self.cat_5k))
+        self.small_event.refresh_from_db()
+        self.assertEqual((self.small_event.total_participans, self.small_event.full), (1, True))
+        self.assertEqual(
+            list(WaitlistEntry.objects.filter(event=self.small_event).values_list('runner', flat=True)),
+            [self.waiting[1].pk, self.waiting[2].pk],
+        )
+
+    def test_capacity_increase_promotes_in_bulk(self):
+        from apps.main.registration import promote_waitlist
+        self.fill_and_queue()
+        Event.objects.filter(pk=self.small_event.pk).update(capacity=3)
+        self.assertEqual(promote_waitlist(self.small_event.pk), 2)
+
+        self.small_event.refresh_from_db()
+        self.assertEqual((self.small_event.total_participans, self.small_event.full), (3, True))
+        self.assertEqual(Attendance.objects.filter(event=self.small_event, status='attending').count(), 3)
+        self.assertEqual(
+            list(WaitlistEntry.objects.filter(event=self.small_event).values_list('runner', flat=True)),
+            [self.waiting[2].pk],
+        )
+        self.assertEqual(promote_waitlist(self.small_event.pk), 0)
+
+    def test_waitlist_position_endpoint(self):
+        self.fill_and_queue()
+        url = reverse('main:api_waitlist_position', args=[self.small_event.pk])
+
+        self.client.force_login(self.waiting[1].user)
+        data = self.client.get(url).json()
+        self.assertEqual((data['status'], data['position'], data['waitlist_size']), ('waitlisted', 2, 3))
+
+        self.client.force_login(self.user)
+        data = self.client.get(url).json()
+        self.assertEqual((data['status'], data['position']), ('attending', None))
+
+    def test_api_participate_full_event_joins_waitlist(self):
+        self.fill_and_queue()
+        user = UserModel.objects.create_user(
+            username='latecomer', email='latecomer@example.com', password=self.password, role='runner',
+        )
+        Runner.objects.create(user=user)
+        self.client.force_login(user)
+        response = self.client.post(reverse(
+            'main:api_participate_event', args=[user.username, self.small_event.pk, self.cat_5k.category],
+        ))
+        self.assertEqual(response.json()['status'], 'waitlisted')
+        self.assertEqual(response.json()['position'], 4)
+
+
+class GroupRegistrationTests(BaseTestCase):
+    """Tes registrasi grup: set-based, satu reservasi kursi, semua atau tidak sama sekali."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.club_event = Event.objects.create(
+            name='Club Race', event_date=cls.now + timedelta(days=20), capacity=4,
+        )
+        cls.club_event.event_category.add(cls.cat_5k)
+        cls.members = []
+        for i in range(3):
+            user = UserModel.objects.create_user(
+                username=f'club{i}', email=f'club{i}@example.com', password=cls.password, role='runner',
+            )
+            cls.members.append(Runner.objects.create(user=user))
+        cls.url = reverse('main:api_participate_group', args=[cls.club_event.pk])
+
+    def post_group(self, usernames, category='5k'):
+        body = {'members': [{'username': username, 'category': category} for username in usernames]}
+        return self.client.post(self.url, json.dumps(body), content_type='application/json')
+
+    def test_group_registration_creates_all_attendances(self):
+        self.client.force_login(self.members[1].user)
+        usernames = [runner.user.username for runner in self.members]
+        # Jumlah query tetap, tidak bergantung jumlah anggota
+        with self.assertNumQueries(14):
+            response = self.post_group(usernames)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['registered'], 3)
+
+        self.club_event.refresh_from_db()
+        self.assertEqual((self.club_event.total_participans, self.club_event.full), (3, False))
+        self.assertEqual(Attendance.objects.filter(event=self.club_event, status='attending').count(), 3)
+
+    def test_group_fails_together_when_seats_run_out(self):
+        self.client.force_login(self.members[1].user)
+        Event.objects.filter(pk=self.club_event.pk).update(capacity=2)
+        response = self.post_group([runner.user.username for runner in self.members])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Attendance.objects.filter(event=self.club_event).exists())
+        self.club_event.refresh_from_db()
+        self.assertEqual(self.club_event.total_participans, 0)
+
+    def test_group_fails_together_on_invalid_member(self):
+        self.client.force_login(self.members[1].user)
+        Attendance.objects.create(runner=self.members[0], event=self.club_event, status='attending')
+        response = self.post_group([runner.user.username for runner in self.members] + ['ghost'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [{'username': 'ghost', 'error': 'unknown_runner'}])
+
+        response = self.post_group([runner.user.username for runner in self.members])
+        self.assertEqual(response.json()['errors'], [{'username': 'club0', 'error': 'already_registered'}])
+
+        response = self.post_group(['club1'], category='10k')
+        self.assertEqual(response.json()['errors'], [{'username': 'club1', 'error': 'invalid_category'}])
+        self.assertEqual(Attendance.objects.filter(event=self.club_event).count(), 1)
+
+    def test_caller_must_be_a_member(self):
+        self.client.force_login(self.user)
+        response = self.post_group(['club0', 'club1'])
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Attendance.objects.filter(event=self.club_event).exists())
+
+    def test_group_goes_through_admission(self):
+        from django.test import override_settings
+        self.client.force_login(self.members[1].user)
+        with override_settings(REGISTRATION_ADMISSION={'ENABLED': True, 'RATE': 1, 'BURST': 2}):
+            response = self.post_group([runner.user.username for runner in self.members])
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(Attendance.objects.filter(event=self.club_event).exists())
+
+    def test_group_reactivates_canceled_attendance(self):
+        self.client.force_login(self.members[1].user)
+        Attendance.objects.create(runner=self.members[0], event=self.club_event, status='canceled')
+        response = self.post_group(['club0', 'club1'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Attendance.objects.get(runner=self.members[0], event=self.club_event).status, 'attending',
+        )
+
+
+class AdmissionControlTests(BaseTestCase):
+    """Tes token bucket, tiket antrian, drainer, dan endpoint polling."""
+
+    def participate(self):
+        url = reverse('main:api_participate_event', args=[self.user.username, self.event_to_join.id, self.cat_5k.category])
+        return self.client.post(url)
+
+    def test_token_bucket_limits_rate(self):
+        from django.test import override_settings
+        from apps.main.admission import take_token, take_tokens
+        event_id = self.event_to_join.pk
+        with override_settings(REGISTRATION_ADMISSION={'ENABLED': True, 'RATE': 2, 'BURST': 4}):
+            # Bucket 4 token, diisi ulang 2 token per detik
+            self.assertTrue(take_tokens(event_id, 3, now=100.0))
+            self.assertFalse(take_tokens(event_id, 2, now=100.2))   # 1,4 token
+            self.assertTrue(take_token(event_id, now=100.3))        # 1,6 token
+            self.assertFalse(take_token(event_id, now=100.4))       # 0,8 token
+            self.assertTrue(take_tokens(event_id, 2, now=101.0))    # 2,0 token
+            # Setelah lama diam bucket hanya terisi sampai BURST, tidak ada lonjakan 2x BURST
+            self.assertTrue(take_tokens(event_id, 4, now=1000.0))
+            self.assertFalse(take_token(event_id, now=1000.0))
+            self.assertFalse(take_tokens(event_id, 5, now=2000.0))
+
+    def test_admission_disabled_by_default(self):
+        from apps.main.admission import admit, take_tokens
+        self.assertTrue(take_tokens(self.event_to_join.pk, 1000))
+        with self.assertNumQueries(0):
+            self.assertIsNone(admit(self.runner, self.event_to_join, self.cat_5k))
+
+    def test_over_rate_request_is_queued_then_drained(self):
+        from django.test import override_settings
+        from apps.main.admission import drain_registration_queue
+        from apps.main.models import RegistrationTicket
+        self.client.login(username='testrunner', password=self.password)
+
+        with override_settings(REGISTRATION_ADMISSION={'ENABLED': True, 'RATE': 0, 'BURST': 0}):
+            response = self.participate()
+            self.assertEqual(response.status_code, 202)
+            data = response.json()
+            self.assertEqual((data['status'], data['position']), ('queued', 1))
+            # Request ulang saat masih antri memakai tiket yang sama
+            self.assertEqual(self.participate().json()['ticket'], data['ticket'])
+
+        self.assertFalse(Attendance.objects.filter(runner=self.runner, event=self.event_to_join).exists())
+        poll = self.client.get(data['poll_url']).json()
+        self.assertEqual((poll['status'], poll['position'], poll['result']), ('queued', 1, None))
+
+        self.assertEqual(drain_registration_queue(), 1)
+        self.assertEqual(drain_registration_queue(), 0)
+        poll = self.client.get(data['poll_url']).json()
+        self.assertEqual((poll['status'], poll['position'], poll['result']), ('processed', None, 'joined'))
+        self.assertTrue(Attendance.objects.filter(runner=self.runner, event=self.event_to_join, status='attending').exists())
+        self.assertEqual(RegistrationTicket.objects.count(), 1)
+
+    def test_ticket_is_private_to_its_runner(self):
+        from apps.main.models import RegistrationTicket
+        ticket = RegistrationTicket.objects.create(runner=self.runner, event=self.event_to_join, category=self.cat_5k)
+        other = UserModel.objects.create_user(
+            username='snoop', email='snoop@example.com', password=self.password, role='runner',
+        )
+        self.client.force_login(other)
+        response = self.client.get(reverse('main:api_registration_ticket', args=[ticket.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class AccountDeletionTests(BaseTestCase):
+    """Tes hapus akun: kursi dilepas dengan satu UPDATE, data dihapus per chunk, mode background."""
+
+    def setUp(self):
+        self.extra_events = [
+            Event.objects.create(name=f'Extra {i}', event_date=self.now + timedelta(days=7), capacity=10, total_participans=1)
+            for i in range(5)
+        ]
+        Attendance.objects.bulk_create([
+            Attendance(runner=self.runner, event=event, status='attending', category=self.cat_5k)
+            for event in self.extra_events
+        ])
+
+    def test_release_seats_is_one_update_for_all_events(self):
+        from apps.main.account_deletion import release_runner_seats
+        # Jumlah query tetap berapa pun event yang diikuti (satu UPDATE untuk semua event)
+        with self.assertNumQueries(10):
+            event_ids = release_runner_seats(self.runner)
+        self.assertEqual(len(event_ids), 6)
+        self.assertEqual(
+            set(Event.objects.filter(pk__in=event_ids).values_list('total_participans', flat=True)), {0},
+        )
+        self.event_finished.refresh_from_db()
+        self.assertEqual(self.event_finished.total_participans, 1)
+
+    def test_delete_profile_releases_seats_and_deletes_in_chunks(self):
+        from apps.main.account_deletion import delete_account
+        delete_account(self.user, chunk_size=2)
+        self.assertFalse(UserModel.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Attendance.objects.filter(runner_id=self.user.pk).exists())
+        self.assertFalse(Review.objects.filter(runner_id=self.user.pk).exists())
+        self.event_coming.refresh_from_db()
+        self.assertEqual(self.event_coming.total_participans, 0)
+
+    def test_released_seat_promotes_waitlist(self):
+        from apps.main.account_deletion import delete_account
+        WaitlistEntry.objects.create(runner=self.other_runner, event=self.extra_events[0], category=self.cat_5k)
+        Event.objects.filter(pk=self.extra_events[0].pk).update(capacity=1, full=True)
+        delete_account(self.user)
+        self.assertTrue(Attendance.objects.filter(runner=self.other_runner, event=self.extra_events[0], status='attending').exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_async_deletion_via_api_and_status_endpoint(self):
+        from apps.main.account_deletion import process_account_deletions
+        self.client.login(username='testrunner', password=self.password)
+        response = self.client.post(
+            reverse('main:api_delete_account'),
+            json.dumps({'password': self.password, 'async': True}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+
+        # Kursi langsung dilepas dan akun tidak aktif, data dihapus oleh worker
+        self.event_coming.refresh_from_db()
+        self.assertEqual(self.event_coming.total_participans, 0)
+        self.assertFalse(UserModel.objects.get(pk=self.user.pk).is_active)
+        self.assertEqual(self.client.get(status_url).json()['status'], 'queued')
+
+        self.assertEqual(process_account_deletions(), 1)
+        self.assertFalse(UserModel.objects.filter(pk=self.user.pk).exists())
+        data = self.client.get(status_url).json()
+        self.assertEqual(data['status'], 'done')
+        self.assertIsNotNone(data['finished_at'])
+
+    def test_sync_delete_profile_view(self):
+        self.client.login(username='testrunner', password=self.password)
+        response = self.client.post(reverse('main:delete_profile', args=[self.user.username]), {'password': self.password})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(UserModel.objects.filter(pk=self.user.pk).exists())
+
+
+class CoinAwardTests(BaseTestCase):
+    """Tes pembayaran koin saat event selesai: set-based, idempotent, per batch."""
+
+    def setUp(self):
+        self.race = Event.objects.create(
+            name='Coin Race', event_date=self.now - timedelta(days=2), event_status='coming_soon', coin=25,
+        )
+        self.finishers = [self.runner, self.other_runner]
+        for runner in self.finishers:
+            Attendance.objects.create(runner=runner, event=self.race, status='attending', category=self.cat_5k)
+        self.canceled_user = UserModel.objects.create_user(
+            username='quitter', email='quitter@example.com', password=self.password, role='runner',
+        )
+        Attendance.objects.create(runner=Runner.objects.create(user=self.canceled_user), event=self.race, status='canceled')
+
+    def coins(self):
+        return dict(Runner.objects.values_list('user__username', 'coin'))
+
+    def record_results(self, *runners):
+        Attendance.objects.filter(event=self.race, runner__in=runners).update(result_recorded_at=self.now)
+
+    def test_transition_awards_finishers_once(self):
+        from apps.main.coins import award_finished_events
+        from apps.main.models import CoinAward
+        self.record_results(*self.finishers)
+        changed = transition_event_statuses()
+        self.assertEqual(changed['coins_awarded'], 2)
+        self.assertEqual(self.coins(), {'testrunner': 25, 'otherrunner': 25, 'quitter': 0})
+
+        # Dijalankan ulang: tidak ada pembayaran ganda
+        self.assertEqual(award_finished_events(), {})
+        transition_event_statuses()
+        self.assertEqual(self.coins(), {'testrunner': 25, 'otherrunner': 25, 'quitter': 0})
+        self.assertEqual(CoinAward.objects.filter(event=self.race).count(), 2)
+
+    def test_no_show_without_result_gets_no_coins(self):
+        from apps.main.coins import award_finished_events
+        self.record_results(self.runner)
+        changed = transition_event_statuses()
+        # otherrunner ikut ditandai 'finished' oleh transisi, tapi tidak punya hasil lomba
+        self.assertEqual(Attendance.objects.get(event=self.race, runner=self.other_runner).status, 'finished')
+        self.assertEqual(changed['coins_awarded'], 1)
+        self.assertEqual(self.coins(), {'testrunner': 25, 'otherrunner': 0, 'quitter': 0})
+
+        # Hasil yang masuk belakangan tetap dibayar
+        self.record_results(self.other_runner)
+        self.assertEqual(award_finished_events(), {self.race.pk: 1})
+        self.assertEqual(self.coins()['otherrunner'], 25)
+
+    def test_batches_are_bounded_and_skip_already_paid(self):
+        import uuid
+        from apps.main.coins import award_event_coins
+        from apps.main.models import CoinAward
+        Event.objects.filter(pk=self.race.pk).update(event_status='finished')
+        Attendance.objects.filter(event=self.race, status='attending').update(status='finished')
+        self.record_results(*self.finishers)
+        first = Attendance.objects.get(event=self.race, runner=self.runner)
+        CoinAward.objects.create(attendance=first, runner=self.runner, event=self.race, amount=25, batch=uuid.uuid4())
+
+        # Batch 1 baris: SELECT + INSERT + UPDATE runner per batch, lalu SELECT kosong
+        with self.assertNumQueries(8):
+            self.assertEqual(award_event_coins(self.race.pk, 25, batch_size=1), 1)
+        self.assertEqual(self.coins(), {'testrunner': 0, 'otherrunner': 25, 'quitter': 0})
+
+    def test_command_backfills_results_recorded_after_finish(self):
+        from io import StringIO
+        from django.core.management import call_command
+        Event.objects.filter(pk=self.race.pk).update(event_status='finished')
+        Attendance.objects.filter(event=self.race, runner=self.runner).update(status='finished')
+        self.record_results(self.runner)
+        out = StringIO()
+        call_command('award_event_coins', stdout=out)
+        self.assertIn('1 runner mendapat koin dari 1 event.', out.getvalue())
+        self.assertEqual(self.coins()['testrunner'], 25)
+
+
+class PayloadCacheTests(BaseTestCase):
+    """Tes cache payload JSON bersama (spot_runner/payload_cache.py) dan invalidasinya lewat signal."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from spot_runner.payload_cache import cache_stats
+        from apps.event_organizer.models import EventOrganizer
+        from apps.merchandise.models import Merchandise
+        cache.clear()
+        cache_stats.reset()
+        self.organizer = EventOrganizer.objects.create(user=self.org_user, base_location='depok')
+        self.merch = Merchandise.objects.create(
+            name='Finisher Tee', price_coins=10, organizer=self.organizer,
+            description='Tee', image_url='https://example.com/tee.png', stock=5,
+        )
+
+    def test_merchandise_list_is_served_from_cache_until_changed(self):
+        url = reverse('merchandise:merchandise_json')
+        self.assertEqual(self.client.get(url).json()[0]['stock'], 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()[0]['stock'], 5)
+
+        self.merch.stock = 2
+        self.merch.save()
+        self.assertEqual(self.client.get(url).json()[0]['stock'], 2)
+
+        # Organizer ganti nama: payload merchandise ikut berubah
+        self.org_user.first_name = 'Race'
+        self.org_user.save()
+        self.assertEqual(self.client.get(url).json()[0]['organizer']['name'], 'Race')
+
+    def test_merchandise_detail_is_owner_is_per_user(self):
+        url = reverse('merchandise:merchandise_detail_json', args=[self.merch.pk])
+        self.assertFalse(self.client.get(url).json()['is_owner'])
+        self.client.force_login(self.org_user)
+        self.assertTrue(self.client.get(url).json()['is_owner'])
+
+    def test_review_list_is_invalidated_on_review_change(self):
+        url = reverse('review:get_all_reviews')
+        params = {'event_id': str(self.event_finished.pk)}
+        self.client.force_login(self.user)
+        data = self.client.get(url, params).json()['data']
+        self.assertEqual(len(data), 1)
+        self.assertTrue(data[0]['is_owner'])
+
+        # Pengguna lain mendapat data yang sama dari cache, is_owner dihitung ulang
+        self.client.force_login(self.other_user)
+        self.assertFalse(self.client.get(url, params).json()['data'][0]['is_owner'])
+
+        Review.objects.create(runner=self.other_runner, event=self.event_finished, rating=4)
+        self.assertEqual(self.client.get(url, params).json()['count'], 2)
+
+        self.event_finished.name = 'Finished Run 2025'
+        self.event_finished.save()
+        self.assertEqual(self.client.get(url, params).json()['data'][0]['event_name'], 'Finished Run 2025')
+
+    def test_event_and_organizer_feeds_follow_signals(self):
+        event_url = reverse('event:show_json_by_id', args=[self.event_to_join.pk])
+        self.assertEqual(self.client.get(event_url).json()['total_participans'], 0)
+
+        # Perubahan kursi lewat update() + events_updated
+        from apps.main.registration import register_runner
+        register_runner(self.other_runner, self.event_to_join, self.cat_5k)
+        self.assertEqual(self.client.get(event_url).json()['total_participans'], 1)
+
+        organizer_url = reverse('event_organizer:show_json')
+        self.assertEqual(self.client.get(organizer_url).json()['data'][0]['total_events'], 0)
+        self.organizer.total_events = 3
+        self.organizer.save(update_fields=['total_events'])
+        self.assertEqual(self.client.get(organizer_url).json()['data'][0]['total_events'], 3)
+
+    def test_stats_are_counted_per_namespace(self):
+        from spot_runner.payload_cache import cache_stats
+        url = reverse('merchandise:merchandise_json')
+        self.client.get(url)
+        self.client.get(url)
+        stats = cache_stats.snapshot()
+        self.assertEqual((stats['merchandise']['hits'], stats['merchandise']['misses']), (1, 1))
+        self.assertIn('review', stats)
+
+        stats_url = reverse('cache_stats')
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(stats_url).status_code, 403)
+        self.user.is_staff = True
+        self.user.save(update_fields=['is_staff'])
+        self.assertEqual(self.client.get(stats_url).json()['namespaces']['merchandise']['hits'], 1)
+
+
+class EventCardFragmentCacheTests(BaseTestCase):
+    """Tes cache fragmen card_event.html yang di-key Event.updated_at."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from apps.event_organizer.models import EventOrganizer
+        cache.clear()
+        organizer = EventOrganizer.objects.create(user=self.org_user, base_location='depok')
+        Event.objects.filter(pk=self.event_to_join.pk).update(user_eo=organizer)
+        self.edit_url = reverse('event:edit_event', args=[self.event_to_join.pk])
+
+    def test_warm_cards_do_not_query_categories(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.client.get(self.main_url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.main_url)
+        self.assertContains(response, 'Joinable Run')
+        self.assertFalse(any('event_event_category' in query['sql'] for query in queries.captured_queries))
+
+    def test_owner_controls_are_rendered_per_viewer(self):
+        self.client.force_login(self.user)
+        self.assertNotContains(self.client.get(self.main_url), self.edit_url)
+        # Fragmen card sudah di-cache oleh runner, tombol edit tetap muncul untuk owner
+        self.client.force_login(self.org_user)
+        self.assertContains(self.client.get(self.main_url), self.edit_url)
+
+    def test_bulk_status_and_category_changes_refresh_cards(self):
+        self.client.get(self.main_url)
+        before = Event.objects.get(pk=self.event_to_join.pk).updated_at
+
+        Event.objects.filter(pk=self.event_to_join.pk).update(event_date=self.now - timedelta(hours=1))
+        transition_event_statuses(now=self.now)
+        after_status = Event.objects.get(pk=self.event_to_join.pk).updated_at
+        self.assertGreater(after_status, before)
+
+        self.event_to_join.event_category.add(self.cat_10k)
+        event = Event.objects.get(pk=self.event_to_join.pk)
+        self.assertGreater(event.updated_at, after_status)
+        card = self.client.get(self.main_url).content.decode()
+        card = card[card.index('Joinable Run'):]
+        card = card[:card.index('View Details')]
+        self.assertIn('10K', card)
+
+        # Perubahan kuota saja tidak mengubah versi card
+        from apps.event.signals import events_updated
+        events_updated.send(sender=Event, event_ids=[event.pk], fields=['total_participans', 'full'])
+        self.assertEqual(Event.objects.get(pk=event.pk).updated_at, event.updated_at)
+
+
+class ProfileCacheTests(BaseTestCase):
+    """Tes cache payload profil per user (apps/main/profile_cache.py)."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user_json_url = reverse('main:show_user_json', args=[self.user.username])
+        self.client.force_login(self.user)
+
+    def get_profile(self):
+        return self.client.get(self.user_json_url).json()
+
+    def test_cache_hit_runs_no_profile_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.assertEqual(len(self.get_profile()['attendance_list']), 2)
+        self.client.get(reverse('main:api_profile'))
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_profile()
+            self.client.get(reverse('main:api_profile'))
+        self.assertEqual(len(data['attendance_list']), 2)
+        # Hanya session dan user dari middleware auth
+        tables = ' '.join(query['sql'] for query in queries.captured_queries)
+        for table in ('main_runner', 'main_attendance', 'review_review', 'event_event'):
+            self.assertNotIn(table, tables)
+
+    def test_other_users_profile_is_forbidden(self):
+        response = self.client.get(reverse('main:show_user_json', args=[self.other_user.username]))
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(reverse('main:show_user_json', args=['nobody']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_is_invalidated_by_registration_and_coins(self):
+        from apps.main.coins import award_event_coins
+        from apps.main.registration import cancel_registration, register_runner
+        self.get_profile()
+
+        register_runner(self.runner, self.event_to_join, self.cat_5k)
+        statuses = {row['event']['name']: row['status'] for row in self.get_profile()['attendance_list']}
+        self.assertEqual(statuses['Joinable Run'], 'attending')
+
+        # cancel memakai queryset.update()
+        cancel_registration(Attendance.objects.get(runner=self.runner, event=self.event_to_join))
+        statuses = {row['event']['name']: row['status'] for row in self.get_profile()['attendance_list']}
+        self.assertEqual(statuses['Joinable Run'], 'canceled')
+
+        # Koin dikredit lewat UPDATE massal
+        Attendance.objects.filter(runner=self.runner, event=self.event_finished).update(result_recorded_at=timezone.now())
+        award_event_coins(self.event_finished.pk, 25)
+        self.assertEqual(self.get_profile()['coin'], 25)
+
+        # Nama event berubah, attendance list peserta ikut berubah
+        self.event_finished.name = 'Finished Run (Results)'
+        self.event_finished.save()
+        names = {row['event']['name'] for row in self.get_profile()['attendance_list']}
+        self.assertIn('Finished Run (Results)', names)
+
+    def test_review_changes_invalidate_profile(self):
+        self.assertEqual(len(self.get_profile()['user_reviews']), 1)
+        Review.objects.create(runner=self.runner, event=self.event_coming, rating=5, review_text='Great')
+        self.assertEqual(len(self.get_profile()['user_reviews']), 2)
+
+    def test_organizer_profile_counts_follow_events(self):
+        from apps.event_organizer.models import EventOrganizer
+        organizer = EventOrganizer.objects.create(user=self.org_user, base_location='depok')
+        self.client.force_login(self.org_user)
+        url = reverse('main:api_profile')
+        self.assertEqual(self.client.get(url).json()['details']['total_events'], 0)
+        Event.objects.create(user_eo=organizer, name='Org Run', event_date=self.now + timedelta(days=3))
+        self.assertEqual(self.client.get(url).json()['details']['total_events'], 1)
+
+        organizer_url = reverse('event_organizer:event_organizer_profile_json')
+        self.assertEqual(self.client.get(organizer_url).json()['data']['coin'], 0)
+        organizer.coin = 40
+        organizer.save()
+        data = self.client.get(organizer_url).json()['data']
+        self.assertEqual((data['coin'], data['username'], data['base_location']), (40, 'testorg', 'depok'))
+
+
+class ConditionalFeedTests(BaseTestCase):
+    """Tes conditional GET (ETag/Last-Modified) untuk feed JSON publik."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_unchanged_feed_answers_304_without_queries(self):
+        for url in (reverse('event:show_json'), reverse('merchandise:merchandise_json'), reverse('event_organizer:show_json')):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('public', response['Cache-Control'])
+            self.assertIn('must-revalidate', response['Cache-Control'])
+            with self.assertNumQueries(0):
+                revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(revalidated.status_code, 304)
+            revalidated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(revalidated.status_code, 304)
+
+    def test_change_marker_moves_on_write(self):
+        url = reverse('event:show_json')
+        etag = self.client.get(url)['ETag']
+        # Query string lain, ETag lain
+        self.assertNotEqual(self.client.get(url, {'location': 'bogor'})['ETag'], etag)
+
+        self.event_coming.name = 'Upcoming Run 2.0'
+        self.event_coming.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Upcoming Run 2.0')
+
+    def test_review_feed_is_private_per_user(self):
+        url = reverse('review:get_all_reviews')
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        self.client.force_login(self.other_user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+        Review.objects.create(runner=self.other_runner, event=self.event_finished, rating=3)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+class SeatReservationConcurrencyTests(TransactionTestCase):
+    """Registrasi paralel tidak boleh melebihi capacity."""
+
+    CAPACITY = 50
+    RUNNERS = 3000
+    THREADS = 16
+    # Database test SQLite in-memory (shared cache) langsung menolak writer kedua
+    # dengan "database table is locked" tanpa menunggu, jadi percobaan ulang memang
+    # diperlukan; lock yang tidak lepas setelah MAX_RETRIES adalah kegagalan
+    MAX_RETRIES = 500
+
+    def test_parallel_registrations_never_exceed_capacity(self):
+        import random
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from django.db import OperationalError, connection
+        from apps.main.registration import JOINED, SOLD_OUT, register_runner
+
+        category = EventCategory.objects.create(category='5k')
+        event = Event.objects.create(name='Hot Race', event_date=timezone.now() + timedelta(days=30), capacity=self.CAPACITY)
+        event.event_category.add(category)
+        users = UserModel.objects.bulk_create([
+            UserModel(username=f'rush{i}', email=f'rush{i}@example.com', role='runner')
+            for i in range(self.RUNNERS)
+        ])
+        runners = Runner.objects.bulk_create([Runner(user=user) for user in users])
+
+        retries = []
+
+        def register(runner):
+            try:
+                # Setiap thread memakai objek event sendiri (seperti request terpisah)
+                for attempt in range(self.MAX_RETRIES + 1):
+                    try:
+                        result = register_runner(runner, Event.objects.get(pk=event.pk), category)
+                    except OperationalError as e:
+                        # Hanya lock SQLite yang diulang, error lain langsung gagal
+                        if 'locked' not in str(e):
+                            raise
+                        time.sleep(min(0.001 * attempt, 0.02) * random.random())
+                        continue
+                    retries.append(attempt)
+                    return result
+                raise AssertionError(f'{runner.pk}: database tetap terkunci setelah {self.MAX_RETRIES} percobaan')
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            results = list(executor.map(register, runners))
+
+        # Setiap registrasi selesai dalam batas percobaan, dan jumlah percobaan ulangnya tercatat
+        self.assertEqual(len(retries), self.RUNNERS)
+        # Rata-rata kurang dari dua percobaan ulang per registrasi (terukur sekitar 0,8)
+        self.assertLess(sum(retries), 2 * self.RUNNERS, f'{sum(retries)} percobaan ulang, maksimum {max(retries)}')
+        event.refresh_from_db()
+        self.assertEqual(results.count(JOINED), self.CAPACITY)
+        self.assertEqual(results.count(SOLD_OUT), self.RUNNERS - self.CAPACITY)
+        self.assertEqual(event.total_participans, self.CAPACITY)
+        self.assertTrue(event.full)
+        self.assertEqual(Attendance.objects.filter(event=event, status='attending').count(), self.CAPACITY)
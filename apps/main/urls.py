@@ -1,5 +1,5 @@
 from django.urls import path
-from apps.main.views import register, show_main, login_user, show_user, logout_user, edit_profile_runner, cancel_event, participate_in_event, change_password, delete_profile, show_all_users_json, api_profile, api_events, show_all_users_json, show_user_json, api_participate_event, api_cancel_event, api_change_password, api_delete_account, api_edit_profile
+from apps.main.views import register, show_main, login_user, show_user, logout_user, edit_profile_runner, cancel_event, participate_in_event, change_password, delete_profile, show_all_users_json, api_profile, api_events, show_all_users_json, show_user_json, api_participate_event, api_cancel_event, api_participate_group, api_registration_ticket, api_waitlist_position, api_change_password, api_delete_account, api_delete_account_status, api_edit_profile
 from apps.event.views import create_event, show_event, show_xml, show_json, show_xml_by_id, show_json_by_id, edit_event, delete_event
 from apps.review.views import create_review
 
@@ -22,8 +22,12 @@ urlpatterns = [
     path('api/events/', api_events, name='api_events'),
     path('api/participate/<str:username>/<str:id>/<str:category_key>/', api_participate_event, name='api_participate_event'),
     path('api/cancel/<str:username>/<str:id>/', api_cancel_event, name='api_cancel_event'),
+    path('api/participate-group/<str:id>/', api_participate_group, name='api_participate_group'),
+    path('api/registration-ticket/<uuid:ticket_id>/', api_registration_ticket, name='api_registration_ticket'),
+    path('api/waitlist/<str:id>/', api_waitlist_position, name='api_waitlist_position'),
     path('api/change-password/', api_change_password, name='api_change_password'),
     path('api/delete-account/', api_delete_account, name='api_delete_account'),
+    path('api/delete-account/status/<uuid:job_id>/', api_delete_account_status, name='api_delete_account_status'),
     path('api/edit-profile/', api_edit_profile, name='api_edit_profile'),
 
 
@@ -1,11 +1,21 @@
-from datetime import date
 from django.shortcuts import render
 from django.http import HttpResponse, HttpResponseRedirect
 from django.urls import reverse
 from apps.main.models import User, Attendance, Runner
+from apps.main.models import AccountDeletion, RegistrationTicket, WaitlistEntry
+from apps.main.account_deletion import ASYNC_THRESHOLD, account_size, delete_account, request_account_deletion
+from apps.main.admission import admit, admit_group, queue_position
+from apps.main.profile_cache import get_profile_payload
+from apps.main.registration import (
+    JOINED, REJOINED, WAITLISTED, GroupRegistrationError,
+    cancel_registration, leave_waitlist, register_group, register_or_waitlist, waitlist_position,
+)
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash, get_user_model
 from apps.event.models import Event, EventCategory
+from apps.event.read_model import json_array, payloads_for
+from apps.event.proximity import base_city_for, parse_max_distance
+from apps.event.facets import facet_counts, get_event_facets
 from apps.review.models import Review
 from apps.event_organizer.models import EventOrganizer
 from django.http import JsonResponse
@@ -17,7 +27,6 @@ from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.contrib.auth import login, logout, authenticate
-from django.db import transaction
 import requests
 from django.views.decorators.csrf import csrf_exempt
 import json
@@ -32,30 +41,54 @@ def show_main(request):
     current_category = request.GET.get('category', '')
     current_location = request.GET.get('location', '')
     current_status = request.GET.get('status', '')
-    
+    search_query = request.GET.get('q', '').strip()
+
     # Query semua event, urutkan berdasarkan event_date (descending)
     # Atau bisa pakai '-event_date' untuk event terdekat di atas
     events = Event.objects.all().order_by('event_date')
-    
-    # Filter berdasarkan kategori jika ada
-    # Menggunakan event_category__category karena ini adalah ManyToMany
-    if current_category:
-        events = events.filter(event_category__category=current_category).distinct()
-    
-    # Filter berdasarkan lokasi jika ada
-    if current_location:
-        events = events.filter(location=current_location)
-    
-    # Filter berdasarkan status jika ada
-    if current_status:
-        events = events.filter(event_status=current_status)
-    
+    # card_event.html di-cache per event (Event.updated_at): kategori hanya dibaca
+    # untuk card yang belum ada di cache, tombol owner cukup membandingkan user_eo_id
+
+    # Filter kategori, lokasi, dan status (sama dengan feed JSON event)
+    events = events.apply_filters(
+        category=current_category,
+        location=current_location,
+        status=current_status,
+    )
+
+    # Pencarian full-text nama & deskripsi, urutkan berdasarkan relevansi
+    if search_query:
+        events = events.search(search_query).order_by('search_rank', 'id')
+
+    # Event terdekat dari kota asal (parameter `near` atau base_location runner)
+    current_sort = request.GET.get('sort', '')
+    near_city = None
+    try:
+        max_distance = parse_max_distance(request.GET.get('max_distance', ''))
+    except ValueError:
+        max_distance = None
+    if current_sort == 'nearest' or max_distance is not None:
+        near_city = base_city_for(request.user, request.GET.get('near', ''))
+    if near_city:
+        events = events.near(near_city, max_distance)
+        if current_sort == 'nearest':
+            events = events.order_by('distance_km', 'event_date')
+
+    # Jumlah event per nilai filter (GROUP BY, di-cache)
+    facets = get_event_facets(current_category, current_location, current_status, search_query)
+
     # Siapkan context untuk template
     context = {
         'events': events,
+        'facets': facets,
+        'facet_counts': facet_counts(facets),
         'current_category': current_category,
         'current_location': current_location,
         'current_status': current_status,
+        'search_query': search_query,
+        'current_sort': current_sort,
+        'near_city': near_city,
+        'max_distance': max_distance,
     }
     
     return render(request, 'main.html', context)
@@ -111,30 +144,14 @@ def show_user(request, username):
         return render(request, "profile.html", context)
 
     attendance_list = user.runner.attendance_records.all().select_related('event').prefetch_related('event__event_category')
-    today = date.today()
-    
+
     reviews = Review.objects.filter(runner=user.runner).select_related('event')
     review_dict = {review.event_id: review for review in reviews}
 
-
+    # Status event & attendance diupdate oleh command transition_event_status,
+    # view ini hanya membaca
     for record in attendance_list:
-        event = record.event
-        event_date = event.event_date.date()
-        
-        # Update status event
-        if event_date < today:
-            event.event_status = "finished"
-        elif event_date == today:
-            event.event_status = "on_going"
-        else:
-            event.event_status = "coming_soon"
-        event.save()
-
-        # Update status registrasi
-        if event.event_status == "finished" and record.status == 'attending':
-            record.status = 'finished'
-            record.save()
-        record.review = review_dict.get(event.id)
+        record.review = review_dict.get(record.event_id)
 
     context = {
         'user': user,
@@ -245,16 +262,14 @@ def cancel_event(request, username, id):
     event = get_object_or_404(Event, pk=id)
     runner = user.runner
 
+    if leave_waitlist(runner, event):
+        messages.success(request, f"You have left the waitlist for {event.name}.")
+        return redirect('main:show_user', username=username)
+
     try:
         attendance = Attendance.objects.get(runner=runner, event=event)
 
-        if attendance.status == 'attending':
-            with transaction.atomic():
-                attendance.status = 'canceled'
-                attendance.save()
-                
-                event.decrement_participans() 
-            
+        if attendance.status == 'attending' and cancel_registration(attendance):
             print("You have successfully canceled your attendance for the event.")
             messages.success(request, f"You have successfully canceled your attendance for {event.name}.")
         
@@ -294,16 +309,17 @@ def api_cancel_event(request, username, id):
     event = get_object_or_404(Event, pk=id)
     runner = user.runner
 
-    # 3. Logika Cancel
+    # 3. Logika Cancel (runner di waitlist cukup keluar dari antrian)
+    if leave_waitlist(runner, event):
+        return JsonResponse({
+            "status": "success",
+            "message": f"Left the waitlist for {event.name}."
+        }, status=200)
+
     try:
         attendance = Attendance.objects.get(runner=runner, event=event)
 
-        if attendance.status == 'attending':
-            with transaction.atomic():
-                attendance.status = 'canceled'
-                attendance.save()
-                event.decrement_participans() 
-            
+        if attendance.status == 'attending' and cancel_registration(attendance):
             return JsonResponse({
                 "status": "success", 
                 "message": f"Successfully canceled attendance for {event.name}."
@@ -354,33 +370,15 @@ def participate_in_event(request, username, id, category_key):
         return redirect('event:event_detail', pk=id)
 
     try:
-        with transaction.atomic():
-            if event.total_participans >= event.capacity:
-                messages.error(request, f"Sorry, {event.name} is already full.")
-                return redirect('main:show_user', username=username)
-
-            attendance, created = Attendance.objects.get_or_create(
-                runner=runner,
-                event=event,
-                defaults={
-                        'status': 'attending',
-                        'category': selected_category
-                        }
-                
-            )
-
-            if created:
-                event.increment_participans()
-                messages.success(request, f"You are now registered for {event.name}.")
-            else:
-                if attendance.status == 'canceled':
-                    attendance.status = 'attending'
-                    attendance.category = selected_category
-                    attendance.save()
-                    event.increment_participans() 
-                    messages.success(request, f"You have re-registered for {event.name}.")
-                else:
-                    messages.warning(request, f"You are already registered for {event.name}.")
+        result, position = register_or_waitlist(runner, event, selected_category)
+        if result == JOINED:
+            messages.success(request, f"You are now registered for {event.name}.")
+        elif result == REJOINED:
+            messages.success(request, f"You have re-registered for {event.name}.")
+        elif result == WAITLISTED:
+            messages.info(request, f"{event.name} is full. You are #{position} on the waitlist.")
+        else:
+            messages.warning(request, f"You are already registered for {event.name}.")
     
     except Exception as e:
         messages.error(request, f"An error occurred: {e}")
@@ -411,37 +409,118 @@ def api_participate_event(request, username, id, category_key):
     except EventCategory.DoesNotExist:
         return JsonResponse({"status": "error", "message": "Invalid category"}, status=400)
 
-    # 3. Logic Transaction (Sama persis)
+    # 3. Admission control: saat event melebihi rate, request diantrikan sebagai
+    #    tiket dan diproses drainer (lihat apps/main/admission.py)
+    ticket = admit(runner, event, selected_category)
+    if ticket is not None:
+        return JsonResponse({
+            "status": "queued",
+            "message": f"{event.name} is busy. Your registration is queued.",
+            "ticket": str(ticket.id),
+            "position": queue_position(ticket),
+            "poll_url": reverse('main:api_registration_ticket', args=[ticket.id]),
+        }, status=202)
+
+    # 4. Registrasi (kuota dijaga UPDATE bersyarat, event penuh -> waitlist,
+    #    lihat apps/main/registration.py)
     try:
-        with transaction.atomic():
-            if event.total_participans >= event.capacity:
-                    return JsonResponse({"status": "error", "message": "Event is full"}, status=400)
-
-            attendance, created = Attendance.objects.get_or_create(
-                runner=runner,
-                event=event,
-                defaults={
-                    'status': 'attending',
-                    'category': selected_category
-                }
-            )
-
-            if created:
-                event.increment_participans()
-                return JsonResponse({"status": "success", "message": f"Successfully joined {event.name}!"}, status=200)
-            else:
-                if attendance.status == 'canceled':
-                    attendance.status = 'attending'
-                    attendance.category = selected_category
-                    attendance.save()
-                    event.increment_participans() 
-                    return JsonResponse({"status": "success", "message": f"Re-joined {event.name} successfully!"}, status=200)
-                else:
-                    return JsonResponse({"status": "warning", "message": "You are already registered."}, status=200)
-
+        result, position = register_or_waitlist(runner, event, selected_category)
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
+    if result == JOINED:
+        return JsonResponse({"status": "success", "message": f"Successfully joined {event.name}!"}, status=200)
+    if result == REJOINED:
+        return JsonResponse({"status": "success", "message": f"Re-joined {event.name} successfully!"}, status=200)
+    if result == WAITLISTED:
+        return JsonResponse({
+            "status": "waitlisted",
+            "message": f"{event.name} is full. You are #{position} on the waitlist.",
+            "position": position,
+        }, status=200)
+    return JsonResponse({"status": "warning", "message": "You are already registered."}, status=200)
+
+@csrf_exempt
+@require_POST
+def api_participate_group(request, id):
+    """
+    Registrasi grup/klub lari: body JSON
+    {"members": [{"username": "...", "category": "5k"}, ...]}.
+    Semua anggota terdaftar atau tidak sama sekali. Runner yang mengirim harus
+    termasuk anggota grup, dan grup ikut admission control (429 saat event ramai).
+    """
+    if not request.user.is_authenticated or request.user.role != 'runner':
+        return JsonResponse({"status": "error", "message": "Only runners can register a group"}, status=403)
+
+    event = get_object_or_404(Event, pk=id)
+    try:
+        data = json.loads(request.body)
+        members = [(str(member["username"]), str(member["category"])) for member in data["members"]]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"status": "error", "message": "Invalid JSON body"}, status=400)
+
+    # Tidak boleh mendaftarkan orang lain tanpa ikut di dalam grup
+    if request.user.username not in {username for username, _ in members}:
+        return JsonResponse({"status": "error", "message": "You must be one of the group members"}, status=403)
+
+    if not admit_group(event, len(members)):
+        response = JsonResponse({
+            "status": "error",
+            "message": f"{event.name} is busy. Please retry the group registration shortly.",
+        }, status=429)
+        response['Retry-After'] = '5'
+        return response
+
+    try:
+        attendances = register_group(event, members)
+    except GroupRegistrationError as e:
+        return JsonResponse({"status": "error", "message": e.message, "errors": e.errors}, status=400)
+
+    return JsonResponse({
+        "status": "success",
+        "message": f"Registered {len(attendances)} runners for {event.name}.",
+        "registered": len(attendances),
+    }, status=200)
+
+def api_registration_ticket(request, ticket_id):
+    """Polling status tiket antrian registrasi (satu query, tanpa menyentuh event)."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"status": "error", "message": "Login required"}, status=401)
+
+    ticket = RegistrationTicket.objects.filter(pk=ticket_id, runner_id=request.user.pk).first()
+    if ticket is None:
+        return JsonResponse({"status": "error", "message": "Ticket not found"}, status=404)
+
+    return JsonResponse({
+        "status": ticket.status,
+        "result": ticket.result or None,
+        "position": queue_position(ticket),
+        "waitlist_position": ticket.waitlist_position,
+    })
+
+@login_required(login_url='main:login')
+def api_waitlist_position(request, id):
+    """Posisi runner yang login di waitlist event, atau status attendance-nya."""
+    user = request.user
+    if user.role != 'runner':
+        return JsonResponse({"status": "error", "message": "Only runners have a waitlist position"}, status=403)
+
+    event = get_object_or_404(Event, pk=id)
+    entry = WaitlistEntry.objects.filter(runner=user.runner, event=event).first()
+    if entry is not None:
+        return JsonResponse({
+            "status": "waitlisted",
+            "position": waitlist_position(entry),
+            "waitlist_size": WaitlistEntry.objects.filter(event=event).count(),
+        })
+
+    attendance = Attendance.objects.filter(runner=user.runner, event=event).values_list('status', flat=True).first()
+    return JsonResponse({
+        "status": attendance or "not_registered",
+        "position": None,
+        "waitlist_size": WaitlistEntry.objects.filter(event=event).count(),
+    })
+
 @login_required(login_url='main:login')
 def change_password(request,username):
     if request.method == "POST":
@@ -513,17 +592,19 @@ def delete_profile(request, username):
         }, status=400)
     
     try:
-        with transaction.atomic():
-            if hasattr(user, 'runner'):
-                active_attendances = Attendance.objects.filter(
-                    runner=user.runner, 
-                    status='attending'
-                ).select_related('event')
-                for attendance in active_attendances:
-                    event = attendance.event
-                    event.decrement_participans() 
-            user.delete()
+        # Akun besar dihapus di background (lihat apps/main/account_deletion.py)
+        if request.POST.get("async") or account_size(user) > ASYNC_THRESHOLD:
+            job = request_account_deletion(user)
             logout(request)
+            return JsonResponse({
+                "success": True,
+                "message": "Akun sedang dihapus.",
+                "status_url": reverse('main:api_delete_account_status', args=[job.id]),
+                "redirect_url": reverse('main:show_main')
+            }, status=202)
+
+        delete_account(user)
+        logout(request)
         
         return JsonResponse({
             "success": True,
@@ -553,35 +634,45 @@ def api_delete_account(request):
         if not user.check_password(password):
             return JsonResponse({"status": "error", "message": "Password salah."}, status=400)
         
-        # 2. Hapus Data dengan Aman (Atomic)
-        with transaction.atomic():
-            # Jika user terdaftar di event, kurangi kuota partisipan event tersebut
-            if hasattr(user, 'runner'):
-                active_attendances = Attendance.objects.filter(
-                    runner=user.runner, 
-                    status='attending'
-                ).select_related('event')
-                
-                for attendance in active_attendances:
-                    event = attendance.event
-                    event.decrement_participans() 
-            
-            # Hapus User
-            user.delete()
-            
-            # Logout session (opsional tapi disarankan)
+        # 2. Akun besar dihapus di background, kursi event tetap langsung dilepas
+        if data.get('async') or account_size(user) > ASYNC_THRESHOLD:
+            job = request_account_deletion(user)
             logout(request)
+            return JsonResponse({
+                "status": "queued",
+                "message": "Akun sedang dihapus.",
+                "job": str(job.id),
+                "status_url": reverse('main:api_delete_account_status', args=[job.id]),
+            }, status=202)
+
+        # 3. Lepas kursi (satu UPDATE), hapus data per chunk, lalu hapus user
+        delete_account(user)
+        
+        # Logout session (opsional tapi disarankan)
+        logout(request)
             
         return JsonResponse({"status": "success", "message": "Akun berhasil dihapus."}, status=200)
         
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
+def api_delete_account_status(request, job_id):
+    """Status hapus akun di background (id job tidak bisa ditebak, user sudah logout)."""
+    job = AccountDeletion.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({"status": "error", "message": "Job not found"}, status=404)
+    return JsonResponse({
+        "status": job.status,
+        "error": job.error or None,
+        "requested_at": job.requested_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    })
 
 
 def show_all_users_json(request):
     User = get_user_model()
-    users = User.objects.all()  # Mengambil semua user dari database
+    # Profil runner/EO ikut di-join agar tidak query per user
+    users = User.objects.select_related('runner', 'event_organizer_profile')
     
     data_list = [] # List penampung
 
@@ -625,52 +716,49 @@ def show_all_users_json(request):
     # safe=False wajib digunakan jika yang dikembalikan adalah List (bukan Dict)
     return JsonResponse(data_list, safe=False, status=200)
 
+def _api_profile_details(user):
+    # Build details based on user role
+    if user.role == 'event_organizer':
+        try:
+            eo_profile = user.event_organizer_profile
+            return {
+                "base_location": eo_profile.base_location or "",
+                "profile_picture": eo_profile.profile_picture or "",
+                "total_events": Event.objects.filter(user_eo=eo_profile).count(),
+                "rating": float(eo_profile.rating) if eo_profile.rating else 0.0,
+                "coin": int(eo_profile.coin) if eo_profile.coin is not None else 0,
+            }
+        except (EventOrganizer.DoesNotExist, AttributeError):
+            return {
+                "base_location": "",
+                "profile_picture": "",
+                "total_events": 0,
+                "rating": 0.0,
+                "coin": 0,
+            }
+    elif user.role == 'runner':
+        try:
+            runner_profile = user.runner
+            return {
+                "base_location": runner_profile.base_location or "",
+                "coin": int(runner_profile.coin) if runner_profile.coin is not None else 0,
+            }
+        except (Runner.DoesNotExist, AttributeError):
+            pass
+    return {
+        "base_location": "",
+        "coin": 0,
+    }
+
+
 # views.py - api_profile
 @csrf_exempt
 @login_required
 def api_profile(request):
-    """API untuk mendapatkan data user profile (JSON)"""
+    """API untuk mendapatkan data user profile (JSON), details di-cache per user (profile_cache.py)"""
     try:
         user = request.user
-        
-        # Build details based on user role
-        details = {}
-        
-        if user.role == 'event_organizer':
-            try:
-                eo_profile = user.event_organizer_profile
-                details = {
-                    "base_location": eo_profile.base_location or "",
-                    "profile_picture": eo_profile.profile_picture or "",
-                    "total_events": Event.objects.filter(user_eo=eo_profile).count(),
-                    "rating": float(eo_profile.rating) if eo_profile.rating else 0.0,
-                    "coin": int(eo_profile.coin) if eo_profile.coin is not None else 0,
-                }
-            except (EventOrganizer.DoesNotExist, AttributeError):
-                details = {
-                    "base_location": "",
-                    "profile_picture": "",
-                    "total_events": 0,
-                    "rating": 0.0,
-                    "coin": 0,
-                }
-        elif user.role == 'runner':
-            try:
-                runner_profile = user.runner
-                details = {
-                    "base_location": runner_profile.base_location or "",
-                    "coin": int(runner_profile.coin) if runner_profile.coin is not None else 0,
-                }
-            except (Runner.DoesNotExist, AttributeError):
-                details = {
-                    "base_location": "",
-                    "coin": 0,
-                }
-        else:
-            details = {
-                "base_location": "",
-                "coin": 0,
-            }
+        details = get_profile_payload(user.pk, 'api_profile', lambda: _api_profile_details(user))
         
         data = {
             "id": user.id,
@@ -707,58 +795,12 @@ def api_events(request):
         except EventOrganizer.DoesNotExist:
             return JsonResponse([], safe=False, status=200)
         
-        # Query events berdasarkan eo_profile (bukan user)
-        events = Event.objects.filter(user_eo=eo_profile).order_by('-event_date')[:5]
-        
-        data = []
-        for event in events:
-            # Pastikan semua field ada
-            event_status = getattr(event, 'event_status', 'On Going')
-            
-            # Format tanggal
-            event_date = event.event_date
-            if event_date:
-                event_date_str = event_date.isoformat()
-            else:
-                event_date_str = "2024-12-04T00:00:00Z"
-            
-            regist_deadline = getattr(event, 'regist_deadline', None)
-            if regist_deadline:
-                regist_deadline_str = regist_deadline.isoformat()
-            else:
-                regist_deadline_str = event_date_str
-            
-            # Kategori event
-            event_categories = []
-            if hasattr(event, 'event_categories') and event.event_categories.exists():
-                event_categories = list(event.event_categories.values_list('category', flat=True))
-            
-            event_obj = {
-                "id": str(event.id),
-                "name": event.name or "",
-                "description": event.description or "",
-                "location": event.location or "",
-                "event_status": event_status,
-                "image": event.image.url if hasattr(event.image, 'url') else "",
-                "image2": None,
-                "image3": None,
-                "event_date": event_date_str,
-                "regist_deadline": regist_deadline_str,
-                "contact": event.contact or "",
-                "capacity": event.capacity or 0,
-                "total_participans": event.total_participans or 0,
-                "full": event.full if hasattr(event, 'full') else False,
-                "coin": event.coin or 0,
-                "user_eo": {
-                    "id": user.id,
-                    "username": user.username
-                },
-                "event_categories": event_categories
-            }
-            
-            data.append(event_obj)
-        
-        return JsonResponse(data, safe=False)
+        # Query events berdasarkan eo_profile (bukan user), payload dari read model
+        rows = Event.objects.filter(user_eo=eo_profile).order_by('-event_date').values_list(
+            'id', 'read_model__payload'
+        )[:5]
+
+        return HttpResponse(json_array(payloads_for(rows)), content_type='application/json')
         
     except Exception as e:
         return JsonResponse({
@@ -766,71 +808,22 @@ def api_events(request):
             "status": "error"
         }, status=500)
 
-@login_required(login_url='main:login')
-def show_user_json(request, username):
-    user = get_object_or_404(User, username=username)
-
-    # Validasi otorisasi
-    if user != request.user:
-        return JsonResponse({
-            "status": "error",
-            "message": "You are not authorized to view this profile."
-        }, status=403)
-
-    # Data dasar user
-    user_data = {
-        "username": user.username,
-        "email": user.email,
-        "role": user.role,
-        "last_login": user.last_login.strftime('%Y-%m-%d %H:%M:%S') if user.last_login else None,
-        "status": "success", # Penting untuk pengecekan di Flutter
-    }
-
-    # Jika bukan runner, return basic info saja
-    if user.role != 'runner':
-        user_data["message"] = "User is not a runner"
-        return JsonResponse(user_data, status=200)
-
+def _runner_profile_payload(user):
     # Ambil profile runner
     try:
         runner_profile = user.runner
-        user_data["base_location"] = runner_profile.base_location
-        user_data["coin"] = runner_profile.coin
     except Runner.DoesNotExist:
-            user_data["base_location"] = "-"
-            user_data["coin"] = 0
+        return {"base_location": "-", "coin": 0, "attendance_list": [], "user_reviews": []}
 
     # Ambil Attendance List & Reviews
-    attendance_list = runner_profile.attendance_records.all().select_related('event').prefetch_related('event__event_category')
+    attendance_list = runner_profile.attendance_records.all().select_related('event', 'category')
     reviews = Review.objects.filter(runner=runner_profile).select_related('event')
     review_dict = {review.event_id: review for review in reviews}
     
-    today = date.today()
     serialized_attendance = []
     
     for record in attendance_list:
         event = record.event
-        event_date = event.event_date.date() if event.event_date else None
-        
-        # Update status event otomatis (sama seperti di HTML view)
-        if event_date:
-            is_changed = False
-            if event_date < today and event.event_status != "finished":
-                event.event_status = "finished"
-                is_changed = True
-            elif event_date == today and event.event_status != "on_going":
-                event.event_status = "on_going"
-                is_changed = True
-            elif event_date > today and event.event_status != "coming_soon":
-                event.event_status = "coming_soon"
-                is_changed = True
-            
-            if is_changed:
-                event.save()
-                
-        if event.event_status == "finished" and record.status == 'attending':
-            record.status = 'finished'
-            record.save()
 
         # Susun data attendance untuk JSON
         event_review = review_dict.get(event.id)
@@ -864,8 +857,40 @@ def show_user_json(request, username):
             }
         })
 
-    # Masukkan ke dictionary utama
-    user_data["attendance_list"] = serialized_attendance
-    user_data["user_reviews"] = serialized_reviews
+    return {
+        "base_location": runner_profile.base_location,
+        "coin": runner_profile.coin,
+        "attendance_list": serialized_attendance,
+        "user_reviews": serialized_reviews,
+    }
+
+
+@login_required(login_url='main:login')
+def show_user_json(request, username):
+    # Validasi otorisasi (profil sendiri tidak perlu query user lagi)
+    if username != request.user.username:
+        get_object_or_404(User, username=username)
+        return JsonResponse({
+            "status": "error",
+            "message": "You are not authorized to view this profile."
+        }, status=403)
+    user = request.user
+
+    # Data dasar user
+    user_data = {
+        "username": user.username,
+        "email": user.email,
+        "role": user.role,
+        "last_login": user.last_login.strftime('%Y-%m-%d %H:%M:%S') if user.last_login else None,
+        "status": "success", # Penting untuk pengecekan di Flutter
+    }
+
+    # Jika bukan runner, return basic info saja
+    if user.role != 'runner':
+        user_data["message"] = "User is not a runner"
+        return JsonResponse(user_data, status=200)
+
+    # Profil, attendance list & review di-cache per user (profile_cache.py)
+    user_data.update(get_profile_payload(user.pk, 'runner_profile', lambda: _runner_profile_payload(user)))
 
     return JsonResponse(user_data, status=200)
\ No newline at end of file
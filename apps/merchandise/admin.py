@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Sum, Count
+from spot_runner.payload_cache import bump
 from .models import Merchandise, Redemption
 
 
@@ -127,6 +128,8 @@ class MerchandiseAdmin(admin.ModelAdmin):
     def mark_out_of_stock(self, request, queryset):
         """Bulk action to mark as out of stock"""
         updated = queryset.update(stock=0)
+        # update() tidak memicu post_save
+        bump('merchandise')
         self.message_user(request, f'{updated} product(s) marked as out of stock.')
     mark_out_of_stock.short_description = 'Mark as Out of Stock'
     
@@ -134,6 +137,7 @@ class MerchandiseAdmin(admin.ModelAdmin):
         """Bulk action to add 10 stock to selected items"""
         from django.db.models import F
         updated = queryset.update(stock=F('stock') + 10)
+        bump('merchandise')
         self.message_user(request, f'Added 10 stock to {updated} product(s).')
     add_stock.short_description = 'Add 10 Stock'
 
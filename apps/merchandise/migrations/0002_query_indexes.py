@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_query_indexes'),
+        ('merchandise', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='redemption',
+            index=models.Index(fields=['user', '-redeemed_at'], name='redemption_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='redemption',
+            index=models.Index(fields=['merchandise', '-redeemed_at'], name='redemption_merch_date_idx'),
+        ),
+    ]
@@ -57,5 +57,10 @@ class Redemption(models.Model):
 
     class Meta:
         ordering = ['-redeemed_at']
+        indexes = [
+            # Riwayat redeem runner & redeem merchandise organizer, terbaru dulu
+            models.Index(fields=['user', '-redeemed_at'], name='redemption_user_date_idx'),
+            models.Index(fields=['merchandise', '-redeemed_at'], name='redemption_merch_date_idx'),
+        ]
 
 
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from spot_runner.payload_cache import bump
+from .models import Merchandise
+
+# ==========================
+# Cache payload bersama (spot_runner/payload_cache.py)
+# ==========================
+
+@receiver(post_save, sender=Merchandise)
+@receiver(post_delete, sender=Merchandise)
+def bump_merchandise_payloads(sender, raw=False, **kwargs):
+    # Termasuk perubahan stok saat redeem (merchandise.save())
+    if raw:
+        return
+    bump('merchandise')
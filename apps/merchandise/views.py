@@ -12,6 +12,8 @@ import json
 from django.http import HttpResponse
 import requests
 from django.views.decorators.cache import cache_page
+from spot_runner import payload_cache
+from spot_runner.payload_cache import cached_payload, conditional_feed
 
 # test
 # Merchandise landing page
@@ -282,8 +284,10 @@ def history(request):
     messages.error(request, 'Access denied')
     return HttpResponseRedirect('/login')
 
+@conditional_feed('merchandise')
+@cached_payload('merchandise')
 def show_json(request):
-    """Get all merchandise in JSON format"""
+    """Get all merchandise in JSON format (di-cache, lihat spot_runner/payload_cache.py)"""
     merchandise_list = Merchandise.objects.select_related('organizer__user').all()
     
     # Optional: Filter by category
@@ -319,22 +323,12 @@ def show_json(request):
     return JsonResponse(data, safe=False)
 
 
-def show_json_by_id(request, id):
-    """Get single merchandise by ID in JSON format"""
+def _merchandise_detail(id):
     merchandise = get_object_or_404(
         Merchandise.objects.select_related('organizer__user'), 
         pk=id
     )
-    
-    # Check if current user is the organizer
-    is_owner = False
-    if request.user.is_authenticated:
-        try:
-            is_owner = merchandise.organizer.user_id == request.user.id
-        except AttributeError:
-            pass
-    
-    data = {
+    return {
         'id': str(merchandise.id),
         'name': merchandise.name,
         'price_coins': merchandise.price_coins,
@@ -346,7 +340,7 @@ def show_json_by_id(request, id):
         'available': merchandise.available,
         'created_at': merchandise.created_at.isoformat(),
         'updated_at': merchandise.updated_at.isoformat(),
-        'is_owner': is_owner,
+        'is_owner': False,
         'organizer': {
             'id': merchandise.organizer.user_id,
             'username': merchandise.organizer.user.username,
@@ -358,6 +352,14 @@ def show_json_by_id(request, id):
             'review_count': merchandise.organizer.review_count,
         }
     }
+
+
+def show_json_by_id(request, id):
+    """Get single merchandise by ID in JSON format"""
+    data = dict(payload_cache.get_or_build('merchandise', ('detail', id), lambda: _merchandise_detail(id)))
+    
+    # Check if current user is the organizer
+    data['is_owner'] = request.user.is_authenticated and data['organizer']['id'] == request.user.id
     
     return JsonResponse(data)
 
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0005_query_indexes'),
+        ('event_organizer', '0001_initial'),
+        ('main', '0002_query_indexes'),
+        ('review', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['event', '-created_at'], name='review_event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['event_organizer', '-created_at'], name='review_eo_created_idx'),
+        ),
+    ]
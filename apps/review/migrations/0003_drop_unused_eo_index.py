@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_eo_created_idx',
+        ),
+    ]
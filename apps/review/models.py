@@ -43,3 +43,8 @@ class Review(models.Model):
         ordering = ['-created_at']
         # Optional: Pastikan satu runner hanya bisa review satu event sekali
         unique_together = ['runner', 'event']
+        indexes = [
+            # Review per event, terbaru dulu. Review organizer difilter lewat event__user_eo
+            # (event_organizer boleh kosong) dan di-join lewat index event_id.
+            models.Index(fields=['event', '-created_at'], name='review_event_created_idx'),
+        ]
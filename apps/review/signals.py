@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from spot_runner.payload_cache import bump
+from .models import Review
+
+# ==========================
+# Cache payload bersama (spot_runner/payload_cache.py)
+# ==========================
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_payloads(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump('review')
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def bump_review_payloads_on_rename(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Payload review menyimpan username runner
+    if raw or instance.role != 'runner':
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    bump('review')
@@ -518,6 +518,34 @@ class ReviewViewsTestCase(TestCase):
         
         self.assertEqual(response.status_code, 404)
     
+    def test_edit_review_deleted_concurrently(self):
+        """Test editing a review deleted by another request after it was loaded"""
+        from unittest import mock
+        from apps.review import views
+        review = Review.objects.create(
+            runner=self.runner,
+            event=self.event,
+            event_organizer=self.eo,
+            rating=4,
+            review_text='Original review'
+        )
+        self.client.login(username='testrunner', password='testpass123')
+        locked_rating = views._locked_rating
+        
+        def delete_then_lock(instance):
+            Review.objects.filter(pk=instance.pk).delete()
+            return locked_rating(instance)
+        
+        data = json.dumps({'rating': 5, 'review_text': 'Updated review'})
+        for name in ('review:edit_review', 'review:edit_review_flutter'):
+            Review.objects.get_or_create(pk=review.pk, defaults={
+                'runner': self.runner, 'event': self.event, 'event_organizer': self.eo, 'rating': 4,
+            })
+            with mock.patch.object(views, '_locked_rating', side_effect=delete_then_lock):
+                response = self.client.post(reverse(name, args=[review.id]), data=data, content_type='application/json')
+            self.assertEqual(response.status_code, 404)
+            self.assertFalse(Review.objects.filter(pk=review.pk).exists())
+    
     def test_edit_review_without_login(self):
         """Test editing review without login"""
         review = Review.objects.create(
@@ -5,13 +5,48 @@ from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.html import strip_tags
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 import json
 from .models import Review
 from apps.event.models import Event
 from apps.main.models import Runner, Attendance
+from apps.event_organizer.ratings import organizer_of_event, review_created, review_deleted, review_rating_changed
+from spot_runner import payload_cache
+from spot_runner.payload_cache import conditional_feed
+
+def _review_rows(reviews, with_event=True):
+    """Data review yang sama untuk semua user (is_owner ditambahkan per request)."""
+    rows = []
+    for review in reviews:
+        row = {
+            'id': str(review.id),
+            'runner_name': review.runner.user.username,
+            'runner_user_id': review.runner.user_id,
+        }
+        if with_event:
+            row['event_id'] = str(review.event.id)
+            row['event_name'] = review.event.name
+        row.update({
+            'review_text': review.review_text,
+            'rating': review.rating,
+            'created_at': review.created_at.isoformat(),
+        })
+        rows.append(row)
+    return rows
+
+
+def _with_owner(rows, user):
+    user_id = user.pk if user.is_authenticated else None
+    data = []
+    for row in rows:
+        row = dict(row)
+        row['is_owner'] = row.pop('runner_user_id') == user_id
+        data.append(row)
+    return data
+
 
 @require_http_methods(["GET"])
+@conditional_feed('review', per_user=True)
 def get_all_reviews(request):
     """
     Get all reviews atau filter by event_id
@@ -22,37 +57,26 @@ def get_all_reviews(request):
     """
     try:
         event_id = request.GET.get('event_id', None)
+        reviews = Review.objects.select_related('runner__user', 'event')
         
         # Filter by event_id jika ada
         if event_id:
-            reviews = Review.objects.filter(event_id=event_id).select_related('runner__user', 'event')
+            parts = ('event', event_id)
+            reviews = reviews.filter(event_id=event_id)
         else:
             # Jika tidak ada event_id, filter by user yang login (untuk cek status)
-            if request.user.is_authenticated:
-                try:
-                    runner = request.user.runner
-                    # HANYA RETURN REVIEW MILIK USER INI
-                    reviews = Review.objects.filter(runner=runner).select_related('runner__user', 'event')
-                    print(f"✅ Found {reviews.count()} reviews for user {request.user.username}")
-                except:
-                    # Bukan runner, return semua review
-                    reviews = Review.objects.all().select_related('runner__user', 'event')
+            runner = getattr(request.user, 'runner', None) if request.user.is_authenticated else None
+            if runner is not None:
+                # HANYA RETURN REVIEW MILIK USER INI
+                parts = ('runner', runner.pk)
+                reviews = reviews.filter(runner=runner)
             else:
-                reviews = Review.objects.all().select_related('runner__user', 'event')
+                # Bukan runner, return semua review
+                parts = ('all',)
         
-        # Build response data
-        reviews_data = []
-        for review in reviews:
-            reviews_data.append({
-                'id': str(review.id),
-                'runner_name': review.runner.user.username,
-                'event_id': str(review.event.id),
-                'event_name': review.event.name,
-                'review_text': review.review_text,
-                'rating': review.rating,
-                'created_at': review.created_at.isoformat(),
-                'is_owner': request.user.is_authenticated and request.user == review.runner.user,
-            })
+        # Data review di-cache (namespace review), is_owner dihitung per user
+        rows = payload_cache.get_or_build('review', ('list',) + parts, lambda: _review_rows(reviews))
+        reviews_data = _with_owner(rows, request.user)
         
         return JsonResponse({
             'status': 'success',
@@ -75,20 +99,13 @@ def get_review_detail(request, review_id):
     URL: /api/reviews/<review_id>/
     """
     try:
-        review = Review.objects.select_related('runner__user', 'event').get(id=review_id)
+        rows = payload_cache.get_or_build('review', ('detail', review_id), lambda: _review_rows(
+            [Review.objects.select_related('runner__user', 'event').get(id=review_id)]
+        ))
         
         return JsonResponse({
             'status': 'success',
-            'data': {
-                'id': str(review.id),
-                'runner_name': review.runner.user.username,
-                'event_id': str(review.event.id),
-                'event_name': review.event.name,
-                'review_text': review.review_text,
-                'rating': review.rating,
-                'created_at': review.created_at.isoformat(),
-                'is_owner': request.user.is_authenticated and request.user == review.runner.user,
-            }
+            'data': _with_owner(rows, request.user)[0],
         }, status=200)
     
     except Review.DoesNotExist:
@@ -104,6 +121,21 @@ def get_review_detail(request, review_id):
         }, status=500)
 
 
+def _event_reviews_payload(event_id):
+    event = get_object_or_404(Event, id=event_id)
+    rows = _review_rows(Review.objects.filter(event=event).select_related('runner__user'), with_event=False)
+    total_rating = sum(row['rating'] for row in rows)
+    return {
+        'event': {
+            'id': str(event.id),
+            'name': event.name,
+        },
+        'reviews': rows,
+        'average_rating': round(total_rating / len(rows), 2) if len(rows) > 0 else 0,
+        'total_reviews': len(rows),
+    }
+
+
 @require_http_methods(["GET"])
 def get_event_reviews(request, event_id):
     """
@@ -111,34 +143,12 @@ def get_event_reviews(request, event_id):
     URL: /api/reviews/event/<event_id>/
     """
     try:
-        event = get_object_or_404(Event, id=event_id)
-        reviews = Review.objects.filter(event=event).select_related('runner__user')
-        
-        reviews_data = []
-        total_rating = 0
-        
-        for review in reviews:
-            reviews_data.append({
-                'id': str(review.id),
-                'runner_name': review.runner.user.username,
-                'review_text': review.review_text,
-                'rating': review.rating,
-                'created_at': review.created_at.isoformat(),
-                'is_owner': request.user.is_authenticated and request.user == review.runner.user,
-            })
-            total_rating += review.rating
-        
-        avg_rating = round(total_rating / len(reviews), 2) if len(reviews) > 0 else 0
+        payload = payload_cache.get_or_build('review', ('event_reviews', event_id), lambda: _event_reviews_payload(event_id))
         
         return JsonResponse({
             'status': 'success',
-            'event': {
-                'id': str(event.id),
-                'name': event.name,
-            },
-            'reviews': reviews_data,
-            'average_rating': avg_rating,
-            'total_reviews': len(reviews_data)
+            **payload,
+            'reviews': _with_owner(payload['reviews'], request.user),
         }, status=200)
     
     except Event.DoesNotExist:
@@ -154,6 +164,25 @@ def get_event_reviews(request, event_id):
         }, status=500)
 
 
+def _locked_rating(review):
+    """
+    Rating review yang tersimpan, barisnya dikunci sampai transaksi selesai supaya
+    edit/hapus bersamaan tidak menghitung selisih dua kali. None jika sudah dihapus.
+    """
+    return Review.objects.select_for_update().filter(pk=review.pk).values_list('rating', flat=True).first()
+
+
+def _delete_review(review):
+    """Hapus review dan kurangi counter rating organizer di transaksi yang sama."""
+    with transaction.atomic():
+        rating = _locked_rating(review)
+        if rating is None:
+            # Sudah dihapus request lain, counter sudah dikurangi di sana
+            return
+        review.delete()
+        review_deleted(organizer_of_event(review.event_id), rating)
+
+
 @csrf_exempt
 @require_POST
 def create_review(request, event_id):
@@ -214,14 +243,16 @@ def create_review(request, event_id):
                 'message': 'Rating must be between 1 and 5'
             }, status=400)
         
-        # Create review
-        review = Review.objects.create(
-            runner=runner,
-            event=event,
-            event_organizer=event.user_eo,
-            rating=int(rating),
-            review_text=review_text
-        )
+        # Create review (counter rating organizer ikut di transaksi yang sama)
+        with transaction.atomic():
+            review = Review.objects.create(
+                runner=runner,
+                event=event,
+                event_organizer=event.user_eo,
+                rating=int(rating),
+                review_text=review_text
+            )
+            review_created(event.user_eo_id, review.rating)
         
         return JsonResponse({
             'success': True,
@@ -296,10 +327,19 @@ def edit_review(request, review_id):
                 'message': 'Rating must be between 1 and 5'
             }, status=400)
         
-        # Update review
-        review.rating = int(rating)
-        review.review_text = review_text
-        review.save()
+        # Update review (counter rating organizer ikut di transaksi yang sama)
+        with transaction.atomic():
+            old_rating = _locked_rating(review)
+            if old_rating is None:
+                # Dihapus request lain; save() akan membuatnya lagi tanpa counter
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Review not found'
+                }, status=404)
+            review.rating = int(rating)
+            review.review_text = review_text
+            review.save()
+            review_rating_changed(organizer_of_event(review.event_id), old_rating, review.rating)
         
         return JsonResponse({
             'success': True,
@@ -355,7 +395,7 @@ def delete_review(request, review_id):
     
     try:
         # HARD DELETE - review benar-benar dihapus dari database
-        review.delete()
+        _delete_review(review)
         
         return JsonResponse({
             'success': True,
@@ -432,13 +472,15 @@ def create_review_flutter(request):
                 "message": "You have already reviewed this event"
             }, status=409)
         
-        new_review = Review.objects.create(
-            runner=runner_instance,
-            event=event_instance,
-            event_organizer=event_instance.user_eo,
-            review_text=review_text,
-            rating=rating,
-        )
+        with transaction.atomic():
+            new_review = Review.objects.create(
+                runner=runner_instance,
+                event=event_instance,
+                event_organizer=event_instance.user_eo,
+                review_text=review_text,
+                rating=int(rating),
+            )
+            review_created(event_instance.user_eo_id, new_review.rating)
         
         return JsonResponse({
             "status": "success", 
@@ -516,10 +558,19 @@ def edit_review_flutter(request, review_id):
                 "message": "Rating must be between 1 and 5"
             }, status=400)
         
-        # Update review
-        review.rating = int(rating)
-        review.review_text = review_text
-        review.save()
+        # Update review (counter rating organizer ikut di transaksi yang sama)
+        with transaction.atomic():
+            old_rating = _locked_rating(review)
+            if old_rating is None:
+                # Dihapus request lain; save() akan membuatnya lagi tanpa counter
+                return JsonResponse({
+                    "status": "error",
+                    "message": "Review not found"
+                }, status=404)
+            review.rating = int(rating)
+            review.review_text = review_text
+            review.save()
+            review_rating_changed(organizer_of_event(review.event_id), old_rating, review.rating)
         
         return JsonResponse({
             "status": "success",
@@ -579,7 +630,7 @@ def delete_review_flutter(request, review_id):
     
     try:
         # HARD DELETE
-        review.delete()
+        _delete_review(review)
         
         return JsonResponse({
             "status": "success",
@@ -0,0 +1,194 @@
+"""
+Cache payload JSON bersama untuk endpoint katalog (event, merchandise, organizer, review).
+
+Disimpan di cache Django default (backend bersama antar worker, lihat CACHES di
+settings). Setiap namespace punya versi; key berbentuk
+
+    payload:<namespace>:<versi>:<bagian key>
+
+Signal post_save/post_delete/m2m_changed di masing-masing app (signals.py)
+memanggil bump() sehingga versi berganti dan semua key lama tidak pernah dibaca
+lagi (dibuang sendiri oleh timeout). Kode yang mengubah data lewat
+queryset.update() harus memanggil bump() sendiri.
+
+Versi namespace juga menjadi penanda perubahan untuk conditional GET
+(conditional_feed): ETag diturunkan dari versi, Last-Modified dari waktu versi
+dibuat, sehingga feed yang tidak berubah dijawab 304 tanpa query data.
+
+Hit/miss per namespace dihitung di memori proses (per worker), staff bisa
+melihatnya di /internal/cache-stats/.
+"""
+import functools
+import hashlib
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+NAMESPACES = ('event', 'merchandise', 'organizer', 'review')
+PAYLOAD_CACHE_TIMEOUT = 300
+
+
+class CacheStats:
+    """Counter hit/miss per namespace di memori proses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, namespace, hit):
+        with self._lock:
+            counts = self._counts.setdefault(namespace, {'hits': 0, 'misses': 0, 'bumps': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def record_bump(self, namespace):
+        with self._lock:
+            self._counts.setdefault(namespace, {'hits': 0, 'misses': 0, 'bumps': 0})['bumps'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            namespaces = {}
+            for namespace in sorted(set(NAMESPACES).union(self._counts)):
+                counts = self._counts.get(namespace, {'hits': 0, 'misses': 0, 'bumps': 0})
+                lookups = counts['hits'] + counts['misses']
+                namespaces[namespace] = {
+                    **counts,
+                    'hit_rate': counts['hits'] / lookups if lookups else 0.0,
+                }
+            return namespaces
+
+    def reset(self):
+        with self._lock:
+            self._counts = {}
+
+
+cache_stats = CacheStats()
+
+
+def _version_key(namespace):
+    return f'payload:{namespace}:version'
+
+
+def _new_version():
+    # "<unix time>-<acak>": waktu dipakai sebagai Last-Modified feed
+    return f'{time.time():.6f}-{uuid.uuid4().hex[:12]}'
+
+
+def namespace_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        version = _new_version()
+        cache.add(_version_key(namespace), version, None)
+        version = cache.get(_version_key(namespace), version)
+    return version
+
+
+def namespace_modified(namespace):
+    """Waktu perubahan terakhir namespace (datetime UTC)."""
+    return datetime.fromtimestamp(float(namespace_version(namespace).split('-')[0]), tz=timezone.utc)
+
+
+def _set_new_versions(namespaces):
+    cache.set_many({_version_key(namespace): _new_version() for namespace in namespaces}, None)
+
+
+def bump(*namespaces):
+    """Buang semua payload di namespace ini (versi baru, key lama tidak terbaca lagi)."""
+    _set_new_versions(namespaces)
+    # Di dalam transaksi, worker lain masih bisa meng-cache data lama di versi baru
+    # sebelum commit; versi diganti sekali lagi setelah commit
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _set_new_versions(namespaces))
+    for namespace in namespaces:
+        cache_stats.record_bump(namespace)
+
+
+def cache_key(namespace, *parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'payload:{namespace}:{namespace_version(namespace)}:{digest}'
+
+
+def get_or_build(namespace, parts, build, timeout=PAYLOAD_CACHE_TIMEOUT):
+    """Payload dari cache, atau hasil build() yang lalu disimpan."""
+    key = cache_key(namespace, *parts)
+    payload = cache.get(key)
+    cache_stats.record(namespace, hit=payload is not None)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, timeout)
+    return payload
+
+
+def request_parts(request):
+    """Bagian key dari path dan query string (urutan parameter tidak berpengaruh)."""
+    return (request.path, sorted(request.GET.lists()))
+
+
+def cached_payload(namespace, timeout=PAYLOAD_CACHE_TIMEOUT):
+    """
+    Decorator untuk view JSON yang isinya sama untuk semua user: respons 200
+    disimpan per path + query string, respons lain (400/404/...) tidak di-cache.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            key = cache_key(namespace, *request_parts(request))
+            cached = cache.get(key)
+            cache_stats.record(namespace, hit=cached is not None)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response['Content-Type']), timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_feed(namespace, per_user=False):
+    """
+    Conditional GET untuk feed JSON publik: ETag/Last-Modified dari versi namespace,
+    If-None-Match/If-Modified-Since yang cocok dijawab 304 sebelum view dijalankan.
+    `per_user=True` untuk feed yang isinya tergantung user login (ETag ikut id user,
+    Cache-Control private, Vary: Cookie).
+    """
+    def etag(request, *args, **kwargs):
+        parts = [namespace_version(namespace), request.get_full_path()]
+        if per_user:
+            parts.append(request.user.pk if request.user.is_authenticated else 'anonymous')
+        return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        return namespace_modified(namespace)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Client boleh menyimpan, tapi selalu revalidasi (murah, biasanya 304)
+            if per_user:
+                patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+                patch_vary_headers(response, ('Cookie',))
+            else:
+                patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_stats_view(request):
+    """Hit/miss cache payload per namespace (khusus staff)."""
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"status": "error", "message": "Staff only"}, status=403)
+    return JsonResponse({"status": "success", "namespaces": cache_stats.snapshot()})
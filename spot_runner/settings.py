@@ -70,6 +70,7 @@ SESSION_COOKIE_SAMESITE = 'None'
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'spot_runner.sql_stats.SQLStatsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,6 +80,26 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Statistik SQL per view (lihat spot_runner/sql_stats.py)
+SQL_STATS_ENABLED = True
+# Budget jumlah query per nama view; request yang melebihi dicatat sebagai warning
+SQL_QUERY_BUDGETS = {
+    'main:show_main': 10,
+    'event:show_json': 3,
+    'event:show_json_by_id': 2,
+    'main:show_all_users_json': 5,
+    'main:show_user': 10,
+}
+
+# Admission control registrasi per event (lihat apps/main/admission.py).
+# Jika ENABLED, drainer `drain_registration_queue` wajib berjalan (README langkah 11)
+REGISTRATION_ADMISSION = {
+    'ENABLED': False,
+    'RATE': 20,         # registrasi langsung per detik per event
+    'BURST': 40,
+    'BATCH_SIZE': 100,  # tiket per batch drain_registration_queue
+}
+
 ROOT_URLCONF = 'spot_runner.urls'
 
 TEMPLATES = [
@@ -127,6 +148,49 @@ else:
     }
 
 
+# Cache bersama antar worker (payload JSON, facet, profil).
+# CACHE_BACKEND: 'database' (default production, tabelnya dibuat oleh migrate),
+# 'filesystem' (default development), 'redis' (REDIS_URL, butuh paket redis) atau
+# 'locmem' (per proses).
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'database' if PRODUCTION else 'filesystem')
+
+CACHE_BACKENDS = {
+    'database': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'filesystem': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.django_cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379'),
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'KEY_PREFIX': 'spot_runner',
+        'TIMEOUT': 300,
+    },
+}
+# Test selalu memakai locmem (dipasang oleh spot_runner.test_runner)
+TEST_CACHES = {
+    'default': {
+        **CACHE_BACKENDS['locmem'],
+        'KEY_PREFIX': 'spot_runner',
+        'TIMEOUT': 300,
+    },
+}
+TEST_RUNNER = 'spot_runner.test_runner.SpotRunnerTestRunner'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
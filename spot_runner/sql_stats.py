@@ -0,0 +1,172 @@
+"""
+Instrumentasi SQL per view.
+
+SQLStatsMiddleware mencatat jumlah query, total waktu SQL, dan statement paling
+lambat untuk setiap request, lalu mengagregasinya per nama view di memori proses
+(tidak butuh DEBUG=True, memakai connection.execute_wrapper). Hasilnya bisa dilihat
+staff di /internal/sql-stats/.
+
+Budget query:
+- settings.SQL_QUERY_BUDGETS = {'main:show_main': 10, ...} -> request yang melebihi
+  budget dihitung di `over_budget` dan dicatat sebagai warning.
+- Di test, pakai `with query_budget('main:show_main', 10): self.client.get(...)`
+  yang gagal (AssertionError) jika budget terlampaui.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+# Panjang maksimum SQL yang disimpan untuk statement paling lambat
+SLOWEST_SQL_MAX_LENGTH = 500
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class QueryRecorder:
+    """execute_wrapper yang menghitung query dan waktu SQL selama satu request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_sql = ''
+        self.slowest_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.total_time += duration
+            if duration >= self.slowest_time:
+                self.slowest_time = duration
+                self.slowest_sql = sql[:SLOWEST_SQL_MAX_LENGTH]
+
+
+class SQLStats:
+    """Agregat per view di memori proses (per worker)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._budget_checks = []
+
+    def record(self, view_name, recorder):
+        budget = getattr(settings, 'SQL_QUERY_BUDGETS', {}).get(view_name)
+        over_budget = budget is not None and recorder.count > budget
+        if over_budget:
+            logger.warning("%s ran %d queries (budget %d)", view_name, recorder.count, budget)
+
+        with self._lock:
+            stats = self._views.setdefault(view_name, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'sql_time_ms': 0.0,
+                'over_budget': 0,
+                'slowest': {'sql': '', 'time_ms': 0.0},
+            })
+            stats['requests'] += 1
+            stats['queries'] += recorder.count
+            stats['max_queries'] = max(stats['max_queries'], recorder.count)
+            stats['sql_time_ms'] += recorder.total_time * 1000
+            stats['over_budget'] += int(over_budget)
+            if recorder.slowest_time * 1000 >= stats['slowest']['time_ms']:
+                stats['slowest'] = {
+                    'sql': recorder.slowest_sql,
+                    'time_ms': recorder.slowest_time * 1000,
+                }
+            checks = list(self._budget_checks)
+
+        for check in checks:
+            check(view_name, recorder.count)
+
+    def snapshot(self):
+        with self._lock:
+            views = {}
+            for view_name, stats in self._views.items():
+                views[view_name] = {
+                    **stats,
+                    'slowest': dict(stats['slowest']),
+                    'avg_queries': stats['queries'] / stats['requests'],
+                    'avg_sql_time_ms': stats['sql_time_ms'] / stats['requests'],
+                }
+            return views
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def add_budget_check(self, check):
+        with self._lock:
+            self._budget_checks.append(check)
+
+    def remove_budget_check(self, check):
+        with self._lock:
+            self._budget_checks.remove(check)
+
+
+sql_stats = SQLStats()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_VIEW
+    return match.view_name
+
+
+class SQLStatsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'SQL_STATS_ENABLED', True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        # Response streaming: query saat iterasi konten tidak ikut terhitung
+        sql_stats.record(_view_name(request), recorder)
+        return response
+
+
+def sql_stats_view(request):
+    """Statistik SQL per view (khusus staff)."""
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"status": "error", "message": "Staff only"}, status=403)
+    return JsonResponse({"status": "success", "views": sql_stats.snapshot()})
+
+
+@contextmanager
+def query_budget(view_name, max_queries):
+    """
+    Untuk test: gagal jika ada request ke `view_name` di dalam blok yang
+    menjalankan lebih dari `max_queries` query, atau jika view tidak terpanggil.
+    """
+    counts = []
+
+    def check(name, count):
+        if name == view_name:
+            counts.append(count)
+
+    sql_stats.add_budget_check(check)
+    try:
+        yield counts
+    finally:
+        sql_stats.remove_budget_check(check)
+
+    if not counts:
+        raise AssertionError(f"{view_name} was not requested inside query_budget")
+    if max(counts) > max_queries:
+        raise AssertionError(
+            f"{view_name} ran {max(counts)} queries, budget is {max_queries}"
+        )
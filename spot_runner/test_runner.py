@@ -0,0 +1,21 @@
+"""
+Test runner proyek (settings.TEST_RUNNER).
+
+Test selalu memakai cache locmem per proses: cache file/database bertahan antar
+run test, padahal database test selalu dibuat baru. Runner lain (mis. pytest)
+bisa memakai settings.TEST_CACHES dengan override yang sama.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class SpotRunnerTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_override = override_settings(CACHES=settings.TEST_CACHES)
+        self._cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        super().teardown_test_environment(**kwargs)
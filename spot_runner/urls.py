@@ -17,10 +17,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from apps.event.views import create_event_flutter, edit_event_flutter, delete_event_flutter
+from spot_runner.payload_cache import cache_stats_view
+from spot_runner.sql_stats import sql_stats_view
 
 urlpatterns = [
     path('', include('apps.main.urls')),  # Routing ke app main
     path('admin/', admin.site.urls),
+    path('internal/sql-stats/', sql_stats_view, name='sql_stats'),  # Statistik SQL per view (staff)
+    path('internal/cache-stats/', cache_stats_view, name='cache_stats'),  # Hit/miss cache payload (staff)
     path('event/', include('apps.event.urls')),  # Routing ke app event
     path('event-organizer/', include('apps.event_organizer.urls')),  # Routing ke app event_organizer
     path('merchandise/', include('apps.merchandise.urls')),  # Routing ke app merchandise